@@ -0,0 +1,598 @@
+"""
+Investigation Validator Benchmarks
+
+Seeded synthetic workloads for investigation_validator and a scenario runner
+that reports throughput and per-request latency percentiles as JSON.
+
+Usage:
+    python investigation_benchmark.py --scenario 1k --scenario 100k
+    python investigation_benchmark.py --scenario 100k --baseline previous.json
+    python investigation_benchmark.py --scenario 100k --threads 1 --threads 4
+    python investigation_benchmark.py --allocations --budgets allocation_budgets.json
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from dataclasses import asdict, dataclass
+from array import array
+import argparse
+import copy
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from investigation_validator import (
+    FormLayout, FormResponse, InvestigationModel, InvestigationValidator, ThreadedValidationEngine, ViewType, np
+)
+
+# Record counts of the standard scenarios
+SCENARIOS = {
+    "1": 1,
+    "1k": 1_000,
+    "10k": 10_000,
+    "100k": 100_000,
+    "10M": 10_000_000,
+}
+
+# Validator entry points a scenario can measure
+METHODS: Dict[str, Callable[[InvestigationValidator, bool, List[InvestigationModel]], bool]] = {
+    "on_validate_input": lambda validator, is_lab_tech, server_data: validator.on_validate_input(
+        is_lab_tech, server_data
+    ),
+    "validate_batch": lambda validator, is_lab_tech, server_data: validator.validate_batch(server_data, is_lab_tech),
+    "validate_report": lambda validator, is_lab_tech, server_data: validator.validate_report(
+        is_lab_tech, server_data
+    ).is_valid,
+}
+
+# Workloads measured by profile_allocations, with their keyword arguments
+ALLOCATION_WORKLOADS: Dict[str, Dict[str, Any]] = {
+    "on_validate_input": {"method": "on_validate_input"},
+    "on_validate_input_interpreted": {"method": "on_validate_input", "compile_forms": False},
+    "validate_report": {"method": "validate_report"},
+    "validate_batch": {"method": "validate_batch"},
+}
+# Per-record allocation budgets of ALLOCATION_WORKLOADS at 10k records. They are
+# measured on one CPython build and only hold there, so the test suite checks
+# them only when INVESTIGATION_ALLOCATION_BUDGETS is set.
+ALLOCATION_BUDGETS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "allocation_budgets.json")
+
+UNITS = ["mg/dL", "mmol/L", "g/dL", "IU/L", "%"]
+NON_EDIT_VIEW_TYPES = ["Spinner", "DatePicker", "CheckBox"]
+
+@dataclass
+class WorkloadProfile:
+    """Shape of a synthetic workload; rates are probabilities between 0 and 1"""
+    layout_count: int = 20  # distinct test forms
+    min_fields: int = 1
+    max_fields: int = 12
+    min_request_size: int = 1  # investigations per validated patient list
+    max_request_size: int = 10
+    numeric_rate: float = 0.6  # EditText fields with a min/max range
+    text_rate: float = 0.25  # EditText fields with a minimum or exact length
+    mandatory_rate: float = 0.5
+    unit_rate: float = 0.3  # numeric fields with a unit list
+    fill_rate: float = 0.85  # optional fields that have a value
+    error_rate: float = 0.05  # values that break a rule
+    empty_rate: float = 0.05  # investigations without results
+    lab_tech_rate: float = 0.3  # patient lists validated as a lab technician
+    copy_layouts: bool = False  # give every investigation its own layout list, as decoded JSON does
+
+class WorkloadGenerator:
+    """
+    Seeded generator of realistic investigation payloads
+    
+    The same seed and profile always produce the same forms and records, so
+    benchmark runs are comparable across commits.
+    """
+    
+    def __init__(self, seed: int = 0, profile: Optional[WorkloadProfile] = None):
+        """
+        Initialize the generator
+        
+        Args:
+            seed: Random seed
+            profile: Workload shape
+        """
+        self.seed = seed
+        self.profile = profile or WorkloadProfile()
+        self._random = random.Random(seed)
+        self.forms = [self._make_form(index) for index in range(self.profile.layout_count)]
+        self._next_id = 0
+    
+    def _make_form(self, index: int) -> FormResponse:
+        rng = self._random
+        profile = self.profile
+        fields = []
+        for position in range(rng.randint(profile.min_fields, profile.max_fields)):
+            field_id = f"test{index}_field{position}"
+            is_mandatory = rng.random() < profile.mandatory_rate
+            kind = rng.random()
+            if kind < profile.numeric_rate:
+                low = rng.choice([0, 1, 10, 50, 0.5])
+                high = low + rng.choice([10, 100, 500, 1000])
+                units = None
+                if rng.random() < profile.unit_rate:
+                    units = [{"id": unit_id, "unit": unit} for unit_id, unit in enumerate(rng.sample(UNITS, 2))]
+                fields.append(FormLayout(
+                    view_type=ViewType.FORM_EDITTEXT.value,
+                    id=field_id,
+                    title=f"Result {position}",
+                    is_mandatory=is_mandatory,
+                    min_value=low if rng.random() < 0.9 else None,
+                    max_value=high,
+                    unit_list=units,
+                ))
+            elif kind < profile.numeric_rate + profile.text_rate:
+                exact = rng.random() < 0.3
+                fields.append(FormLayout(
+                    view_type=ViewType.FORM_EDITTEXT.value,
+                    id=field_id,
+                    title=f"Note {position}",
+                    is_mandatory=is_mandatory,
+                    min_length=None if exact else rng.randint(2, 8),
+                    content_length=rng.randint(4, 10) if exact else None,
+                ))
+            else:
+                fields.append(FormLayout(
+                    view_type=rng.choice(NON_EDIT_VIEW_TYPES),
+                    id=field_id,
+                    title=f"Option {position}",
+                    is_mandatory=is_mandatory,
+                ))
+        return FormResponse(form_layout=fields)
+    
+    def _value(self, form_data: FormLayout) -> Any:
+        rng = self._random
+        failing = rng.random() < self.profile.error_rate
+        if form_data.view_type != ViewType.FORM_EDITTEXT.value:
+            return "" if failing else f"option{rng.randint(1, 5)}"
+        if form_data.max_value is not None:
+            low = form_data.min_value if form_data.min_value is not None else 0
+            if failing:
+                value = form_data.max_value + rng.randint(1, 100)
+            else:
+                value = rng.uniform(low, form_data.max_value)
+            # Servers send numbers as strings, ints or floats
+            shape = rng.random()
+            if shape < 0.7:
+                return f"{value:.1f}"
+            return int(value) if shape < 0.85 else round(value, 2)
+        length = form_data.content_length or form_data.min_length or 4
+        if failing:
+            length = max(length - 1, 0) if form_data.min_length or form_data.content_length else 0
+        return "".join(rng.choice("ABCDEFGHJKLMNPQRSTUVWXYZ0123456789") for _ in range(length))
+    
+    def investigation(self) -> InvestigationModel:
+        """
+        Generates one investigation
+        
+        Returns:
+            InvestigationModel: Investigation with results for one of the forms
+        """
+        rng = self._random
+        profile = self.profile
+        form_index = rng.randrange(len(self.forms))
+        form = self.forms[form_index]
+        self._next_id += 1
+        result_hash_map: Optional[Dict[str, Any]] = None
+        if rng.random() >= profile.empty_rate:
+            result_hash_map = {}
+            for form_data in form.form_layout:
+                if form_data.is_mandatory or rng.random() < profile.fill_rate:
+                    if form_data.is_mandatory and rng.random() < profile.error_rate:
+                        continue
+                    result_hash_map[form_data.id] = self._value(form_data)
+                    if form_data.unit_list and rng.random() >= profile.error_rate:
+                        result_hash_map[f"{form_data.id}_unit"] = rng.choice(form_data.unit_list)["id"]
+        elif rng.random() < 0.5:
+            result_hash_map = {}
+        if profile.copy_layouts:
+            form = FormResponse(form_layout=[copy.copy(form_data) for form_data in form.form_layout])
+        return InvestigationModel(
+            test_name=f"Test {form_index}",
+            recommended_by="Dr. Benchmark",
+            recommended_on="20240101120000+0000",
+            result_hash_map=result_hash_map,
+            id=str(self._next_id),
+            result_list=form,
+        )
+    
+    def requests(self, record_count: int) -> Iterator[Tuple[bool, List[InvestigationModel]]]:
+        """
+        Generates patient lists until ``record_count`` investigations were produced
+        
+        Args:
+            record_count: Total investigations to generate
+            
+        Yields:
+            Tuple[bool, List[InvestigationModel]]: (is_lab_tech, investigations)
+        """
+        rng = self._random
+        profile = self.profile
+        remaining = record_count
+        while remaining > 0:
+            size = min(remaining, rng.randint(profile.min_request_size, profile.max_request_size))
+            remaining -= size
+            yield rng.random() < profile.lab_tech_rate, [self.investigation() for _ in range(size)]
+
+
+def percentile(sorted_values: Any, fraction: float) -> float:
+    """
+    Nearest-rank percentile of sorted values
+    
+    Args:
+        sorted_values: Values in ascending order
+        fraction: Percentile as a fraction, e.g. 0.99
+        
+    Returns:
+        float: Percentile value, 0.0 for no values
+    """
+    if not len(sorted_values):
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def run_scenario(
+    name: str,
+    record_count: int,
+    seed: int = 0,
+    method: str = "on_validate_input",
+    is_community: bool = False,
+    profile: Optional[WorkloadProfile] = None,
+    warmup: bool = True
+) -> Dict[str, Any]:
+    """
+    Validates a synthetic workload and measures it
+    
+    Each patient list is generated before its timer starts, so generation
+    is not measured and memory stays bounded for large scenarios.
+    
+    Args:
+        name: Scenario name for the report
+        record_count: Investigations to validate
+        seed: Workload seed
+        method: Key of METHODS to measure
+        is_community: Whether the validator runs for community users
+        profile: Workload shape
+        warmup: Whether every form is validated once before timing starts,
+            so one-off layout compilation is not measured
+            
+    Returns:
+        Dict[str, Any]: JSON-serializable report
+    """
+    generator = WorkloadGenerator(seed, profile)
+    validator = InvestigationValidator(is_community=is_community)
+    validate = METHODS[method]
+    if warmup:
+        validate(validator, False, [
+            InvestigationModel("Warm-up", "", "", result_hash_map={"": None}, result_list=form)
+            for form in WorkloadGenerator(seed, profile).forms
+        ])
+    latencies = array("d")
+    valid_requests = 0
+    elapsed = 0.0
+    for is_lab_tech, server_data in generator.requests(record_count):
+        start = time.perf_counter()
+        is_valid = validate(validator, is_lab_tech, server_data)
+        latency = time.perf_counter() - start
+        elapsed += latency
+        latencies.append(latency)
+        valid_requests += is_valid
+    
+    ordered = sorted(latencies)
+    return {
+        "scenario": name,
+        "method": method,
+        "records": record_count,
+        "requests": len(latencies),
+        "valid_requests": valid_requests,
+        "seed": seed,
+        "is_community": is_community,
+        "warmup": warmup,
+        "elapsed_s": elapsed,
+        "records_per_s": record_count / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(ordered, 0.50) * 1000,
+            "p95": percentile(ordered, 0.95) * 1000,
+            "p99": percentile(ordered, 0.99) * 1000,
+        },
+        "profile": asdict(generator.profile),
+        "python": platform.python_version(),
+        "numpy": np is not None,
+    }
+
+
+def profile_allocations(
+    name: str,
+    record_count: int,
+    seed: int = 0,
+    method: str = "on_validate_input",
+    is_community: bool = False,
+    compile_forms: bool = True,
+    profile: Optional[WorkloadProfile] = None,
+    top: int = 5
+) -> Dict[str, Any]:
+    """
+    Measures the memory validation of one large list allocates, per record
+    
+    The list is validated once untraced so compiled layouts and the value
+    cache are warm, then again under ``tracemalloc``. Peak bytes are the
+    most memory held at once above the starting point (temporary lists,
+    outcome tuples, messages); retained bytes and blocks are what is still
+    allocated afterwards, e.g. error messages built for the models. CPython
+    free lists keep up to a few thousand freed small objects, which count
+    as retained, so measure at least 10k records.
+    
+    Args:
+        name: Workload name for the report
+        record_count: Investigations in the list
+        seed: Workload seed
+        method: Key of METHODS to measure
+        is_community: Whether the validator runs for community users
+        compile_forms: Whether the validator may use compiled form layouts
+        profile: Workload shape
+        top: Allocation sites in investigation_validator to list
+        
+    Returns:
+        Dict[str, Any]: JSON-serializable report
+    """
+    generator = WorkloadGenerator(seed, profile)
+    server_data = [generator.investigation() for _ in range(record_count)]
+    validator = InvestigationValidator(is_community=is_community, compile_forms=compile_forms)
+    validate = METHODS[method]
+    validate(validator, False, server_data)
+    
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        gc.collect()
+        before = tracemalloc.take_snapshot()
+        start_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        validate(validator, False, server_data)
+        end_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started:
+            tracemalloc.stop()
+    
+    validator_file = sys.modules[InvestigationValidator.__module__].__file__
+    only_validator = [tracemalloc.Filter(True, validator_file)]
+    sites = after.filter_traces(only_validator).compare_to(before.filter_traces(only_validator), "lineno")
+    sites = sorted(sites, key=lambda stat: stat.size_diff, reverse=True)[:top]
+    retained_blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return {
+        "workload": name,
+        "method": method,
+        "records": record_count,
+        "seed": seed,
+        "is_community": is_community,
+        "compile_forms": compile_forms,
+        "peak_bytes_per_record": (peak_bytes - start_bytes) / record_count,
+        "retained_bytes_per_record": (end_bytes - start_bytes) / record_count,
+        "retained_blocks_per_record": retained_blocks / record_count,
+        "top_sites": [
+            {
+                "site": f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                "size_diff": stat.size_diff,
+                "count_diff": stat.count_diff,
+            }
+            for stat in sites
+        ],
+        "profile": asdict(generator.profile),
+        "python": platform.python_version(),
+    }
+
+
+def check_allocation_budgets(reports: List[Dict[str, Any]], budgets: Dict[str, Dict[str, float]]) -> List[str]:
+    """
+    Finds allocation reports above their stored budgets
+    
+    Args:
+        reports: Reports returned by ``profile_allocations``
+        budgets: Per workload name, the maximum of each ``*_per_record`` metric
+        
+    Returns:
+        List[str]: One message per exceeded budget, empty if none
+    """
+    violations = []
+    for report in reports:
+        for metric, limit in budgets.get(report["workload"], {}).items():
+            if report[metric] > limit:
+                violations.append(f"{report['workload']} {metric}: {report[metric]:.1f} exceeds budget {limit:.1f}")
+    return violations
+
+
+def gil_enabled() -> bool:
+    """Whether the interpreter runs with the GIL (always True before free-threaded builds)"""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled() if is_gil_enabled is not None else True
+
+
+def run_thread_scaling(
+    name: str,
+    record_count: int,
+    thread_counts: List[int],
+    seed: int = 0,
+    is_community: bool = False,
+    profile: Optional[WorkloadProfile] = None,
+    repeat: int = 3
+) -> List[Dict[str, Any]]:
+    """
+    Measures ThreadedValidationEngine on one large list at several pool sizes
+    
+    The list is generated once and validated ``repeat`` times per pool size,
+    keeping the fastest run; speedups are relative to a serial
+    ``on_validate_input`` run on the same list.
+    
+    Args:
+        name: Scenario name for the report
+        record_count: Investigations in the list
+        thread_counts: Pool sizes to measure
+        seed: Workload seed
+        is_community: Whether the validator runs for community users
+        profile: Workload shape
+        repeat: Runs per pool size
+        
+    Returns:
+        List[Dict[str, Any]]: One JSON-serializable report per pool size
+    """
+    generator = WorkloadGenerator(seed, profile)
+    server_data = [generator.investigation() for _ in range(record_count)]
+    validator = InvestigationValidator(is_community=is_community)
+    
+    def fastest(validate: Callable[[], bool]) -> float:
+        validate()  # compiles every layout before timing
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            validate()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+    
+    serial = fastest(lambda: validator.on_validate_input(False, server_data))
+    reports = []
+    for threads in thread_counts:
+        with ThreadedValidationEngine(validator, max_workers=threads) as engine:
+            elapsed = fastest(lambda: engine.validate(False, server_data))
+        reports.append({
+            "scenario": name,
+            "method": "threaded",
+            "threads": threads,
+            "records": record_count,
+            "seed": seed,
+            "is_community": is_community,
+            "elapsed_s": elapsed,
+            "records_per_s": record_count / elapsed if elapsed else 0.0,
+            "serial_records_per_s": record_count / serial if serial else 0.0,
+            "speedup": serial / elapsed if elapsed else 0.0,
+            "gil_enabled": gil_enabled(),
+            "cpu_count": os.cpu_count(),
+            "profile": asdict(generator.profile),
+            "python": platform.python_version(),
+        })
+    return reports
+
+
+def compare_reports(
+    current: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    tolerance: float = 0.1
+) -> List[str]:
+    """
+    Finds throughput regressions against a baseline run
+    
+    Args:
+        current: Reports of this run
+        baseline: Reports of the reference run
+        tolerance: Allowed relative throughput drop
+        
+    Returns:
+        List[str]: One message per regressed scenario, empty if none
+    """
+    def key(report: Dict[str, Any]) -> Tuple[Any, ...]:
+        return report["scenario"], report["method"], report["is_community"], report["seed"]
+    
+    reference = {key(report): report for report in baseline}
+    regressions = []
+    for report in current:
+        previous = reference.get(key(report))
+        if previous is None or not previous["records_per_s"]:
+            continue
+        change = report["records_per_s"] / previous["records_per_s"] - 1
+        if change < -tolerance:
+            regressions.append(
+                f"{report['scenario']} {report['method']}: {report['records_per_s']:.0f} records/s, "
+                f"{-change:.1%} below baseline {previous['records_per_s']:.0f}"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point
+    
+    Args:
+        argv: Arguments without the program name
+        
+    Returns:
+        int: 0 on success, 1 if a scenario regressed against the baseline or
+        exceeded an allocation budget
+    """
+    parser = argparse.ArgumentParser(description="Benchmark investigation validation on synthetic workloads")
+    parser.add_argument(
+        "--scenario", action="append", choices=list(SCENARIOS),
+        help="scenario to run, repeatable (default: 1, 1k and 100k)"
+    )
+    parser.add_argument("--method", action="append", choices=list(METHODS), help="entry point to measure, repeatable")
+    parser.add_argument("--seed", type=int, default=0, help="workload seed")
+    parser.add_argument("--community", action="store_true", help="validate as a community user")
+    parser.add_argument("--copy-layouts", action="store_true", help="give every investigation its own layout list")
+    parser.add_argument("-o", "--output", default="-", help="JSON report file, '-' for stdout")
+    parser.add_argument("--baseline", help="JSON report of a previous run to compare throughput against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative throughput drop")
+    parser.add_argument(
+        "--threads", action="append", type=int,
+        help="measure ThreadedValidationEngine scaling with this many threads instead, repeatable"
+    )
+    parser.add_argument(
+        "--allocations", action="store_true",
+        help="profile per-record allocations of the standard workloads instead (default scenario: 10k)"
+    )
+    parser.add_argument("--budgets", help="JSON allocation budgets to check --allocations reports against")
+    args = parser.parse_args(argv)
+    
+    profile = WorkloadProfile(copy_layouts=args.copy_layouts)
+    if args.allocations:
+        reports = [
+            profile_allocations(workload, SCENARIOS[name], args.seed, profile=profile, **options)
+            for name in args.scenario or ["10k"]
+            for workload, options in ALLOCATION_WORKLOADS.items()
+        ]
+    elif args.threads:
+        reports = [
+            report
+            for name in args.scenario or ["100k"]
+            for report in run_thread_scaling(name, SCENARIOS[name], args.threads, args.seed, args.community, profile)
+        ]
+    else:
+        reports = [
+            run_scenario(name, SCENARIOS[name], args.seed, method, args.community, profile)
+            for name in args.scenario or ["1", "1k", "100k"]
+            for method in args.method or ["on_validate_input"]
+        ]
+    text = json.dumps(reports, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
+    
+    if args.budgets:
+        with open(args.budgets, encoding="utf-8") as budgets:
+            violations = check_allocation_budgets(reports, json.load(budgets))
+        for message in violations:
+            print(f"over budget: {message}", file=sys.stderr)
+        if violations:
+            return 1
+    
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline:
+            regressions = compare_reports(reports, json.load(baseline), args.tolerance)
+        for message in regressions:
+            print(f"regression: {message}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Investigation Validator Command Line
+
+Validates NDJSON investigations from a file or stdin, or runs the validation
+server.
+
+Usage:
+    python -m investigation_validator investigations.ndjson -o outcomes.ndjson
+    python -m investigation_validator --lab-tech < investigations.ndjson
+    python -m investigation_validator --serve 127.0.0.1:8765
+"""
+
+from typing import List, Optional
+import argparse
+import asyncio
+import sys
+
+from investigation_validator import DEFAULT_SPOOL_BYTES, validate_ndjson, ValidationError
+from investigation_server import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT, serve
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point: ``python -m investigation_validator``
+    
+    Args:
+        argv: Arguments without the program name
+        
+    Returns:
+        int: 0 if all investigations are valid, 1 if not, 2 on bad input or files that cannot be opened
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m investigation_validator",
+        description="Validate NDJSON investigations and write NDJSON outcomes"
+    )
+    parser.add_argument("input", nargs="?", default="-", help="NDJSON input file, '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="NDJSON output file, '-' for stdout")
+    parser.add_argument("--lab-tech", action="store_true", help="validate as a lab technician")
+    parser.add_argument("--community", action="store_true", help="validate as a community user")
+    parser.add_argument(
+        "--spool-bytes", type=int, default=DEFAULT_SPOOL_BYTES,
+        help="memory used for the lab technician look-ahead before spilling to disk"
+    )
+    parser.add_argument("--serve", metavar="HOST:PORT", help="run the validation server instead of reading input")
+    parser.add_argument(
+        "--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE, help="most requests the server validates together"
+    )
+    parser.add_argument(
+        "--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT * 1000,
+        help="milliseconds the server waits to fill a batch"
+    )
+    args = parser.parse_args(argv)
+    
+    if args.serve:
+        host, _, port = args.serve.rpartition(":")
+        try:
+            asyncio.run(serve(
+                host or "127.0.0.1", int(port), args.community, args.max_batch_size, args.max_wait_ms / 1000
+            ))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    
+    source = output = None
+    try:
+        source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+        output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        is_valid = validate_ndjson(source, output, args.lab_tech, args.community, args.spool_bytes)
+    except (OSError, ValueError, ValidationError) as e:
+        print(f"investigation_validator: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if source is not None and source is not sys.stdin:
+            source.close()
+        if output is not None and output is not sys.stdout:
+            output.close()
+    return 0 if is_valid else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
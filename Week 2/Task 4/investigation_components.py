@@ -0,0 +1,250 @@
+"""
+Investigation Components
+
+ComponentTable holds the component rows of Kotlin's parseComponents output
+as interned columns.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
+from array import array
+import sys
+
+from investigation_validator import np
+
+
+# Keys of a Kotlin component map, as read by parseComponents
+COMPONENT_KEYS = ("TestName", "Result", "Uom", "Description")
+
+
+class ComponentRow:
+    """
+    Read-only view of one component in a ComponentTable
+    
+    Stands in for a Kotlin LabTestResultModel row without copying the
+    component out of the table's columns.
+    """
+    
+    __slots__ = ("_table", "_index")
+    
+    def __init__(self, table: "ComponentTable", index: int):
+        self._table = table
+        self._index = index
+    
+    test_name = property(lambda self: self._table._string(self._table._test_names[self._index]))
+    result = property(lambda self: self._table._results[self._index])
+    uom = property(lambda self: self._table._string(self._table._units[self._index]))
+    description = property(lambda self: self._table._string(self._table._descriptions[self._index]))
+    
+    @property
+    def has_result(self) -> bool:
+        """Whether the component has a non-blank result"""
+        return bool(self._table._result_flags[self._index])
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Rebuilds the component map with COMPONENT_KEYS"""
+        return dict(zip(COMPONENT_KEYS, (self.test_name, self.result, self.uom, self.description)))
+    
+    def __repr__(self) -> str:
+        return f"ComponentRow(index={self._index}, test_name={self.test_name!r}, result={self.result!r})"
+
+
+class ComponentTable:
+    """
+    Column-oriented lab result components of many reports
+    
+    Each component map (TestName, Result, Uom, Description) becomes one row.
+    Test names, units and descriptions are interned into a shared string pool
+    and stored as array('i') indexes (-1 for a missing value), results stay
+    as given, and a byte column marks rows with a non-blank result. Reports
+    are contiguous row ranges recorded by offset, so components can be
+    appended report by report while streaming.
+    """
+    
+    def __init__(self, reports: Iterable[Iterable[Dict[str, Any]]] = ()):
+        """
+        Initialize the table
+        
+        Args:
+            reports: Component maps per report
+        """
+        self._strings: List[Any] = []
+        # Keyed by (type, value) so 1, 1.0 and True keep their own entries
+        self._string_indexes: Dict[Tuple[type, Any], int] = {}
+        self._test_names = array("i")
+        self._units = array("i")
+        self._descriptions = array("i")
+        self._results: List[Any] = []
+        self._result_flags = bytearray()
+        self._offsets = array("q", [0])
+        self.extend(reports)
+    
+    def _intern(self, value: Any) -> int:
+        if value is None:
+            return -1
+        key = (type(value), value)
+        index = self._string_indexes.get(key)
+        if index is None:
+            index = self._string_indexes[key] = len(self._strings)
+            self._strings.append(sys.intern(value) if type(value) is str else value)
+        return index
+    
+    def _string(self, index: int) -> Any:
+        return self._strings[index] if index >= 0 else None
+    
+    def append_report(self, components: Iterable[Dict[str, Any]]) -> int:
+        """
+        Appends the components of one report
+        
+        Args:
+            components: Component maps; missing keys are stored as None
+            
+        Returns:
+            int: Index of the report
+            
+        Raises:
+            AttributeError: When a component is not a dict
+            TypeError: When a test name, unit or description is unhashable
+            BufferError: When a ``result_flags`` view is still alive; nothing is appended
+        """
+        # The rollback below must be able to resize the flags column, so
+        # refuse up front instead of failing halfway through a report
+        flags = self._result_flags
+        try:
+            flags.append(0)
+        except BufferError:
+            raise BufferError(
+                "ComponentTable cannot grow while a result_flags view is alive; release it first"
+            ) from None
+        del flags[-1]
+        intern = self._intern
+        start = len(self._results)
+        try:
+            for component in components:
+                get = component.get
+                result = get("Result")
+                test_name, unit, description = intern(get("TestName")), intern(get("Uom")), intern(get("Description"))
+                self._test_names.append(test_name)
+                self._units.append(unit)
+                self._descriptions.append(description)
+                self._results.append(result)
+                self._result_flags.append(result is not None and not (type(result) is str and not result.strip()))
+        except Exception:
+            # A report is appended whole or not at all
+            for column in (self._test_names, self._units, self._descriptions, self._results, self._result_flags):
+                del column[start:]
+            raise
+        self._offsets.append(len(self._results))
+        return len(self._offsets) - 2
+    
+    def extend(self, reports: Iterable[Iterable[Dict[str, Any]]]) -> None:
+        """
+        Appends several reports
+        
+        Args:
+            reports: Component maps per report
+        """
+        for components in reports:
+            self.append_report(components)
+    
+    def __len__(self) -> int:
+        return len(self._results)
+    
+    def __getitem__(self, index: int) -> ComponentRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("component index out of range")
+        return ComponentRow(self, index)
+    
+    def __iter__(self) -> Iterator[ComponentRow]:
+        for index in range(len(self)):
+            yield ComponentRow(self, index)
+    
+    @property
+    def report_count(self) -> int:
+        """Number of reports appended"""
+        return len(self._offsets) - 1
+    
+    @property
+    def string_count(self) -> int:
+        """Distinct test names, units and descriptions in the pool"""
+        return len(self._strings)
+    
+    @property
+    def result_flags(self) -> memoryview:
+        """
+        Zero-copy byte column, 1 where a row has a non-blank result
+        
+        The table cannot grow while the view (or a numpy array over it) is
+        alive; ``append_report`` raises BufferError until it is released.
+        """
+        return memoryview(self._result_flags)
+    
+    def report_rows(self, report: int) -> range:
+        """
+        Row positions of one report
+        
+        Args:
+            report: Report index
+            
+        Returns:
+            range: Rows of the report's components
+        """
+        if report < 0:
+            report += self.report_count
+        if not 0 <= report < self.report_count:
+            raise IndexError("report index out of range")
+        return range(self._offsets[report], self._offsets[report + 1])
+    
+    def report(self, report: int) -> List[ComponentRow]:
+        """
+        Views of one report's components
+        
+        Args:
+            report: Report index
+            
+        Returns:
+            List[ComponentRow]: One view per component, in order
+        """
+        return [ComponentRow(self, index) for index in self.report_rows(report)]
+    
+    def has_valid_entries(self, report: int) -> bool:
+        """
+        Checks whether a report has at least one component with a result
+        
+        Args:
+            report: Report index
+            
+        Returns:
+            bool: True if any component result is non-blank
+        """
+        rows = self.report_rows(report)
+        return self._result_flags.find(1, rows.start, rows.stop) >= 0
+    
+    def valid_reports(self) -> List[bool]:
+        """
+        Runs ``has_valid_entries`` for every report at once
+        
+        Returns:
+            List[bool]: One flag per report, in order
+        """
+        find = self._result_flags.find
+        offsets = self._offsets
+        return [find(1, offsets[report], offsets[report + 1]) >= 0 for report in range(self.report_count)]
+    
+    def empty_result_rows(self, report: Optional[int] = None) -> List[int]:
+        """
+        Lists the components whose result is missing or blank
+        
+        Args:
+            report: Report to restrict to, every row if None
+            
+        Returns:
+            List[int]: Row positions, ascending
+        """
+        rows = self.report_rows(report) if report is not None else range(len(self))
+        flags = self._result_flags
+        if np is not None:
+            column = np.frombuffer(flags, dtype=np.uint8)[rows.start:rows.stop] if flags else np.empty(0, np.uint8)
+            return (np.flatnonzero(column == 0) + rows.start).tolist()
+        return [index for index in rows if not flags[index]]
@@ -0,0 +1,254 @@
+"""
+Investigation Delta Validation
+
+DeltaValidator keeps each investigation's last outcome in SQLite, keyed by
+investigation id, and re-validates only the investigations whose results or
+form layout changed since the previous run.
+"""
+
+from typing import Dict, List, Optional, Any, Tuple
+import hashlib
+import sqlite3
+
+from investigation_validator import (
+    ErrorCode, FormLayout, FormOutcome, InvestigationModel, InvestigationValidator, SHARED_FORM_LIMIT,
+    ValidationError, _ATOMIC_TYPES, _fingerprint, _IdentityCache
+)
+
+
+# Bump when a field rule changes so outcomes stored by DeltaValidator are not reused
+DELTA_RULES_VERSION = "1"
+DELTA_QUERY_CHUNK = 500  # ids per SELECT, below SQLite's bound parameter limit
+
+
+class DeltaValidator:
+    """
+    Validates re-synced investigation lists, reusing outcomes of unchanged records
+    
+    A local SQLite store keeps the latest form outcome per investigation id
+    with a digest of the rules version, the fingerprint of the form layout
+    fields the rules read and the result map. Records whose digest is
+    unchanged get their stored outcome applied instead of re-running the
+    field rules; the lab technician pre-pass, resets and the overall result
+    run as in ``on_validate_input``, so results and model updates are
+    identical.
+    """
+    
+    def __init__(
+        self,
+        validator: Optional[InvestigationValidator] = None,
+        path: str = ":memory:",
+        rules_version: str = DELTA_RULES_VERSION
+    ):
+        """
+        Initialize the validator and open its store
+        
+        Args:
+            validator: Validator whose rules are applied; a default one if None
+            path: SQLite database file, ``:memory:`` for a private in-memory store
+            rules_version: Part of every digest; stored outcomes of other versions are not reused
+        """
+        self.validator = validator or InvestigationValidator()
+        self.rules_version = rules_version
+        self.hits = 0
+        self.misses = 0
+        self._fingerprints: Dict[Tuple[Tuple[Any, ...], ...], str] = {}
+        self._connection = sqlite3.connect(path)
+        # Distinct outcomes are few, so investigations reference them by row id
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS form_outcomes ("
+            "outcome INTEGER PRIMARY KEY, passed INTEGER NOT NULL, error_message TEXT, "
+            "data_error INTEGER, error_code TEXT, field_id TEXT)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS investigations ("
+            "id TEXT PRIMARY KEY, digest BLOB NOT NULL, outcome INTEGER NOT NULL)"
+        )
+        self._connection.commit()
+        self._outcomes: Dict[int, FormOutcome] = {}
+        self._outcome_ids: Dict[FormOutcome, int] = {}
+        self._load_outcomes()
+    
+    def close(self) -> None:
+        """Closes the store"""
+        self._connection.close()
+    
+    def __enter__(self) -> "DeltaValidator":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+    
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM investigations").fetchone()[0]
+    
+    def on_validate_input(self, is_lab_tech: bool, server_data: Optional[List[InvestigationModel]]) -> bool:
+        """
+        Validates investigation input data, skipping records unchanged since they were stored
+        
+        Args:
+            is_lab_tech: Whether the user is a lab technician
+            server_data: List of investigation models to validate
+            
+        Returns:
+            bool: Same result as ``InvestigationValidator.on_validate_input``
+            
+        Raises:
+            ValidationError: When validation logic encounters critical errors
+        """
+        validator = self.validator
+        # Overridden rules may read more than the result map and layout
+        if server_data is None or not validator._has_default_field_rules():
+            return validator.on_validate_input(is_lab_tech, server_data)
+        
+        try:
+            is_valid = True
+            
+            if is_lab_tech and not validator._validate_lab_tech_results(server_data):
+                is_valid = False
+            
+            filtered_investigations = [
+                data for data in server_data
+                if data.id is None or (data.result_hash_map is not None and len(data.result_hash_map) > 0)
+            ]
+            
+            fingerprints = _IdentityCache()
+            digests = [self._digest(data, fingerprints) for data in filtered_investigations]
+            stored = self._load_investigations([
+                data.id for data, digest in zip(filtered_investigations, digests) if digest is not None
+            ])
+            
+            use_compiled = validator._can_use_compiled_forms()
+            outcomes = self._outcomes
+            updates = []
+            for data, digest in zip(filtered_investigations, digests):
+                if digest is None:
+                    event = validator._validate_filtered_investigation(data, use_compiled)
+                    if event is not None:
+                        is_valid = event
+                    continue
+                
+                row = stored.get(data.id)
+                outcome = outcomes.get(row[1]) if row is not None and row[0] == digest else None
+                if outcome is not None:
+                    self.hits += 1
+                else:
+                    validate = validator._compiled_form(data.result_list.form_layout) if use_compiled else None
+                    outcome = validate(data.result_hash_map) if validate is not None else validator._interpret_form(data)
+                    self.misses += 1
+                    outcome_id = self._outcome_id(outcome)
+                    if outcome_id is not None:
+                        updates.append((data.id, digest, outcome_id))
+                if not validator._apply_form_outcome(data, outcome):
+                    is_valid = False
+            
+            if updates:
+                self._connection.executemany("INSERT OR REPLACE INTO investigations VALUES (?, ?, ?)", updates)
+            self._connection.commit()
+            return is_valid
+        
+        except Exception as e:
+            validator.logger.error(f"Validation error: {str(e)}")
+            raise ValidationError(f"Validation failed: {str(e)}")
+    
+    def _digest(self, data: InvestigationModel, fingerprints: _IdentityCache) -> Optional[bytes]:
+        """
+        Computes the stored-outcome digest of a filtered investigation
+        
+        Args:
+            data: Investigation that passed the id/result filter
+            fingerprints: Per-call layout fingerprints
+            
+        Returns:
+            Optional[bytes]: Digest, or None when the record resets the
+            result or cannot be stored (no string id, unsupported values)
+        """
+        result_hash_map = data.result_hash_map
+        if type(data.id) is not str or not result_hash_map \
+                or not (data.result_list and hasattr(data.result_list, 'form_layout')):
+            return None
+        
+        fingerprint = fingerprints.lookup(data.result_list.form_layout, self._layout_fingerprint)
+        if fingerprint is None:
+            return None
+        
+        # The repr of plain scalars is stable and keeps "10", 10, 10.0 and True
+        # apart, as the rules do; other objects may repr differently per process.
+        # Key order is part of the digest, which only costs a miss on reordering.
+        if not (_ATOMIC_TYPES.issuperset(map(type, result_hash_map))
+                and _ATOMIC_TYPES.issuperset(map(type, result_hash_map.values()))):
+            return None
+        digest = hashlib.blake2b(f"{self.rules_version}\0{fingerprint}\0".encode("utf-8"), digest_size=16)
+        digest.update(repr(result_hash_map).encode("utf-8", "surrogatepass"))
+        return digest.digest()
+    
+    def _layout_fingerprint(self, form_layout: List[FormLayout]) -> Optional[str]:
+        """Fingerprint of the rule-relevant layout fields, None when the layout has no key"""
+        key = self.validator._form_key(form_layout)
+        if key is None:
+            return None
+        fingerprint = self._fingerprints.get(key)
+        if fingerprint is None:
+            if len(self._fingerprints) >= SHARED_FORM_LIMIT:
+                self._fingerprints.clear()
+            fingerprint = self._fingerprints[key] = _fingerprint(key)
+        return fingerprint
+    
+    def _load_outcomes(self) -> None:
+        """Reads the distinct stored outcomes"""
+        for outcome_id, passed, error_message, data_error, error_code, field_id in self._connection.execute(
+            "SELECT * FROM form_outcomes"
+        ):
+            outcome = (
+                bool(passed),
+                error_message,
+                bool(data_error) if data_error is not None else None,
+                ErrorCode(error_code) if error_code is not None else None,
+                field_id,
+            )
+            self._outcomes[outcome_id] = outcome
+            self._outcome_ids[outcome] = outcome_id
+    
+    def _outcome_id(self, outcome: FormOutcome) -> Optional[int]:
+        """
+        Returns the stored row id of an outcome, storing it if new
+        
+        Args:
+            outcome: Form outcome to store
+            
+        Returns:
+            Optional[int]: Row id, None if the outcome cannot be stored
+        """
+        outcome_id = self._outcome_ids.get(outcome)
+        if outcome_id is None:
+            passed, error_message, data_error, error_code, field_id = outcome
+            if not (field_id is None or type(field_id) is str) \
+                    or not (error_message is None or type(error_message) is str):
+                return None
+            outcome_id = self._connection.execute(
+                "INSERT INTO form_outcomes (passed, error_message, data_error, error_code, field_id) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (passed, error_message, data_error, error_code.value if error_code is not None else None, field_id)
+            ).lastrowid
+            self._outcomes[outcome_id] = outcome
+            self._outcome_ids[outcome] = outcome_id
+        return outcome_id
+    
+    def _load_investigations(self, ids: List[str]) -> Dict[str, Tuple[bytes, int]]:
+        """
+        Reads stored digests and outcome ids
+        
+        Args:
+            ids: Investigation ids to look up
+            
+        Returns:
+            Dict[str, Tuple[bytes, int]]: (digest, outcome id) per stored id
+        """
+        stored = {}
+        for start in range(0, len(ids), DELTA_QUERY_CHUNK):
+            chunk = ids[start:start + DELTA_QUERY_CHUNK]
+            rows = self._connection.execute(
+                f"SELECT id, digest, outcome FROM investigations WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            stored.update({row[0]: row[1:] for row in rows})
+        return stored
@@ -0,0 +1,774 @@
+"""
+Investigation Result Indexes
+
+Reference range flagging, indexed queries over result values and unit
+conversion for investigations validated by investigation_validator.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Any, Tuple
+from functools import lru_cache
+from itertools import chain
+from array import array
+from bisect import bisect_left, bisect_right
+import logging
+
+from investigation_validator import (
+    CompactFormLayout, InvestigationModel, np, ReferenceRange, ValidationError, _COLUMN_NUMBER_TYPES, _freeze,
+    _IdentityCache, _normalize_str, _unit_key
+)
+
+
+BOTH_GENDERS = "both"
+RANGE_INDEX_CACHE_SIZE = 1024
+UNIT_TABLE_CACHE_SIZE = 1024
+QUERY_INDEX_INSERT_LIMIT = 16  # up to this many pending values are inserted in place
+
+
+class RangeFlag(NamedTuple):
+    """Reference range check of one result value"""
+    field_id: str
+    value: Any
+    unit: Any
+    reference_range: ReferenceRange
+    is_abnormal: bool
+
+
+def _fold(value: Any) -> Any:
+    """Kotlin ``equals(other, ignoreCase = true)`` key for unit and gender values"""
+    return value.lower() if type(value) is str else value
+
+
+def _range_number(value: Any) -> Optional[float]:
+    """Numeric value of a result, or None where Kotlin's toDoubleOrNull() yields null"""
+    if type(value) is str:
+        return _normalize_str(value).number
+    if type(value) is int or type(value) is float:
+        try:
+            return float(value)
+        except OverflowError:
+            return None
+    return None
+
+
+class ReferenceRangeIndex:
+    """
+    Reference ranges of one form, indexed by (field id, unit, gender)
+    
+    Kotlin's renderInvestigationResultViewContainer filters ``formData.ranges``
+    for every result and uses the first range whose unit matches and whose
+    gender is the patient's or ``both``. The index keeps the position of the
+    first range per key, so a lookup returns that same range.
+    """
+    
+    __slots__ = ("_fields",)
+    
+    def __init__(self, form_layout: Iterable[Any]):
+        """
+        Builds the index for a form layout
+        
+        Args:
+            form_layout: FormLayout or CompactFormLayout fields
+        """
+        self._fields: Dict[Any, Dict[Tuple[Any, Any], Tuple[int, ReferenceRange]]] = {}
+        seen = set()
+        for form_data in form_layout:
+            # Kotlin only looks at the first field with a given id
+            if form_data.id in seen:
+                continue
+            seen.add(form_data.id)
+            if not form_data.ranges:
+                continue
+            ranges: Dict[Tuple[Any, Any], Tuple[int, ReferenceRange]] = {}
+            for position, reference_range in enumerate(form_data.ranges):
+                ranges.setdefault(
+                    (_fold(reference_range.unit_type), _fold(reference_range.gender)),
+                    (position, reference_range)
+                )
+            self._fields[form_data.id] = ranges
+    
+    def __len__(self) -> int:
+        return len(self._fields)
+    
+    @property
+    def field_ids(self) -> Tuple[Any, ...]:
+        """Ids of the fields that have reference ranges"""
+        return tuple(self._fields)
+    
+    def lookup(self, field_id: Any, unit: Any, gender: Optional[str]) -> Optional[ReferenceRange]:
+        """
+        Finds the reference range for a result
+        
+        Args:
+            field_id: Form field id of the result
+            unit: Selected unit, compared with ``unit_type`` ignoring case
+            gender: Patient gender, compared with ``gender`` ignoring case
+            
+        Returns:
+            Optional[ReferenceRange]: First matching range, None if there is none
+        """
+        ranges = self._fields.get(field_id)
+        if ranges is None:
+            return None
+        unit = _fold(unit)
+        match = ranges.get((unit, _fold(gender)))
+        both = ranges.get((unit, BOTH_GENDERS))
+        if both is not None and (match is None or both[0] < match[0]):
+            match = both
+        return match[1] if match is not None else None
+
+
+def _range_layout_key(form_layout: Iterable[Any]) -> Tuple[Any, ...]:
+    """Hashable key of the fields and ranges a ReferenceRangeIndex depends on"""
+    return tuple(
+        (form_data.id, tuple(form_data.ranges) if form_data.ranges else None)
+        for form_data in form_layout
+    )
+
+
+@lru_cache(maxsize=RANGE_INDEX_CACHE_SIZE)
+def _range_index_for_key(key: Tuple[Any, ...]) -> ReferenceRangeIndex:
+    # The key carries everything the index reads, in the same shape
+    return ReferenceRangeIndex(
+        CompactFormLayout(view_type=None, id=field_id, title=None, ranges=ranges) for field_id, ranges in key
+    )
+
+
+def reference_range_index(form_layout: Iterable[Any]) -> ReferenceRangeIndex:
+    """
+    Returns the cached ReferenceRangeIndex for a form layout
+    
+    Args:
+        form_layout: FormLayout or CompactFormLayout fields
+        
+    Returns:
+        ReferenceRangeIndex: Index shared by every form with the same ranges
+    """
+    return _range_index_for_key(_range_layout_key(form_layout))
+
+
+class ReferenceRangeEngine:
+    """
+    Flags results that fall outside their gender- and unit-specific reference range
+    
+    The patient gender is set once, like Kotlin's setPatientGender, and applies
+    to every record until it is changed. The unit of a result is read from its
+    ``<id>_unit`` entry in ``result_hash_map``.
+    """
+    
+    def __init__(self, gender: Optional[str] = None):
+        """
+        Initialize the engine
+        
+        Args:
+            gender: Patient gender used to select reference ranges
+        """
+        self.gender = gender
+        self.logger = logging.getLogger(__name__)
+    
+    def set_patient_gender(self, gender: Optional[str]) -> None:
+        """
+        Sets the patient gender used to select reference ranges
+        
+        Args:
+            gender: Patient gender, compared with range genders ignoring case
+        """
+        self.gender = gender
+    
+    def flag_investigation(
+        self, 
+        data: InvestigationModel, 
+        index: Optional[ReferenceRangeIndex] = None
+    ) -> List[RangeFlag]:
+        """
+        Checks every result of an investigation against its reference range
+        
+        Args:
+            data: Investigation data
+            index: Prebuilt index for the investigation's form layout
+            
+        Returns:
+            List[RangeFlag]: One flag per result with a matching range; a
+            value that is not numeric is never abnormal, as in Kotlin
+            
+        Raises:
+            ValidationError: If the reference ranges cannot be evaluated
+        """
+        result_hash_map = data.result_hash_map
+        if not result_hash_map:
+            return []
+        try:
+            if index is None:
+                result_list = data.result_list
+                if not result_list or getattr(result_list, 'form_layout', None) is None:
+                    return []
+                index = reference_range_index(result_list.form_layout)
+            
+            flags = []
+            for field_id in index.field_ids:
+                if field_id not in result_hash_map:
+                    continue
+                value = result_hash_map[field_id]
+                unit = result_hash_map.get(_unit_key(field_id))
+                reference_range = index.lookup(field_id, unit, self.gender)
+                if reference_range is None:
+                    continue
+                number = _range_number(value)
+                is_abnormal = number is not None and (
+                    number < reference_range.min_range or number > reference_range.max_range
+                )
+                flags.append(RangeFlag(field_id, value, unit, reference_range, is_abnormal))
+            return flags
+        except Exception as e:
+            self.logger.error(f"Reference range error: {str(e)}")
+            raise ValidationError(f"Reference range check failed: {str(e)}")
+    
+    def flag_batch(self, server_data: List[InvestigationModel]) -> List[List[RangeFlag]]:
+        """
+        Checks a batch of investigations against their reference ranges
+        
+        Each distinct form layout object is indexed once per call.
+        
+        Args:
+            server_data: Investigations to check
+            
+        Returns:
+            List[List[RangeFlag]]: Flags per investigation, in input order
+            
+        Raises:
+            ValidationError: If the reference ranges cannot be evaluated
+        """
+        indexes = _IdentityCache()
+        flags = []
+        for data in server_data:
+            result_list = data.result_list
+            form_layout = getattr(result_list, 'form_layout', None) if result_list else None
+            if not data.result_hash_map or form_layout is None:
+                flags.append([])
+                continue
+            flags.append(self.flag_investigation(data, indexes.lookup(form_layout, reference_range_index)))
+        return flags
+    
+    def abnormal_results(self, server_data: List[InvestigationModel]) -> List[Tuple[int, RangeFlag]]:
+        """
+        Lists the abnormal results of a batch
+        
+        Args:
+            server_data: Investigations to check
+            
+        Returns:
+            List[Tuple[int, RangeFlag]]: (investigation index, flag) per abnormal result
+        """
+        return [
+            (position, flag)
+            for position, record_flags in enumerate(self.flag_batch(server_data))
+            for flag in record_flags
+            if flag.is_abnormal
+        ]
+
+
+class _SortedValues:
+    """Numeric values of one (field id, unit, bounds) group, sorted with their investigation positions"""
+    
+    __slots__ = ("min_value", "max_value", "values", "positions", "pending")
+    
+    def __init__(self, min_value: Optional[float], max_value: Optional[float]):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.values = array("d")
+        self.positions = array("q")
+        self.pending: List[Tuple[float, int]] = []
+    
+    def sorted(self) -> Tuple[array, array]:
+        """Merges pending inserts and returns the sorted (values, positions) columns"""
+        pending = self.pending
+        if pending:
+            values, positions = self.values, self.positions
+            pending.sort()
+            if len(pending) <= QUERY_INDEX_INSERT_LIMIT:
+                # Positions only grow, so inserting after equal values keeps ties in position order
+                for value, position in pending:
+                    at = bisect_right(values, value)
+                    values.insert(at, value)
+                    positions.insert(at, position)
+            elif len(pending) < len(values):
+                # Linear merge: copy the run of sorted values up to each pending
+                # value, then the value itself
+                merged_values = array("d")
+                merged_positions = array("q")
+                start = 0
+                for value, position in pending:
+                    end = bisect_right(values, value, start)
+                    merged_values += values[start:end]
+                    merged_positions += positions[start:end]
+                    merged_values.append(value)
+                    merged_positions.append(position)
+                    start = end
+                merged_values += values[start:]
+                merged_positions += positions[start:]
+                self.values, self.positions = merged_values, merged_positions
+            else:
+                merged = sorted(chain(zip(values, positions), pending))
+                self.values = array("d", [value for value, _ in merged])
+                self.positions = array("q", [position for _, position in merged])
+            self.pending = []
+        return self.values, self.positions
+
+
+def _query_fields(form_layout: Any) -> Tuple[Tuple[Any, str, Optional[float], Optional[float]], ...]:
+    fields = []
+    seen = set()
+    for form_data in form_layout:
+        if form_data.id in seen:
+            continue
+        seen.add(form_data.id)
+        # Bounds the value range rules cannot compare numerically are ignored
+        fields.append((
+            form_data.id,
+            _unit_key(form_data.id),
+            None if type(form_data.min_value) is str else _range_number(form_data.min_value),
+            None if type(form_data.max_value) is str else _range_number(form_data.max_value),
+        ))
+    return tuple(fields)
+
+
+class ResultQueryIndex:
+    """
+    Numeric results of many investigations, sorted per (field id, unit)
+    
+    Values are grouped by field id, unit (ignoring case, like reference
+    range lookups) and the ``min_value``/``max_value`` bounds of the form
+    that recorded them, so range and out-of-bounds queries are binary
+    searches instead of scans of every ``result_hash_map``. Values that are
+    not numeric by Kotlin's toDoubleOrNull() rules, and NaN, are not
+    indexed. Inserts are buffered and merged into the sorted columns by the
+    next query.
+    
+    Queries return investigation positions (insertion order, see
+    ``__getitem__``) in ascending order.
+    """
+    
+    def __init__(self, investigations: Iterable[InvestigationModel] = ()):
+        """
+        Builds the index
+        
+        Args:
+            investigations: Validated investigations to index
+        """
+        self._investigations: List[InvestigationModel] = []
+        self._groups: Dict[Any, Dict[Tuple[Any, Optional[float], Optional[float]], _SortedValues]] = {}
+        self._layouts = _IdentityCache()
+        self.extend(investigations)
+    
+    def __len__(self) -> int:
+        return len(self._investigations)
+    
+    def __getitem__(self, position: int) -> InvestigationModel:
+        return self._investigations[position]
+    
+    def _fields(self, form_layout: Any) -> Tuple[Tuple[Any, str, Optional[float], Optional[float]], ...]:
+        """(field id, unit key, min, max) of the first field per id in a layout"""
+        return self._layouts.lookup(form_layout, _query_fields)
+    
+    def add(self, data: InvestigationModel) -> int:
+        """
+        Indexes the numeric results of one investigation
+        
+        Args:
+            data: Validated investigation
+            
+        Returns:
+            int: Position of the investigation in the index
+        """
+        position = len(self._investigations)
+        self._investigations.append(data)
+        result_hash_map = data.result_hash_map
+        result_list = data.result_list
+        form_layout = getattr(result_list, 'form_layout', None) if result_list else None
+        if not result_hash_map or form_layout is None:
+            return position
+        
+        for field_id, unit_key, min_value, max_value in self._fields(form_layout):
+            if field_id not in result_hash_map:
+                continue
+            number = _range_number(result_hash_map[field_id])
+            if number is None or number != number:
+                continue
+            groups = self._groups.get(field_id)
+            if groups is None:
+                groups = self._groups[field_id] = {}
+            key = (_fold(result_hash_map.get(unit_key)), min_value, max_value)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = _SortedValues(min_value, max_value)
+            group.pending.append((number, position))
+        return position
+    
+    def extend(self, investigations: Iterable[InvestigationModel]) -> None:
+        """
+        Indexes several investigations
+        
+        Args:
+            investigations: Validated investigations, in order
+        """
+        for data in investigations:
+            self.add(data)
+    
+    def units(self, field_id: Any) -> List[Any]:
+        """
+        Lists the units a field has indexed values in
+        
+        Args:
+            field_id: Form field id
+            
+        Returns:
+            List[Any]: Case-folded units; None for values without a unit entry
+        """
+        return list(dict.fromkeys(unit for unit, _, _ in self._groups.get(field_id, {})))
+    
+    def _select(self, field_id: Any, unit: Any) -> List[_SortedValues]:
+        groups = self._groups.get(field_id, {})
+        if unit is None:
+            return list(groups.values())
+        unit = _fold(unit)
+        return [group for (group_unit, _, _), group in groups.items() if group_unit == unit]
+    
+    def between(
+        self,
+        field_id: Any,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+        unit: Any = None
+    ) -> List[int]:
+        """
+        Finds investigations whose value of a field lies in a closed range
+        
+        Args:
+            field_id: Form field id
+            low: Smallest value to include, unbounded if None
+            high: Largest value to include, unbounded if None
+            unit: Unit to restrict to (ignoring case), every unit if None
+            
+        Returns:
+            List[int]: Matching investigation positions
+        """
+        positions: List[int] = []
+        for group in self._select(field_id, unit):
+            values, group_positions = group.sorted()
+            start = 0 if low is None else bisect_left(values, low)
+            end = len(values) if high is None else bisect_right(values, high)
+            positions.extend(group_positions[start:end])
+        positions.sort()
+        return positions
+    
+    def above_bounds(self, field_id: Any, unit: Any = None) -> List[int]:
+        """
+        Finds investigations whose value of a field exceeds its form's ``max_value``
+        
+        Args:
+            field_id: Form field id
+            unit: Unit to restrict to (ignoring case), every unit if None
+            
+        Returns:
+            List[int]: Matching investigation positions
+        """
+        return self._out_of_bounds(field_id, unit, below=False, above=True)
+    
+    def below_bounds(self, field_id: Any, unit: Any = None) -> List[int]:
+        """
+        Finds investigations whose value of a field is under its form's ``min_value``
+        
+        Args:
+            field_id: Form field id
+            unit: Unit to restrict to (ignoring case), every unit if None
+            
+        Returns:
+            List[int]: Matching investigation positions
+        """
+        return self._out_of_bounds(field_id, unit, below=True, above=False)
+    
+    def out_of_bounds(self, field_id: Any, unit: Any = None) -> List[int]:
+        """
+        Finds investigations whose value of a field is outside its form's bounds
+        
+        Uses the same strict comparisons as the value range rules.
+        
+        Args:
+            field_id: Form field id
+            unit: Unit to restrict to (ignoring case), every unit if None
+            
+        Returns:
+            List[int]: Matching investigation positions
+        """
+        return self._out_of_bounds(field_id, unit, below=True, above=True)
+    
+    def _out_of_bounds(self, field_id: Any, unit: Any, below: bool, above: bool) -> List[int]:
+        positions: List[int] = []
+        for group in self._select(field_id, unit):
+            values, group_positions = group.sorted()
+            end = 0
+            if below and group.min_value is not None:
+                end = bisect_left(values, group.min_value)
+                positions.extend(group_positions[:end])
+            if above and group.max_value is not None:
+                # max(...) keeps a value under min_value and over max_value from being listed twice
+                positions.extend(group_positions[max(end, bisect_right(values, group.max_value)):])
+        positions.sort()
+        return positions
+
+
+class UnitConverter:
+    """
+    Converts result values to one canonical unit per field before range checks
+    
+    Factors are registered per field id, since e.g. mg/dL to mmol/L depends on
+    the analyte, and the form's ``min_value``/``max_value`` are read in the
+    canonical unit. Selected units are resolved by unit_list id or by unit
+    name, ignoring case. Each layout's table of (field id, selected unit) to
+    factor is built once and cached, so a batch check is one multiplication
+    and one comparison per value of a field column.
+    
+    The converter is not wired into InvestigationValidator: its value range
+    rules, interpreted and compiled, compare the number as entered, as the
+    Kotlin app does, so a value entered in another unit can pass validation
+    and still be flagged here. Run ``check_ranges`` next to validation where
+    unit-aware checks are needed. Fields without registered factors are
+    compared as entered.
+    """
+    
+    def __init__(self, conversions: Optional[Dict[Any, Tuple[str, Dict[str, float]]]] = None):
+        """
+        Initialize the converter
+        
+        Args:
+            conversions: Per field id, the canonical unit and the factor that
+                converts each other unit to it
+        """
+        self._conversions: Dict[Any, Tuple[str, Dict[Any, float]]] = {}
+        self._tables: Dict[Tuple[Any, ...], Dict[Any, Dict[Any, float]]] = {}
+        for field_id, (canonical_unit, factors) in (conversions or {}).items():
+            self.register(field_id, canonical_unit, factors)
+    
+    def register(self, field_id: Any, canonical_unit: str, factors: Dict[str, float]) -> None:
+        """
+        Registers the conversions of one field
+        
+        Args:
+            field_id: Form field id
+            canonical_unit: Unit values are converted to
+            factors: Multiplier from each other unit to the canonical unit,
+                e.g. ``{"mg/dL": 1 / 18.016}`` for glucose in mmol/L
+                
+        Raises:
+            ValueError: When a factor is not a finite non-zero number
+        """
+        folded = {}
+        for unit, factor in factors.items():
+            if not (isinstance(factor, (int, float)) and factor and abs(factor) != float("inf")):
+                raise ValueError(f"Invalid conversion factor {factor!r} for {unit!r}")
+            folded[_fold(unit)] = float(factor)
+        folded[_fold(canonical_unit)] = 1.0
+        self._conversions[field_id] = (canonical_unit, folded)
+        self._tables.clear()
+    
+    def canonical_unit(self, field_id: Any) -> Optional[str]:
+        """Canonical unit of a field, None when it has no registered conversions"""
+        conversion = self._conversions.get(field_id)
+        return conversion[0] if conversion is not None else None
+    
+    def layout_table(self, form_layout: Iterable[Any]) -> Dict[Any, Dict[Any, float]]:
+        """
+        Returns the precomputed factor table of a form layout
+        
+        Args:
+            form_layout: FormLayout or CompactFormLayout fields
+            
+        Returns:
+            Dict[Any, Dict[Any, float]]: Per field with registered conversions,
+            the factor for each selectable unit id and case-folded unit name
+        """
+        fields = [form_data for form_data in form_layout if form_data.id in self._conversions]
+        key = tuple((form_data.id, _freeze(form_data.unit_list)) for form_data in fields)
+        table = self._tables.get(key)
+        if table is None:
+            table = {}
+            for form_data in fields:
+                # Kotlin only looks at the first field with a given id
+                if form_data.id in table:
+                    continue
+                factors = dict(self._conversions[form_data.id][1])
+                for entry in form_data.unit_list or ():
+                    factor = factors.get(_fold(entry.get("unit")))
+                    unit_id = entry.get("id")
+                    if factor is not None and unit_id is not None:
+                        factors.setdefault(unit_id, factor)
+                table[form_data.id] = factors
+            if len(self._tables) >= UNIT_TABLE_CACHE_SIZE:
+                self._tables.clear()
+            self._tables[key] = table
+        return table
+    
+    def convert(self, field_id: Any, value: Any, unit: Any, form_layout: Iterable[Any] = ()) -> Optional[float]:
+        """
+        Converts one value to its field's canonical unit
+        
+        Args:
+            field_id: Form field id
+            value: Entered result value
+            unit: Selected unit id or name
+            form_layout: Layout whose unit_list resolves unit ids
+            
+        Returns:
+            Optional[float]: Canonical value; the number as entered for fields
+            without conversions; None when the value is not numeric or the
+            unit is unknown
+        """
+        number = _range_number(value)
+        if number is None or field_id not in self._conversions:
+            return number
+        factor = self.layout_table(form_layout).get(field_id, self._conversions[field_id][1]).get(_fold(unit))
+        return number * factor if factor is not None else None
+    
+    def convert_batch(
+        self,
+        form_layout: Iterable[Any],
+        field_id: Any,
+        result_hash_maps: List[Optional[Dict[str, Any]]]
+    ) -> List[float]:
+        """
+        Converts one field of many result maps sharing a form layout
+        
+        Args:
+            form_layout: Layout the result maps were entered with
+            field_id: Form field id
+            result_hash_maps: Result maps, e.g. ``[data.result_hash_map, ...]``
+            
+        Returns:
+            List[float]: Canonical value per map, NaN where missing, not
+            numeric or in an unknown unit
+        """
+        numbers = self._column_numbers(field_id, result_hash_maps)
+        scale = self._column_factors(self.layout_table(form_layout).get(field_id), field_id, result_hash_maps)
+        return self._scale_column(numbers, scale)
+    
+    def _column_numbers(
+        self,
+        field_id: Any,
+        result_hash_maps: List[Optional[Dict[str, Any]]]
+    ) -> List[Optional[float]]:
+        # None where missing or not numeric; numpy turns None into NaN
+        return [
+            _range_number(result_hash_map.get(field_id)) if result_hash_map else None
+            for result_hash_map in result_hash_maps
+        ]
+    
+    def _numeric_column(self, field_id: Any, result_hash_maps: List[Optional[Dict[str, Any]]]) -> Any:
+        # Same numbers as _column_numbers as a float64 array, NaN where missing
+        column = [
+            result_hash_map.get(field_id) if result_hash_map else None
+            for result_hash_map in result_hash_maps
+        ]
+        # numpy parses str objects with float(), so a column of plain numbers,
+        # numeric strings and missing values converts in one call; bools and
+        # anything float() rejects go through _range_number
+        if set(map(type, column)) <= _COLUMN_NUMBER_TYPES:
+            try:
+                return np.array(column, dtype=np.float64)
+            except (ValueError, TypeError, OverflowError):
+                pass
+        return np.array([_range_number(value) for value in column], dtype=np.float64)
+    
+    def _scale_column(self, numbers: List[Optional[float]], scale: Optional[List[float]]) -> List[float]:
+        nan = float("nan")
+        if scale is None:
+            return [nan if number is None else number for number in numbers]
+        return [nan if number is None else number * factor for number, factor in zip(numbers, scale)]
+    
+    def _column_factors(
+        self,
+        factors: Optional[Dict[Any, float]],
+        field_id: Any,
+        result_hash_maps: List[Optional[Dict[str, Any]]]
+    ) -> Optional[List[float]]:
+        # None when the field has no conversions and values are compared as entered
+        if factors is None:
+            return None
+        nan = float("nan")
+        unit_key = _unit_key(field_id)
+        return [
+            factors.get(_fold(result_hash_map.get(unit_key)), nan) if result_hash_map else nan
+            for result_hash_map in result_hash_maps
+        ]
+    
+    def check_ranges(self, server_data: List[InvestigationModel]) -> List[List[Any]]:
+        """
+        Finds the fields whose canonical value is outside the form's bounds
+        
+        Investigations are grouped by form layout object and each bounded
+        field is checked as one column, with the strict comparisons of the
+        value range rules; with numpy installed the conversion and the
+        comparisons run on the whole column. Values that are missing, not
+        numeric or in an unknown unit are not flagged.
+        
+        Args:
+            server_data: Investigations to check
+            
+        Returns:
+            List[List[Any]]: Out-of-range field ids per investigation, in input order
+            
+        Raises:
+            ValidationError: If the values cannot be checked
+        """
+        flagged: List[List[Any]] = [[] for _ in server_data]
+        try:
+            groups = _IdentityCache()
+            for position, data in enumerate(server_data):
+                result_list = data.result_list
+                form_layout = getattr(result_list, 'form_layout', None) if result_list else None
+                if not data.result_hash_map or form_layout is None:
+                    continue
+                positions = groups.get(form_layout)
+                if positions is None:
+                    positions = groups[form_layout] = []
+                positions.append(position)
+            
+            for form_layout, positions in groups.items():
+                result_hash_maps = [server_data[position].result_hash_map for position in positions]
+                table = self.layout_table(form_layout)
+                seen = set()
+                for form_data in form_layout:
+                    # Bounds the value range rules cannot compare numerically are ignored
+                    min_value = None if type(form_data.min_value) is str else form_data.min_value
+                    max_value = None if type(form_data.max_value) is str else form_data.max_value
+                    if form_data.id in seen:
+                        continue
+                    seen.add(form_data.id)
+                    if min_value is None and max_value is None:
+                        continue
+                    scale = self._column_factors(table.get(form_data.id), form_data.id, result_hash_maps)
+                    # NaN compares False both ways, so unconvertible values are never flagged
+                    if np is not None:
+                        column = self._numeric_column(form_data.id, result_hash_maps)
+                        if scale is not None:
+                            with np.errstate(over="ignore"):
+                                column *= np.array(scale, dtype=np.float64)
+                        if min_value is None:
+                            out_of_range = column > max_value
+                        elif max_value is None:
+                            out_of_range = column < min_value
+                        else:
+                            out_of_range = (column < min_value) | (column > max_value)
+                        rows = np.flatnonzero(out_of_range).tolist()
+                    else:
+                        column = self._scale_column(self._column_numbers(form_data.id, result_hash_maps), scale)
+                        if min_value is None:
+                            rows = [row for row, value in enumerate(column) if value > max_value]
+                        elif max_value is None:
+                            rows = [row for row, value in enumerate(column) if value < min_value]
+                        else:
+                            rows = [row for row, value in enumerate(column) if value < min_value or value > max_value]
+                    for row in rows:
+                        flagged[positions[row]].append(form_data.id)
+            return flagged
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Unit range check error: {str(e)}")
+            raise ValidationError(f"Unit range check failed: {str(e)}")
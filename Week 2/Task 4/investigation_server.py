@@ -0,0 +1,376 @@
+"""
+Investigation Validation Server
+
+An asyncio server that batches NDJSON validation requests from many
+connections, and the matching client.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Any, Tuple
+import asyncio
+import json
+import logging
+
+from investigation_validator import (
+    investigation_from_dict, InvestigationModel, InvestigationValidator, outcome_to_dict, ValidationError
+)
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 256
+DEFAULT_MAX_WAIT = 0.002  # seconds the first request of a batch waits for others
+DEFAULT_MAX_QUEUE = 1024
+
+
+class _PendingRequest(NamedTuple):
+    is_lab_tech: bool
+    server_data: Optional[List[InvestigationModel]]
+    future: "asyncio.Future[bool]"
+
+
+class ValidationServer:
+    """
+    Asyncio validation service that coalesces concurrent requests into micro-batches
+    
+    Requests wait in a bounded queue; a batch is taken once ``max_batch_size``
+    requests are queued or the first one has waited ``max_wait`` seconds, and
+    is validated with ``InvestigationValidator.validate_each``. A full queue
+    makes callers wait, and network connections stop being read, until the
+    batcher catches up.
+    
+    Batches are validated on the event loop, so each one pauses every
+    connection for as long as it takes. Validation holds the GIL throughout,
+    so a worker thread would not free the loop and measured no better;
+    ``max_batch_size`` bounds the pause, so lower it when large requests
+    share the server with small ones.
+    
+    The network protocol is NDJSON over TCP, pipelined per connection. Each
+    request line is ``{"id": ..., "isLabTech": bool, "investigations": [...]}``
+    and is answered in order with ``{"id": ..., "isValid": bool,
+    "investigations": [outcome, ...]}`` or ``{"id": ..., "error": message}``.
+    """
+    
+    def __init__(
+        self,
+        validator: Optional["InvestigationValidator"] = None,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        max_queue: int = DEFAULT_MAX_QUEUE
+    ):
+        """
+        Initialize the server
+        
+        Args:
+            validator: Validator used for every batch
+            max_batch_size: Most requests validated together
+            max_wait: Seconds to wait for more requests after the first
+            max_queue: Requests queued before callers are made to wait
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.validator = validator or InvestigationValidator()
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.logger = logging.getLogger(__name__)
+        self.requests = 0
+        self.batches = 0
+        self._queue: Optional["asyncio.Queue[_PendingRequest]"] = None
+        self._batcher: Optional["asyncio.Task[None]"] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.StreamWriter, "asyncio.Task[None]"] = {}
+    
+    async def __aenter__(self) -> "ValidationServer":
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+    
+    @property
+    def address(self) -> Optional[Tuple[str, int]]:
+        """(host, port) the server listens on, None if it only serves in-process"""
+        if self._server is None or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()[:2]
+    
+    async def start(self, host: Optional[str] = None, port: int = 0) -> None:
+        """
+        Starts the batcher and, when a host is given, the TCP listener
+        
+        Args:
+            host: Interface to listen on; None serves only ``validate`` calls
+            port: TCP port, 0 for any free port
+        """
+        if self._batcher is not None:
+            raise RuntimeError("ValidationServer is already started")
+        self._queue = asyncio.Queue(self.max_queue)
+        self._batcher = asyncio.ensure_future(self._run_batches())
+        if host is not None:
+            self._server = await asyncio.start_server(self._serve_connection, host, port)
+    
+    async def close(self) -> None:
+        """Stops listening, validates the queued requests and stops the batcher"""
+        if self._server is not None:
+            self._server.close()
+            connections = list(self._connections.items())
+            for writer, _ in connections:
+                writer.close()
+            await asyncio.gather(*(task for _, task in connections), return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        if self._batcher is not None:
+            await self._queue.join()
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+    
+    async def validate(self, is_lab_tech: bool, server_data: Optional[List[InvestigationModel]]) -> bool:
+        """
+        Validates one investigation list as part of the next micro-batch
+        
+        Args:
+            is_lab_tech: Whether the user is a lab technician
+            server_data: List of investigation models to validate
+            
+        Returns:
+            bool: Same result as ``on_validate_input(is_lab_tech, server_data)``
+            
+        Raises:
+            ValidationError: When validation logic encounters critical errors
+        """
+        if self._queue is None:
+            raise RuntimeError("ValidationServer is not started")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingRequest(is_lab_tech, server_data, future))
+        return await future
+    
+    async def _run_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(queue.get_nowait())
+            try:
+                self._validate_batch(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+    
+    def _validate_batch(self, batch: List[_PendingRequest]) -> None:
+        self.batches += 1
+        self.requests += len(batch)
+        try:
+            results = self.validator.validate_each([(request.is_lab_tech, request.server_data) for request in batch])
+        except Exception as e:
+            self.logger.error(f"Validation error: {str(e)}")
+            results = [e] * len(batch)
+        for request, result in zip(batch, results):
+            if request.future.done():  # caller went away
+                continue
+            if isinstance(result, Exception):
+                if not isinstance(result, ValidationError):
+                    result = ValidationError(f"Validation failed: {str(result)}")
+                request.future.set_exception(result)
+            else:
+                request.future.set_result(result)
+    
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # Responses are written in request order; the bounded queue stops
+        # reading when too many requests of this connection are in flight.
+        responses: "asyncio.Queue[Optional[asyncio.Future[Dict[str, Any]]]]" = asyncio.Queue(self.max_batch_size)
+        write_task = asyncio.ensure_future(self._write_responses(responses, writer))
+        self._connections[writer] = asyncio.current_task()
+        try:
+            while not write_task.done():
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    response = asyncio.ensure_future(self._respond(line))
+                    if not await self._put_response(responses, response, write_task):
+                        response.cancel()
+        except ConnectionError:
+            pass
+        finally:
+            try:
+                await self._put_response(responses, None, write_task)
+                await write_task
+            except ConnectionError:
+                pass
+            finally:
+                # Responses the writer will not send are dropped
+                write_task.cancel()
+                while not responses.empty():
+                    response = responses.get_nowait()
+                    if response is not None:
+                        response.cancel()
+                self._connections.pop(writer, None)
+                writer.close()
+    
+    @staticmethod
+    async def _put_response(
+        responses: "asyncio.Queue[Optional[asyncio.Future[Dict[str, Any]]]]",
+        response: "Optional[asyncio.Future[Dict[str, Any]]]",
+        write_task: "asyncio.Task[None]"
+    ) -> bool:
+        """
+        Queues a response, or the None end marker, for the connection's writer
+        
+        The writer is the only consumer of the queue, so waiting for room is
+        raced against it; a writer that failed, e.g. on a reset connection,
+        would otherwise leave the put waiting forever.
+        
+        Returns:
+            bool: False when the writer stopped before there was room
+        """
+        if not responses.full():
+            responses.put_nowait(response)
+            return True
+        put = asyncio.ensure_future(responses.put(response))
+        try:
+            await asyncio.wait((put, write_task), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not put.done():
+                put.cancel()
+        return put.done() and not put.cancelled()
+    
+    async def _write_responses(
+        self,
+        responses: "asyncio.Queue[Optional[asyncio.Future[Dict[str, Any]]]]",
+        writer: asyncio.StreamWriter
+    ) -> None:
+        while True:
+            response = await responses.get()
+            if response is None:
+                return
+            writer.write(json.dumps(await response).encode("utf-8") + b"\n")
+            await writer.drain()
+    
+    async def _respond(self, line: bytes) -> Dict[str, Any]:
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            server_data = request.get("investigations")
+            if server_data is not None:
+                server_data = [investigation_from_dict(record) for record in server_data]
+            is_valid = await self.validate(bool(request.get("isLabTech", False)), server_data)
+        except (ValueError, AttributeError, TypeError, ValidationError) as e:
+            return {"id": request_id, "error": str(e)}
+        return {
+            "id": request_id,
+            "isValid": is_valid,
+            "investigations": [outcome_to_dict(data) for data in server_data or ()],
+        }
+
+
+class ValidationClient:
+    """Pipelined NDJSON client for a ValidationServer"""
+    
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._pending: Dict[int, "asyncio.Future[Dict[str, Any]]"] = {}
+        self._next_id = 0
+        self._receiver = asyncio.ensure_future(self._receive())
+    
+    @classmethod
+    async def connect(cls, host: str, port: int) -> "ValidationClient":
+        """
+        Opens a connection to a server
+        
+        Args:
+            host: Server host
+            port: Server port
+            
+        Returns:
+            ValidationClient: Connected client
+        """
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+    
+    async def validate(self, is_lab_tech: bool, investigations: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Sends one investigation list and waits for its response
+        
+        Args:
+            is_lab_tech: Whether the user is a lab technician
+            investigations: Investigations in their server JSON representation
+            
+        Returns:
+            Dict[str, Any]: Response with ``isValid`` and outcomes, or ``error``
+        """
+        request_id = self._next_id
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        request = {"id": request_id, "isLabTech": is_lab_tech, "investigations": investigations}
+        self._writer.write(json.dumps(request).encode("utf-8") + b"\n")
+        await self._writer.drain()
+        return await future
+    
+    async def close(self) -> None:
+        """Closes the connection; requests still waiting fail with ConnectionError"""
+        self._writer.close()
+        await self._writer.wait_closed()
+        await self._receiver
+    
+    async def _receive(self) -> None:
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self._pending.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except ConnectionError:
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("connection closed"))
+            self._pending.clear()
+
+
+async def serve(
+    host: str,
+    port: int,
+    is_community: bool = False,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    max_wait: float = DEFAULT_MAX_WAIT,
+    max_queue: int = DEFAULT_MAX_QUEUE
+) -> None:
+    """
+    Runs a ValidationServer until cancelled
+    
+    Args:
+        host: Interface to listen on
+        port: TCP port
+        is_community: Whether requests come from community users
+        max_batch_size: Most requests validated together
+        max_wait: Seconds to wait for more requests after the first
+        max_queue: Requests queued before callers are made to wait
+    """
+    server = ValidationServer(InvestigationValidator(is_community=is_community), max_batch_size, max_wait, max_queue)
+    await server.start(host, port)
+    try:
+        _logger.info(f"Serving validation on {server.address}")
+        await server._server.serve_forever()
+    finally:
+        await server.close()
@@ -0,0 +1,632 @@
+"""
+Investigation Snapshots
+
+Columnar snapshot files of investigations and their validation outcomes,
+written once and read back through a memory map without decoding every record.
+"""
+
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Any, Tuple, Union
+from itertools import accumulate
+from array import array
+from bisect import bisect_right
+import json
+import mmap
+import os
+import struct
+import sys
+
+from investigation_validator import (
+    CompactInvestigation, ErrorCode, form_layout_from_dict, FormSchema, FormSchemaRegistry, InvestigationModel,
+    InvestigationValidator, np, ResultStatus, ValidationReport, _IdentityCache
+)
+
+
+SNAPSHOT_MAGIC = b"INVSNAP1"
+SNAPSHOT_VERSION = 1
+
+# Header: magic, version, flags, reserved, then the record, entry and string
+# counts and the byte sizes of the string data and of the JSON metadata.
+_SNAPSHOT_HEADER = struct.Struct("<8sHHIqqqqq")
+_SNAPSHOT_HAS_REPORT = 1
+_SNAPSHOT_IS_VALID = 2
+
+# Per-record columns in file order. String columns hold indexes into the string
+# table (-1 for None); status and error code columns hold 1 + the member's
+# position in the metadata lists (0 for None).
+_RECORD_COLUMNS = (
+    ("ids", "i"), ("test_names", "i"), ("recommended_by", "i"), ("recommended_on", "i"),
+    ("error_messages", "i"), ("field_ids", "i"), ("layouts", "i"),
+    ("flags", "B"), ("statuses", "B"), ("error_codes", "B"),
+)
+# Flattened result maps, one row per entry; ``entry_offsets`` delimits each
+# record's entries. The value is in ``ints`` (ints, bools and string indexes)
+# or ``floats`` depending on its kind.
+_ENTRY_COLUMNS = (("keys", "i"), ("kinds", "B"), ("ints", "q"), ("floats", "d"))
+
+_FLAG_DATA_ERROR = 1
+_FLAG_DROPDOWN_STATE = 2
+_FLAG_HAS_RESULTS = 4  # result_hash_map is not None
+
+_VALUE_NONE, _VALUE_STR, _VALUE_INT, _VALUE_FLOAT, _VALUE_BOOL, _VALUE_JSON = range(6)
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+SNAPSHOT_STRING_CACHE_SIZE = 65536
+
+_STATUS_CODES = {status: position + 1 for position, status in enumerate(ResultStatus)}
+_ERROR_CODE_CODES = {code: position + 1 for position, code in enumerate(ErrorCode)}
+
+
+def _snapshot_sections(header: Tuple[Any, ...]) -> List[Tuple[str, str, int]]:
+    """
+    Lists the sections of a snapshot file in order
+    
+    Args:
+        header: Unpacked ``_SNAPSHOT_HEADER``
+        
+    Returns:
+        List[Tuple[str, str, int]]: (name, array typecode, item count) per
+        section; every section starts on an 8-byte boundary
+    """
+    _, _, _, _, records, entries, strings, string_bytes, metadata_bytes = header
+    return (
+        [("header", "B", _SNAPSHOT_HEADER.size)]
+        + [(name, typecode, records) for name, typecode in _RECORD_COLUMNS]
+        + [("entry_offsets", "q", records + 1)]
+        + [(name, typecode, entries) for name, typecode in _ENTRY_COLUMNS]
+        + [("string_offsets", "q", strings + 1), ("string_data", "B", string_bytes), ("metadata", "B", metadata_bytes)]
+    )
+
+
+def _form_layout_to_dict(form_data: Any) -> Dict[str, Any]:
+    """Inverse of ``form_layout_from_dict``"""
+    ranges = form_data.ranges
+    return {
+        "viewType": form_data.view_type,
+        "id": form_data.id,
+        "title": form_data.title,
+        "isMandatory": form_data.is_mandatory,
+        "minLength": form_data.min_length,
+        "maxLength": form_data.max_length,
+        "minValue": form_data.min_value,
+        "maxValue": form_data.max_value,
+        "contentLength": form_data.content_length,
+        "unitList": list(form_data.unit_list) if form_data.unit_list is not None else None,
+        "optionList": list(form_data.option_list) if form_data.option_list is not None else None,
+        "ranges": [
+            {
+                "unitType": item.unit_type,
+                "gender": item.gender,
+                "minRange": item.min_range,
+                "maxRange": item.max_range,
+                "displayRange": item.display_range,
+            }
+            for item in ranges
+        ] if ranges is not None else None,
+    }
+
+
+def write_snapshot(
+    destination: Union[str, "os.PathLike[str]", BinaryIO],
+    investigations: Iterable[InvestigationModel],
+    report: Optional[ValidationReport] = None
+) -> int:
+    """
+    Writes investigations to a columnar snapshot file
+    
+    Strings are deduplicated into one table, result maps are flattened into
+    key and value columns, and each distinct form layout is stored once as
+    JSON. Every column is written with a single call.
+    
+    Args:
+        destination: File path, or a binary file opened for writing
+        investigations: Validated investigations in server order
+        report: Report the investigations were validated with, if any; its
+            statuses and error codes are stored, and the stored attributes
+            are the ones ``apply`` would leave on the models
+            
+    Returns:
+        int: Number of investigations written
+        
+    Raises:
+        ValueError: When a value cannot be stored, or the report does not
+            match the investigations
+    """
+    strings: Dict[str, int] = {}
+    encoded: List[bytes] = []
+    
+    def string_index(value: Optional[str], column: str) -> int:
+        if value is None:
+            return -1
+        if type(value) is not str:
+            raise ValueError(f"Snapshot {column} must be strings, got {type(value).__name__}")
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(encoded)
+            encoded.append(value.encode("utf-8", "surrogatepass"))
+        return index
+    
+    columns: Dict[str, Any] = {name: array(typecode) for name, typecode in _RECORD_COLUMNS + _ENTRY_COLUMNS}
+    columns["entry_offsets"] = entry_offsets = array("q", [0])
+    keys, kinds, ints, floats = (columns[name] for name, _ in _ENTRY_COLUMNS)
+    layouts: List[List[Dict[str, Any]]] = []
+    layout_positions: Dict[str, int] = {}
+    
+    def layout_position(form_layout: Any) -> int:
+        fields = [_form_layout_to_dict(form_data) for form_data in form_layout]
+        try:
+            text = json.dumps(fields)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Form layout cannot be stored in a snapshot: {e}")
+        position = layout_positions.setdefault(text, len(layouts))
+        if position == len(layouts):
+            layouts.append(fields)
+        return position
+    
+    seen_layouts = _IdentityCache()
+    results = report.results if report is not None else None
+    count = 0
+    
+    for data in investigations:
+        error_message = data.error_message
+        data_error = data.data_error
+        dropdown_state = data.dropdown_state
+        status = error_code = field_id = None
+        if results is not None:
+            if count >= len(results):
+                raise ValueError("Report has fewer results than investigations")
+            result = results[count]
+            status, error_code, field_id = result.status, result.error_code, result.field_id
+            # Same updates as apply(), without writing to the model
+            if result.dropdown_state is not None:
+                dropdown_state = result.dropdown_state
+            if status is ResultStatus.RESET:
+                error_message = None
+                data_error = True
+            else:
+                if result.error_message is not None:
+                    error_message = result.error_message
+                if result.data_error is not None:
+                    data_error = result.data_error
+        
+        result_list = data.result_list
+        form_layout = getattr(result_list, 'form_layout', None) if result_list else None
+        layout_index = -1
+        if form_layout is not None:
+            layout_index = seen_layouts.lookup(form_layout, layout_position)
+        
+        flags = (_FLAG_DATA_ERROR if data_error else 0) | (_FLAG_DROPDOWN_STATE if dropdown_state else 0)
+        result_hash_map = data.result_hash_map
+        if result_hash_map is not None:
+            flags |= _FLAG_HAS_RESULTS
+            for key, value in result_hash_map.items():
+                if type(key) is not str:
+                    raise ValueError(f"Snapshot result keys must be strings, got {type(key).__name__}")
+                keys.append(string_index(key, "result keys"))
+                value_type = value.__class__
+                if value_type is str:
+                    kinds.append(_VALUE_STR)
+                    ints.append(string_index(value, "result values"))
+                    floats.append(0.0)
+                elif value_type is float:
+                    kinds.append(_VALUE_FLOAT)
+                    ints.append(0)
+                    floats.append(value)
+                elif value_type is bool:
+                    kinds.append(_VALUE_BOOL)
+                    ints.append(value)
+                    floats.append(0.0)
+                elif value_type is int and _INT64_MIN <= value <= _INT64_MAX:
+                    kinds.append(_VALUE_INT)
+                    ints.append(value)
+                    floats.append(0.0)
+                elif value is None:
+                    kinds.append(_VALUE_NONE)
+                    ints.append(0)
+                    floats.append(0.0)
+                else:
+                    # Lists, objects and ints beyond 64 bits round-trip through JSON
+                    try:
+                        text = json.dumps(value)
+                    except (TypeError, ValueError) as e:
+                        raise ValueError(f"Result value cannot be stored in a snapshot: {e}")
+                    kinds.append(_VALUE_JSON)
+                    ints.append(string_index(text, "result values"))
+                    floats.append(0.0)
+        entry_offsets.append(len(keys))
+        
+        columns["ids"].append(string_index(data.id, "ids"))
+        columns["test_names"].append(string_index(data.test_name, "test names"))
+        columns["recommended_by"].append(string_index(data.recommended_by, "recommended_by values"))
+        columns["recommended_on"].append(string_index(data.recommended_on, "recommended_on values"))
+        columns["error_messages"].append(string_index(error_message, "error messages"))
+        columns["field_ids"].append(string_index(field_id, "field ids"))
+        columns["layouts"].append(layout_index)
+        columns["flags"].append(flags)
+        columns["statuses"].append(_STATUS_CODES[status] if status is not None else 0)
+        columns["error_codes"].append(_ERROR_CODE_CODES[error_code] if error_code is not None else 0)
+        count += 1
+    
+    if results is not None and count != len(results):
+        raise ValueError("Report has more results than investigations")
+    
+    columns["string_offsets"] = array("q", [0])
+    columns["string_offsets"].extend(accumulate(map(len, encoded)))
+    columns["string_data"] = b"".join(encoded)
+    columns["metadata"] = json.dumps({
+        "layouts": layouts,
+        "statuses": [status.value for status in ResultStatus],
+        "errorCodes": [code.value for code in ErrorCode],
+    }).encode("utf-8")
+    flags = 0
+    if report is not None:
+        flags = _SNAPSHOT_HAS_REPORT | (_SNAPSHOT_IS_VALID if report.is_valid else 0)
+    header = (
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags, 0,
+        count, len(keys), len(encoded), len(columns["string_data"]), len(columns["metadata"]),
+    )
+    columns["header"] = _SNAPSHOT_HEADER.pack(*header)
+    
+    file = open(destination, "wb") if isinstance(destination, (str, os.PathLike)) else destination
+    try:
+        for name, _, _ in _snapshot_sections(header):
+            section = columns[name]
+            if isinstance(section, array) and sys.byteorder != "little":
+                section = array(section.typecode, section)
+                section.byteswap()
+            size = memoryview(section).nbytes
+            file.write(section)
+            file.write(b"\0" * (-size % 8))
+    finally:
+        if file is not destination:
+            file.close()
+    return count
+
+
+_NOT_LOADED = object()
+
+
+class SnapshotView:
+    """
+    Read-only attribute view of one record in an InvestigationSnapshot
+    
+    The result map is decoded on first access and kept for the lifetime of
+    the view, so views can be passed to ``validate_report`` and
+    ``is_valid_fast``. ``result_list`` is the FormSchema of the record's layout.
+    """
+    
+    __slots__ = ("_snapshot", "_index", "_result_hash_map")
+    
+    def __init__(self, snapshot: "InvestigationSnapshot", index: int):
+        self._snapshot = snapshot
+        self._index = index
+        self._result_hash_map: Any = _NOT_LOADED
+    
+    test_name = property(lambda self: self._snapshot._column_string("test_names", self._index))
+    recommended_by = property(lambda self: self._snapshot._column_string("recommended_by", self._index))
+    recommended_on = property(lambda self: self._snapshot._column_string("recommended_on", self._index))
+    id = property(lambda self: self._snapshot._column_string("ids", self._index))
+    error_message = property(lambda self: self._snapshot._column_string("error_messages", self._index))
+    data_error = property(lambda self: bool(self._snapshot._flags[self._index] & _FLAG_DATA_ERROR))
+    dropdown_state = property(lambda self: bool(self._snapshot._flags[self._index] & _FLAG_DROPDOWN_STATE))
+    
+    @property
+    def result_hash_map(self) -> Optional[Dict[str, Any]]:
+        if self._result_hash_map is _NOT_LOADED:
+            self._result_hash_map = self._snapshot.result_hash_map(self._index)
+        return self._result_hash_map
+    
+    @property
+    def result_list(self) -> Optional[FormSchema]:
+        layout_index = self._snapshot._layouts[self._index]
+        return self._snapshot.schemas[layout_index] if layout_index >= 0 else None
+    
+    def __copy__(self) -> CompactInvestigation:
+        return self._snapshot.to_model(self._index)
+    
+    def __repr__(self) -> str:
+        return f"SnapshotView(index={self._index}, id={self.id!r})"
+
+
+class InvestigationSnapshot:
+    """
+    Memory-mapped reader for files written by ``write_snapshot``
+    
+    Columns are read straight from the mapping and records are decoded only
+    when accessed, so a snapshot can be queried or re-validated without
+    loading every investigation. Indexing and iteration return SnapshotView
+    objects. Close the snapshot (or use it as a context manager) to release
+    the mapping.
+    """
+    
+    def __init__(self, path: Union[str, "os.PathLike[str]"]):
+        """
+        Opens and maps a snapshot file
+        
+        Args:
+            path: Snapshot file written by ``write_snapshot``
+            
+        Raises:
+            ValueError: When the file is not a complete snapshot of a supported version
+        """
+        self._file = open(path, "rb")
+        self._buffers: List[memoryview] = []
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError("Not an investigation snapshot: file is empty")
+        try:
+            self._open_columns()
+        except Exception:
+            self.close()
+            raise
+    
+    def _open_columns(self) -> None:
+        if len(self._map) < _SNAPSHOT_HEADER.size:
+            raise ValueError("Not an investigation snapshot: file is too short")
+        header = _SNAPSHOT_HEADER.unpack_from(self._map)
+        magic, version, flags = header[:3]
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("Not an investigation snapshot: bad magic")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        
+        buffer = memoryview(self._map)
+        self._buffers.append(buffer)
+        columns: Dict[str, Any] = {}
+        offset = 0
+        for name, typecode, count in _snapshot_sections(header):
+            size = count * array(typecode).itemsize
+            if offset + size > len(self._map):
+                raise ValueError("Truncated investigation snapshot")
+            if name == "string_data":
+                self._string_base = offset
+            column = buffer[offset:offset + size]
+            self._buffers.append(column)
+            if typecode != "B":
+                if sys.byteorder == "little":
+                    column = column.cast(typecode)
+                    self._buffers.append(column)
+                else:
+                    column = array(typecode, column.tobytes())
+                    column.byteswap()
+            columns[name] = column
+            offset += size + (-size % 8)
+        
+        self._columns = columns
+        self._flags = columns["flags"]
+        self._layouts = columns["layouts"]
+        self._entry_offsets = columns["entry_offsets"]
+        self._string_offsets = columns["string_offsets"]
+        self._key_names: Dict[int, str] = {}
+        # Bounded cache of decoded strings; result values repeat across records
+        self._strings: Dict[int, str] = {}
+        # Per string column, text -> string table index, built on first lookup
+        self._string_positions: Dict[str, Dict[str, int]] = {}
+        
+        self.is_valid: Optional[bool] = bool(flags & _SNAPSHOT_IS_VALID) if flags & _SNAPSHOT_HAS_REPORT else None
+        metadata = json.loads(columns["metadata"].tobytes())
+        self._statuses = [None] + [ResultStatus(value) for value in metadata["statuses"]]
+        self._error_codes = [None] + [ErrorCode(value) for value in metadata["errorCodes"]]
+        # The schemas keep each layout's compiled form for every record using it
+        registry = FormSchemaRegistry(limit=len(metadata["layouts"]) + 1)
+        self.schemas: List[FormSchema] = [
+            registry.register([form_layout_from_dict(item) for item in fields])
+            for fields in metadata["layouts"]
+        ]
+    
+    def close(self) -> None:
+        """Releases the mapping; views of this snapshot can no longer be read"""
+        for buffer in reversed(self._buffers):
+            buffer.release()
+        self._buffers = []
+        if hasattr(self, "_map"):
+            self._map.close()
+        self._file.close()
+    
+    def __enter__(self) -> "InvestigationSnapshot":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+    
+    def __len__(self) -> int:
+        return len(self._flags)
+    
+    def __getitem__(self, index: int) -> SnapshotView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("investigation index out of range")
+        return SnapshotView(self, index)
+    
+    def __iter__(self) -> Iterator[SnapshotView]:
+        for index in range(len(self)):
+            yield SnapshotView(self, index)
+    
+    def _string(self, index: int) -> str:
+        text = self._strings.get(index)
+        if text is None:
+            offsets = self._string_offsets
+            start = self._string_base + offsets[index]
+            end = self._string_base + offsets[index + 1]
+            text = self._map[start:end].decode("utf-8", "surrogatepass")
+            if len(self._strings) >= SNAPSHOT_STRING_CACHE_SIZE:
+                self._strings.clear()
+            self._strings[index] = text
+        return text
+    
+    def _column_string(self, column: str, index: int) -> Optional[str]:
+        position = self._columns[column][index]
+        return self._string(position) if position >= 0 else None
+    
+    def _string_position(self, column: str, text: str) -> Optional[int]:
+        """Finds the string table index of ``text`` among the values of a column"""
+        positions = self._string_positions.get(column)
+        if positions is None:
+            positions = self._string_positions[column] = {
+                self._string(position): position for position in set(self._columns[column]) if position >= 0
+            }
+        return positions.get(text)
+    
+    def _value(self, kind: int, number: int, real: float) -> Any:
+        if kind == _VALUE_STR:
+            return self._string(number)
+        if kind == _VALUE_FLOAT:
+            return real
+        if kind == _VALUE_INT:
+            return number
+        if kind == _VALUE_BOOL:
+            return bool(number)
+        if kind == _VALUE_JSON:
+            return json.loads(self._string(number))
+        return None
+    
+    def result_hash_map(self, index: int) -> Optional[Dict[str, Any]]:
+        """
+        Decodes the result map of one record
+        
+        Args:
+            index: Record position
+            
+        Returns:
+            Optional[Dict[str, Any]]: New dict with interned keys, None if the
+            record had no result map
+        """
+        if not self._flags[index] & _FLAG_HAS_RESULTS:
+            return None
+        start = self._entry_offsets[index]
+        end = self._entry_offsets[index + 1]
+        columns = self._columns
+        key_names = self._key_names
+        strings = self._strings
+        result_hash_map = {}
+        for key, kind, number, real in zip(
+            columns["keys"][start:end].tolist(), columns["kinds"][start:end].tolist(),
+            columns["ints"][start:end].tolist(), columns["floats"][start:end].tolist()
+        ):
+            name = key_names.get(key)
+            if name is None:
+                name = key_names[key] = sys.intern(self._string(key))
+            if kind == _VALUE_STR:
+                value = strings.get(number)
+                result_hash_map[name] = value if value is not None else self._string(number)
+            else:
+                result_hash_map[name] = number if kind == _VALUE_INT else self._value(kind, number, real)
+        return result_hash_map
+    
+    def to_model(self, index: int) -> CompactInvestigation:
+        """
+        Copies one record out of the snapshot
+        
+        Args:
+            index: Record position
+            
+        Returns:
+            CompactInvestigation: Detached copy of the record
+        """
+        view = self[index]
+        return CompactInvestigation(
+            test_name=view.test_name,
+            recommended_by=view.recommended_by,
+            recommended_on=view.recommended_on,
+            result_hash_map=view.result_hash_map,
+            data_error=view.data_error,
+            error_message=view.error_message,
+            id=view.id,
+            dropdown_state=view.dropdown_state,
+            result_list=view.result_list,
+        )
+    
+    def status(self, index: int) -> Optional[ResultStatus]:
+        """Stored report status of a record, None if written without a report"""
+        return self._statuses[self._columns["statuses"][index]]
+    
+    def error_code(self, index: int) -> Optional[ErrorCode]:
+        """Stored report error code of a record"""
+        return self._error_codes[self._columns["error_codes"][index]]
+    
+    def field_id(self, index: int) -> Optional[str]:
+        """Stored id of the field a record failed on"""
+        return self._column_string("field_ids", index)
+    
+    def find(
+        self,
+        test_name: Optional[str] = None,
+        error_code: Optional[ErrorCode] = None,
+        status: Optional[ResultStatus] = None
+    ) -> List[int]:
+        """
+        Finds records by column values without decoding them
+        
+        Args:
+            test_name: Only records with this test name
+            error_code: Only records with this stored error code
+            status: Only records with this stored status
+            
+        Returns:
+            List[int]: Matching record positions in order
+        """
+        rows: Iterable[int] = range(len(self))
+        filters = []
+        if test_name is not None:
+            position = self._string_position("test_names", test_name)
+            if position is None:
+                return []
+            filters.append((self._columns["test_names"], position))
+        if error_code is not None:
+            if error_code not in self._error_codes:
+                return []
+            filters.append((self._columns["error_codes"], self._error_codes.index(error_code)))
+        if status is not None:
+            if status not in self._statuses:
+                return []
+            filters.append((self._columns["statuses"], self._statuses.index(status)))
+        for column, code in filters:
+            rows = [row for row in rows if column[row] == code]
+        return list(rows)
+    
+    def field_values(self, field_id: str) -> Iterator[Tuple[int, Any]]:
+        """
+        Scans one result field across all records
+        
+        Args:
+            field_id: Result key, e.g. a field id or ``<id>_unit``
+            
+        Returns:
+            Iterator[Tuple[int, Any]]: (record position, value) for every
+            record whose result map contains the key
+        """
+        key = self._string_position("keys", field_id)
+        if key is None:
+            return
+        keys = self._columns["keys"]
+        offsets = self._entry_offsets
+        if np is not None:
+            matches = np.flatnonzero(np.asarray(keys) == key)
+            positions = matches.tolist()
+            rows = (np.searchsorted(np.asarray(offsets), matches, side="right") - 1).tolist()
+        else:
+            positions = [position for position, entry_key in enumerate(keys.tolist()) if entry_key == key]
+            rows = [bisect_right(offsets, position) - 1 for position in positions]
+        kinds, ints, floats = (self._columns[name] for name in ("kinds", "ints", "floats"))
+        for row, position in zip(rows, positions):
+            yield row, self._value(kinds[position], ints[position], floats[position])
+    
+    def revalidate(self, validator: "InvestigationValidator", is_lab_tech: bool = False) -> ValidationReport:
+        """
+        Validates the stored investigations again, e.g. after a rule change
+        
+        Records are decoded one at a time and every layout is compiled once.
+        
+        Args:
+            validator: Validator carrying the current rules
+            is_lab_tech: Whether the user is a lab technician
+            
+        Returns:
+            ValidationReport: Report over the stored records, in order
+            
+        Raises:
+            ValidationError: When validation logic encounters critical errors
+        """
+        return validator.validate_report(is_lab_tech, self)
@@ -4,22 +4,88 @@ Investigation Validator - Python Implementation
 This module provides a Python implementation of the Kotlin investigation validation logic
 from InvestigationGenerator.kt. It maintains exact business logic while following Python
 conventions and best practices.
+
+Subsystems built on the validator live in their own modules:
+investigation_indexes (reference ranges, result queries, unit conversion),
+investigation_snapshot, investigation_delta, investigation_components,
+investigation_server and investigation_cli, the command line run by
+``python -m investigation_validator``.
 """
 
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Any, TextIO, Tuple, Union
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from enum import Enum
+from functools import lru_cache
+from itertools import chain, islice
+from operator import attrgetter
+from tempfile import SpooledTemporaryFile
+from array import array
+from bisect import bisect_left
+import copy
+import hashlib
+import json
 import logging
+import sys
+import threading
+import time
+import weakref
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
 
 # Constants
 class ViewType(Enum):
     """View type constants equivalent to Kotlin ViewType"""
     FORM_EDITTEXT = "EditText"
+    FORM_DATEPICKER = "DatePicker"
+    FORM_SPINNER = "Spinner"
+
+class ErrorCode(Enum):
+    """Reason an investigation failed validation"""
+    REQUIRED = "required"
+    MIN_LENGTH = "min_length"
+    VALUE_RANGE = "value_range"
+    MIN_VALUE = "min_value"
+    MAX_VALUE = "max_value"
+    CONTENT_LENGTH = "content_length"
+    UNIT_REQUIRED = "unit_required"
+    VALIDATION_ERROR = "validation_error"  # min/max check raised
+    FIELD_ERROR = "field_error"  # field validation raised
+    INVALID = "invalid"  # rejected by an overridden field rule
+    INVALID_DATE = "invalid_date"
+    FUTURE_DATE = "future_date"
+    DATE_AFTER_LIMIT = "date_after_limit"
+    INVALID_OPTION = "invalid_option"
+
+class ResultStatus(Enum):
+    """Per-investigation outcome recorded in a ValidationReport"""
+    PASSED = "passed"  # form layout validated without changing the overall result
+    FAILED = "failed"
+    RESET = "reset"  # no results or no layout: clears errors and resets the overall result
+    SKIPPED = "skipped"  # filtered out of form validation
 
 class ValidationError(Exception):
     """Custom exception for validation errors"""
     pass
 
+@dataclass(frozen=True)
+class ReferenceRange:
+    """Python equivalent of a Kotlin FormLayout ``ranges`` entry"""
+    unit_type: Optional[str]
+    gender: Optional[str]
+    min_range: float
+    max_range: float
+    display_range: Optional[str] = None
+
 @dataclass
 class FormLayout:
     """Python equivalent of Kotlin FormLayout data class"""
@@ -33,6 +99,13 @@ class FormLayout:
     max_value: Optional[float] = None
     content_length: Optional[int] = None
     unit_list: Optional[List[Dict[str, Any]]] = None
+    ranges: Optional[List[ReferenceRange]] = None
+    option_list: Optional[List[Dict[str, Any]]] = None  # spinner options, {"id": ..., "name": ...}
+
+@dataclass
+class FormResponse:
+    """Python equivalent of Kotlin FormResponse data class"""
+    form_layout: List[FormLayout]
 
 @dataclass
 class InvestigationModel:
@@ -47,263 +120,3721 @@ class InvestigationModel:
     dropdown_state: bool = False
     result_list: Optional[Any] = None  # FormResponse equivalent
 
-class InvestigationValidator:
+class CompactFormLayout(NamedTuple):
+    """Immutable FormLayout without a per-instance __dict__, shared between investigations"""
+    view_type: str
+    id: str
+    title: str
+    is_mandatory: bool = False
+    min_length: Optional[int] = None
+    max_length: Optional[int] = None
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    content_length: Optional[int] = None
+    unit_list: Optional[Tuple[Dict[str, Any], ...]] = None
+    ranges: Optional[Tuple[ReferenceRange, ...]] = None
+    option_list: Optional[Tuple[Dict[str, Any], ...]] = None
+
+class CompactFormResponse(NamedTuple):
+    """Immutable FormResponse shared by every investigation using the same form"""
+    form_layout: Tuple[CompactFormLayout, ...]
+
+class CompactInvestigation:
+    """InvestigationModel with __slots__ and interned result keys"""
+    
+    __slots__ = (
+        "test_name", "recommended_by", "recommended_on", "result_hash_map",
+        "data_error", "error_message", "id", "dropdown_state", "result_list",
+    )
+    
+    def __init__(
+        self,
+        test_name: str,
+        recommended_by: str,
+        recommended_on: str,
+        result_hash_map: Optional[Dict[str, Any]] = None,
+        data_error: bool = True,
+        error_message: Optional[str] = None,
+        id: Optional[str] = None,
+        dropdown_state: bool = False,
+        result_list: Optional[CompactFormResponse] = None
+    ):
+        self.test_name = test_name
+        self.recommended_by = recommended_by
+        self.recommended_on = recommended_on
+        self.result_hash_map = result_hash_map
+        self.data_error = data_error
+        self.error_message = error_message
+        self.id = id
+        self.dropdown_state = dropdown_state
+        self.result_list = result_list
+    
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"CompactInvestigation({fields})"
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, CompactInvestigation):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+_ATOMIC_TYPES = frozenset((str, int, float, bool, type(None)))
+
+def _freeze(value: Any) -> Any:
+    """Converts nested lists and dicts into tuples so they can key the layout table"""
+    if value.__class__ in _ATOMIC_TYPES:
+        return value
+    atomic = _ATOMIC_TYPES
+    if isinstance(value, dict):
+        return ("__dict__",) + tuple([
+            (key, item if item.__class__ in atomic else _freeze(item)) for key, item in value.items()
+        ])
+    if isinstance(value, (list, tuple)):
+        return tuple([item if item.__class__ in atomic else _freeze(item) for item in value])
+    return value
+
+# Bounded table of shared form responses; clearing it only stops sharing for
+# layouts seen afterwards, existing references stay valid.
+SHARED_FORM_LIMIT = 4096
+_shared_form_responses: Dict[Tuple[Any, ...], CompactFormResponse] = {}
+
+def share_form_layout(form_layout: Iterable[FormLayout]) -> CompactFormResponse:
     """
-    Python implementation of investigation validation logic
-    Maintains exact business logic from Kotlin version
+    Returns the shared immutable form response for a form layout
+    
+    Identical layouts, including their unit lists, map to the same
+    CompactFormResponse instance, and field ids are interned.
+    
+    Args:
+        form_layout: Form layout fields in display order
+        
+    Returns:
+        CompactFormResponse: Shared form response
+    """
+    form_layout = list(form_layout)
+    key = _share_key(form_layout)
+    shared = _shared_form_responses.get(key)
+    if shared is None:
+        if len(_shared_form_responses) >= SHARED_FORM_LIMIT:
+            _shared_form_responses.clear()
+        shared = _shared_form_responses.setdefault(key, CompactFormResponse(_compact_fields(form_layout)))
+    return shared
+
+def _compact_fields(form_layout: Iterable[FormLayout]) -> Tuple[CompactFormLayout, ...]:
+    """Converts form layout fields to CompactFormLayout with interned ids"""
+    return tuple(
+        CompactFormLayout(
+            view_type=form_data.view_type,
+            id=sys.intern(form_data.id) if type(form_data.id) is str else form_data.id,
+            title=form_data.title,
+            is_mandatory=form_data.is_mandatory,
+            min_length=form_data.min_length,
+            max_length=form_data.max_length,
+            min_value=form_data.min_value,
+            max_value=form_data.max_value,
+            content_length=form_data.content_length,
+            unit_list=tuple(form_data.unit_list) if form_data.unit_list is not None else None,
+            ranges=tuple(form_data.ranges) if form_data.ranges is not None else None,
+            option_list=tuple(form_data.option_list) if form_data.option_list is not None else None,
+        )
+        for form_data in form_layout
+    )
+
+_compact_values = attrgetter(*CompactFormLayout._fields)
+_LIST_FIELDS = tuple(CompactFormLayout._fields.index(name) for name in ("unit_list", "ranges", "option_list"))
+
+def _share_key(form_layout: Iterable[Any]) -> Tuple[Any, ...]:
     """
+    Content key of a layout as it would be after _compact_fields
     
-    def __init__(self, is_community: bool = False):
-        self.is_community = is_community
-        self.logger = logging.getLogger(__name__)
+    Types are part of the key for the same reason as in form_layout_key; the
+    unit, range and option lists count as the tuples _compact_fields turns them into.
+    """
+    key = []
+    for form_data in form_layout:
+        values = _compact_values(form_data)
+        types = list(map(type, values))
+        for position in _LIST_FIELDS:
+            if types[position] is list:
+                types[position] = tuple
+        key.append((_freeze(values), tuple(types)))
+    return tuple(key)
+
+def intern_result_hash_map(result_hash_map: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Rebuilds a result map with interned string keys
     
-    def on_validate_input(self, is_lab_tech: bool, server_data: Optional[List[InvestigationModel]]) -> bool:
+    Args:
+        result_hash_map: Result values keyed by field id and ``<id>_unit``
+        
+    Returns:
+        Optional[Dict[str, Any]]: Map whose keys are shared between investigations
+    """
+    if result_hash_map is None:
+        return None
+    return {
+        sys.intern(key) if type(key) is str else key: value
+        for key, value in result_hash_map.items()
+    }
+
+def compact_investigation(data: InvestigationModel) -> CompactInvestigation:
+    """
+    Converts an investigation to its compact representation
+    
+    Args:
+        data: Investigation to convert
+        
+    Returns:
+        CompactInvestigation: Slotted copy with interned keys and a shared form response
+    """
+    result_list = data.result_list
+    if isinstance(result_list, FormSchema):
+        pass
+    elif result_list and hasattr(result_list, 'form_layout') and result_list.form_layout is not None:
+        result_list = share_form_layout(result_list.form_layout)
+    return CompactInvestigation(
+        test_name=data.test_name,
+        recommended_by=data.recommended_by,
+        recommended_on=data.recommended_on,
+        result_hash_map=intern_result_hash_map(data.result_hash_map),
+        data_error=data.data_error,
+        error_message=data.error_message,
+        id=data.id,
+        dropdown_state=data.dropdown_state,
+        result_list=result_list,
+    )
+
+
+class _IdentityCache:
+    """
+    Values cached per object identity, e.g. per form layout list
+    
+    Layout lists are unhashable and comparing them by content costs more
+    than the work being cached, so entries are keyed by id(). Each entry
+    keeps a reference to its object, so the id cannot be reused by another
+    object while the entry exists.
+    """
+    
+    __slots__ = ("_entries",)
+    
+    def __init__(self):
+        self._entries: Dict[int, Tuple[Any, Any]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __setitem__(self, obj: Any, value: Any) -> None:
+        self._entries[id(obj)] = (obj, value)
+    
+    def get(self, obj: Any, default: Any = None) -> Any:
+        entry = self._entries.get(id(obj))
+        return entry[1] if entry is not None else default
+    
+    def lookup(self, obj: Any, compute: Callable[[Any], Any]) -> Any:
         """
-        Validates investigation input data
+        Returns the value cached for an object, computing it on first use
         
         Args:
-            is_lab_tech: Whether the user is a lab technician
-            server_data: List of investigation models to validate
+            obj: Object the value belongs to
+            compute: Called with ``obj`` on a miss; None results are cached too
             
         Returns:
-            bool: True if all validations pass, False otherwise
-            
-        Raises:
-            ValidationError: When validation logic encounters critical errors
+            Any: Cached or computed value
         """
-        try:
-            is_valid = True
-            
-            if server_data is None:
-                self.logger.warning("Server data is None, validation failed")
-                return False
-            
-            # Lab technician specific validation
-            if is_lab_tech:
-                any_results_entered = any(
-                    investigation.result_hash_map is not None and investigation.result_hash_map
-                    for investigation in server_data
-                )
-                
-                if self.is_community or not any_results_entered:
-                    for investigation in server_data:
-                        if investigation.result_hash_map is None or not investigation.result_hash_map:
-                            investigation.dropdown_state = not investigation.dropdown_state
-                            # toggle_facility would be implemented here
-                            investigation.error_message = "Please enter required data"
-                            investigation.data_error = False
-                            is_valid = False
-            
-            # General validation for all investigations
-            filtered_investigations = [
-                data for data in server_data
-                if data.id is None or (data.result_hash_map is not None and len(data.result_hash_map) > 0)
-            ]
-            
-            for data in filtered_investigations:
-                if data.result_hash_map is not None and len(data.result_hash_map) == 0:
-                    is_valid = True
-                    data.error_message = None
-                    data.data_error = True
-                else:
-                    # Validate form layout data
-                    if data.result_list and hasattr(data.result_list, 'form_layout'):
-                        for form_data in data.result_list.form_layout:
-                            validation_result = self._validate_form_field(form_data, data)
-                            if not validation_result:
-                                is_valid = False
-                                break
-                    else:
-                        is_valid = True
-                        data.error_message = None
-                        data.data_error = True
-            
-            return is_valid
-            
-        except Exception as e:
-            self.logger.error(f"Validation error: {str(e)}")
-            raise ValidationError(f"Validation failed: {str(e)}")
+        entry = self._entries.get(id(obj))
+        if entry is None:
+            entry = self._entries[id(obj)] = (obj, compute(obj))
+        return entry[1]
     
-    def _validate_form_field(self, form_data: FormLayout, data: InvestigationModel) -> bool:
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        """(object, value) pairs in insertion order"""
+        return iter(self._entries.values())
+    
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class FormSchema:
+    """
+    Shared immutable form layout with precomputed metadata
+    
+    A schema stands in for ``InvestigationModel.result_list``: its
+    ``form_layout`` is a tuple of CompactFormLayout, and the validator finds
+    the compiled form through the schema instead of re-keying the layout for
+    every record.
+    """
+    
+    __slots__ = (
+        "fingerprint", "form_layout", "mandatory_fields", "unit_required_fields", "numeric_fields",
+        "layout_key", "_compiled", "__weakref__",
+    )
+    
+    def __init__(self, fingerprint: str, form_layout: Tuple[CompactFormLayout, ...]):
         """
-        Validates individual form field
+        Initialize the schema
         
         Args:
-            form_data: Form layout configuration
-            data: Investigation data
-            
-        Returns:
-            bool: True if field is valid, False otherwise
+            fingerprint: Content fingerprint of the layout
+            form_layout: Compact form layout fields in display order
         """
+        self.fingerprint = fingerprint
+        self.form_layout = form_layout
+        self.mandatory_fields: FrozenSet[Any] = frozenset(
+            form_data.id for form_data in form_layout if form_data.is_mandatory
+        )
+        self.unit_required_fields: FrozenSet[Any] = frozenset(
+            form_data.id for form_data in form_layout if form_data.unit_list
+        )
+        self.numeric_fields: FrozenSet[Any] = frozenset(
+            form_data.id for form_data in form_layout
+            if form_data.min_value is not None or form_data.max_value is not None
+        )
         try:
-            # Check mandatory field validation
-            if self._is_mandatory_field_invalid(form_data, data):
-                data.error_message = "Please enter required data"
-                data.data_error = False
-                return False
-            
-            # Validate edit text fields
-            if form_data.view_type == ViewType.FORM_EDITTEXT.value:
-                return self._validate_edit_text_field(form_data, data)
-            
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Field validation error: {str(e)}")
-            return False
+            self.layout_key: Optional[Tuple[Tuple[Any, ...], ...]] = form_layout_key(form_layout)
+            hash(self.layout_key)
+        except TypeError:
+            # Unhashable attributes: the layout is interpreted field by field
+            self.layout_key = None
+        self._compiled: List[Optional["CompiledForm"]] = [None, None]
+        if self.layout_key is not None:
+            _layout_schemas[id(form_layout)] = self
     
-    def _is_mandatory_field_invalid(self, form_data: FormLayout, data: InvestigationModel) -> bool:
+    def __repr__(self) -> str:
+        return f"FormSchema(fingerprint={self.fingerprint!r}, fields={len(self.form_layout)})"
+    
+    def compiled_form(self, columnar: bool = False) -> "CompiledForm":
         """
-        Checks if mandatory field is invalid
+        Returns the compiled validator for this schema
         
         Args:
-            form_data: Form layout configuration
-            data: Investigation data
+            columnar: Whether to return the variant used by ``validate_batch``
             
         Returns:
-            bool: True if mandatory field is invalid
+            CompiledForm: Generated validator, compiled on first use
+            
+        Raises:
+            TypeError: When the layout cannot be compiled
         """
-        if not form_data.is_mandatory:
-            return False
-        
-        if data.result_hash_map is None:
-            return True
-        
-        # Check if field is missing
-        if form_data.id not in data.result_hash_map:
-            return True
-        
-        # Check if field is empty string
-        value = data.result_hash_map.get(form_data.id)
-        if isinstance(value, str) and not value.strip():
-            return True
+        validate = self._compiled[columnar]
+        if validate is None:
+            if self.layout_key is None:
+                raise TypeError("form layout has unhashable attributes")
+            validate = self._compiled[columnar] = _compile_form_key(self.layout_key, columnar)
+        return validate
+    
+    @property
+    def reference_ranges(self) -> "ReferenceRangeIndex":
+        """Reference range index of the schema's fields"""
+        # Imported here because investigation_indexes builds on this module
+        from investigation_indexes import reference_range_index
+        return reference_range_index(self.form_layout)
+    
+    @property
+    def spinner_options(self) -> "SpinnerOptionIndex":
+        """Allowed option ids of the schema's spinner fields"""
+        return spinner_option_index(self.form_layout)
+
+# Registered schemas by id() of their form_layout tuple; entries disappear with the schema
+_layout_schemas: "weakref.WeakValueDictionary[int, FormSchema]" = weakref.WeakValueDictionary()
+
+def form_layout_fingerprint(form_layout: Iterable[FormLayout]) -> str:
+    """
+    Computes the content fingerprint of a form layout
+    
+    Layouts with equal fields, including value types, unit lists and ranges,
+    have the same fingerprint in every process.
+    
+    Args:
+        form_layout: Form layout fields in display order
         
-        return False
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    return _fingerprint(_share_key(form_layout))
+
+def _fingerprint(key: Tuple[Any, ...]) -> str:
+    return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+class FormSchemaRegistry:
+    """
+    Deduplicates form layouts into shared FormSchema instances
     
-    def _validate_edit_text_field(self, form_data: FormLayout, data: InvestigationModel) -> bool:
+    The registry is bounded; when full it is cleared, which only stops
+    sharing for layouts registered afterwards.
+    """
+    
+    def __init__(self, limit: int = SHARED_FORM_LIMIT):
         """
-        Validates edit text field with min/max length and value constraints
+        Initialize the registry
         
         Args:
-            form_data: Form layout configuration
-            data: Investigation data
-            
-        Returns:
-            bool: True if field is valid
+            limit: Maximum number of schemas kept
         """
-        if data.result_hash_map is None or form_data.id not in data.result_hash_map:
-            return True
-        
-        actual_value = data.result_hash_map[form_data.id]
-        
-        # Skip validation for empty non-mandatory fields
-        if isinstance(actual_value, str) and not actual_value.strip() and not form_data.is_mandatory:
-            return True
-        
-        # Validate min/max length and values
-        evaluation = self._validate_min_max_length(actual_value, form_data)
-        unit_valid = self._validate_unit(form_data, data)
-        
-        is_valid = evaluation[0] and unit_valid
-        
-        if evaluation[1]:  # Error message exists
-            data.error_message = f"{evaluation[1]} ({form_data.title})"
-        
-        data.data_error = is_valid
-        return is_valid
+        self.limit = limit
+        self._by_key: Dict[Tuple[Any, ...], FormSchema] = {}
+        self._by_fingerprint: Dict[str, FormSchema] = {}
     
-    def _validate_unit(self, form_data: FormLayout, data: InvestigationModel) -> bool:
+    def __len__(self) -> int:
+        return len(self._by_fingerprint)
+    
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self._by_fingerprint
+    
+    def get(self, fingerprint: str) -> Optional[FormSchema]:
         """
-        Validates unit selection for form field
+        Looks up a registered schema
         
         Args:
-            form_data: Form layout configuration
-            data: Investigation data
+            fingerprint: Fingerprint returned by form_layout_fingerprint
             
         Returns:
-            bool: True if unit is valid or not required
+            Optional[FormSchema]: Registered schema, None if unknown
         """
-        if form_data.unit_list is None or len(form_data.unit_list) == 0:
-            return True
-        
-        unit_key = f"{form_data.id}_unit"
-        return data.result_hash_map is not None and unit_key in data.result_hash_map
+        return self._by_fingerprint.get(fingerprint)
     
-    def _validate_min_max_length(
-        self, 
-        actual_value: Any, 
-        form_data: FormLayout
-    ) -> Tuple[bool, Optional[str]]:
+    def register(self, form_layout: Iterable[FormLayout]) -> FormSchema:
         """
-        Validates minimum/maximum length and value constraints
+        Returns the shared schema for a form layout, registering it if needed
         
         Args:
-            actual_value: The value to validate
-            form_data: Form layout configuration
+            form_layout: Form layout fields in display order
             
         Returns:
-            Tuple[bool, Optional[str]]: (is_valid, error_message)
+            FormSchema: Schema shared by every identical layout
         """
-        is_valid = True
-        error_message = None
-        
-        try:
-            # Validate minimum length for strings
-            if (form_data.min_length is not None and 
-                form_data.view_type == ViewType.FORM_EDITTEXT.value and
-                isinstance(actual_value, str) and
-                len(actual_value) < form_data.min_length):
-                
-                error_message = f"Minimum length required: {form_data.min_length}"
-                is_valid = False
-            
-            # Validate min/max values for numeric fields
-            elif form_data.max_value is not None or form_data.min_value is not None:
-                numeric_value = self._convert_to_float(actual_value)
-                if numeric_value is not None:
-                    if form_data.max_value is not None and form_data.min_value is not None:
-                        if numeric_value < form_data.min_value or numeric_value > form_data.max_value:
-                            error_message = f"Value must be between {form_data.min_value} and {form_data.max_value}"
-                            is_valid = False
-                    elif form_data.min_value is not None:
-                        if numeric_value < form_data.min_value:
-                            error_message = f"Minimum value required: {form_data.min_value}"
-                            is_valid = False
-                    elif form_data.max_value is not None:
-                        if numeric_value > form_data.max_value:
-                            error_message = f"Maximum value allowed: {form_data.max_value}"
-                            is_valid = False
-            
-            # Validate content length
-            elif form_data.content_length is not None:
-                value_str = str(actual_value)
-                if len(value_str) != form_data.content_length:
-                    error_message = f"Length must be exactly {form_data.content_length} characters"
-                    is_valid = False
-            
-        except Exception as e:
-            self.logger.error(f"Min/max validation error: {str(e)}")
-            error_message = "Validation error occurred"
-            is_valid = False
-        
-        return is_valid, error_message
+        if isinstance(form_layout, tuple) and _layout_schemas.get(id(form_layout)) is not None:
+            schema = _layout_schemas[id(form_layout)]
+            if schema.form_layout is form_layout and self._by_fingerprint.get(schema.fingerprint) is schema:
+                return schema
+        form_layout = list(form_layout)
+        key = _share_key(form_layout)
+        schema = self._by_key.get(key)
+        if schema is None:
+            if len(self._by_key) >= self.limit:
+                self._by_key.clear()
+                self._by_fingerprint.clear()
+            schema = FormSchema(_fingerprint(key), _compact_fields(form_layout))
+            self._by_key[key] = schema
+            self._by_fingerprint[schema.fingerprint] = schema
+        return schema
     
-    def _convert_to_float(self, value: Any) -> Optional[float]:
+    def deduplicate(self, server_data: Iterable[InvestigationModel]) -> int:
         """
-        Safely converts value to float
+        Replaces each investigation's ``result_list`` with its shared schema
+        
+        Investigations without a form layout are left unchanged. Layout lists
+        that are the same object are only fingerprinted once.
         
         Args:
-            value: Value to convert
+            server_data: Investigations to update in place
             
         Returns:
-            Optional[float]: Converted value or None if conversion fails
+            int: Number of investigations whose result_list was replaced
         """
-        try:
-            if isinstance(value, (int, float)):
-                return float(value)
-            elif isinstance(value, str):
-                return float(value)
-            else:
-                return None
-        except (ValueError, TypeError):
-            return None 
\ No newline at end of file
+        schemas = _IdentityCache()
+        count = 0
+        for data in server_data:
+            result_list = data.result_list
+            if isinstance(result_list, FormSchema):
+                continue
+            form_layout = getattr(result_list, 'form_layout', None) if result_list else None
+            if form_layout is None:
+                continue
+            data.result_list = schemas.lookup(form_layout, self.register)
+            count += 1
+        return count
+
+class InvestigationView:
+    """
+    Attribute view of one record in an InvestigationStore
+    
+    Reads and writes go straight to the store's columns, so the validator
+    can use views wherever it accepts an InvestigationModel.
+    """
+    
+    __slots__ = ("_store", "_index")
+    
+    def __init__(self, store: "InvestigationStore", index: int):
+        self._store = store
+        self._index = index
+    
+    test_name = property(lambda self: self._store._test_names[self._index])
+    recommended_by = property(lambda self: self._store._recommended_by[self._index])
+    recommended_on = property(lambda self: self._store._recommended_on[self._index])
+    id = property(lambda self: self._store._ids[self._index])
+    
+    @property
+    def result_hash_map(self) -> Optional[Dict[str, Any]]:
+        return self._store._result_hash_maps[self._index]
+    
+    @result_hash_map.setter
+    def result_hash_map(self, value: Optional[Dict[str, Any]]) -> None:
+        self._store._result_hash_maps[self._index] = intern_result_hash_map(value)
+    
+    @property
+    def result_list(self) -> Optional[Any]:
+        layout_index = self._store._layout_indexes[self._index]
+        return self._store._layouts[layout_index] if layout_index >= 0 else None
+    
+    @property
+    def data_error(self) -> bool:
+        return bool(self._store._data_errors[self._index])
+    
+    @data_error.setter
+    def data_error(self, value: bool) -> None:
+        self._store._data_errors[self._index] = bool(value)
+    
+    @property
+    def dropdown_state(self) -> bool:
+        return bool(self._store._dropdown_states[self._index])
+    
+    @dropdown_state.setter
+    def dropdown_state(self, value: bool) -> None:
+        self._store._dropdown_states[self._index] = bool(value)
+    
+    @property
+    def error_message(self) -> Optional[str]:
+        return self._store._error_messages[self._index]
+    
+    @error_message.setter
+    def error_message(self, value: Optional[str]) -> None:
+        self._store._error_messages[self._index] = value
+    
+    def __copy__(self) -> CompactInvestigation:
+        # Copies must not write back into the store
+        return self._store.to_model(self._index)
+    
+    def __repr__(self) -> str:
+        return f"InvestigationView(index={self._index}, id={self.id!r})"
+
+class InvestigationStore:
+    """
+    Column-oriented container for large numbers of investigations
+    
+    Flags live in byte arrays, form responses are shared and referenced by
+    index, and result maps use interned keys. Indexing and iteration return
+    InvestigationView objects, so a store can be passed directly as
+    ``server_data``.
+    """
+    
+    def __init__(self, investigations: Iterable[InvestigationModel] = ()):
+        self._test_names: List[str] = []
+        self._recommended_by: List[str] = []
+        self._recommended_on: List[str] = []
+        self._ids: List[Optional[str]] = []
+        self._result_hash_maps: List[Optional[Dict[str, Any]]] = []
+        self._error_messages: List[Optional[str]] = []
+        self._data_errors = bytearray()
+        self._dropdown_states = bytearray()
+        self._layout_indexes = array("i")
+        self._layouts: List[Any] = []
+        self._layout_positions: Dict[int, int] = {}
+        self.extend(investigations)
+    
+    def append(self, data: InvestigationModel) -> None:
+        """
+        Adds an investigation to the store
+        
+        Args:
+            data: Investigation to store; its form layout is shared
+        """
+        compact = compact_investigation(data)
+        self._test_names.append(sys.intern(compact.test_name) if type(compact.test_name) is str else compact.test_name)
+        self._recommended_by.append(compact.recommended_by)
+        self._recommended_on.append(compact.recommended_on)
+        self._ids.append(compact.id)
+        self._result_hash_maps.append(compact.result_hash_map)
+        self._error_messages.append(compact.error_message)
+        self._data_errors.append(bool(compact.data_error))
+        self._dropdown_states.append(bool(compact.dropdown_state))
+        self._layout_indexes.append(self._layout_index(compact.result_list))
+    
+    def extend(self, investigations: Iterable[InvestigationModel]) -> None:
+        """
+        Adds investigations to the store
+        
+        Args:
+            investigations: Investigations to store
+        """
+        for data in investigations:
+            self.append(data)
+    
+    def to_model(self, index: int) -> CompactInvestigation:
+        """
+        Copies one record out of the store
+        
+        Args:
+            index: Record position
+            
+        Returns:
+            CompactInvestigation: Detached copy of the record
+        """
+        view = self[index]
+        return CompactInvestigation(
+            test_name=view.test_name,
+            recommended_by=view.recommended_by,
+            recommended_on=view.recommended_on,
+            result_hash_map=view.result_hash_map,
+            data_error=view.data_error,
+            error_message=view.error_message,
+            id=view.id,
+            dropdown_state=view.dropdown_state,
+            result_list=view.result_list,
+        )
+    
+    def _layout_index(self, result_list: Optional[Any]) -> int:
+        if result_list is None:
+            return -1
+        position = self._layout_positions.get(id(result_list))
+        if position is None or self._layouts[position] is not result_list:
+            position = len(self._layouts)
+            self._layouts.append(result_list)
+            self._layout_positions[id(result_list)] = position
+        return position
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def __getitem__(self, index: int) -> InvestigationView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("investigation index out of range")
+        return InvestigationView(self, index)
+    
+    def __iter__(self) -> Iterator[InvestigationView]:
+        for index in range(len(self)):
+            yield InvestigationView(self, index)
+
+class ErrorDetail(NamedTuple):
+    """
+    Error code plus the parameters its message is rendered from
+    
+    ``params`` are positional template arguments, e.g. ``(min_value,
+    max_value, title)`` for VALUE_RANGE, so a detail can be rendered in any
+    locale long after validation ran.
+    """
+    code: ErrorCode
+    params: Tuple[Any, ...] = ()
+    
+    def render(self, catalog: Optional["MessageCatalog"] = None) -> str:
+        """
+        Renders the message text
+        
+        Args:
+            catalog: Catalog to render with, the English default if None
+            
+        Returns:
+            str: Message text
+        """
+        return (catalog or DEFAULT_MESSAGE_CATALOG).render(self)
+    
+    def __str__(self) -> str:
+        return self.render()
+
+class MessageCatalog:
+    """
+    Message templates for one locale, keyed by ErrorCode
+    
+    Templates use ``str.format`` positional fields over ``ErrorDetail.params``,
+    mirroring Android string resources such as ``%1$s``. Codes missing from a
+    catalog are rendered by its fallback.
+    """
+    
+    def __init__(
+        self,
+        locale: str,
+        templates: Dict[Any, str],
+        fallback: Optional["MessageCatalog"] = None
+    ):
+        """
+        Args:
+            locale: Locale tag, e.g. ``"en"`` or ``"fr_CA"``
+            templates: Template per ErrorCode or ErrorCode value
+            fallback: Catalog used for codes without a template
+            
+        Raises:
+            ValueError: When a key is not an ErrorCode value
+        """
+        self.locale = locale
+        self.templates: Dict[ErrorCode, str] = {
+            code if isinstance(code, ErrorCode) else ErrorCode(code): template
+            for code, template in templates.items()
+        }
+        self.fallback = fallback
+    
+    def __repr__(self) -> str:
+        return f"MessageCatalog(locale={self.locale!r}, templates={len(self.templates)})"
+    
+    def render(self, detail: ErrorDetail) -> str:
+        """
+        Renders one error detail
+        
+        Args:
+            detail: Code and parameters to render
+            
+        Returns:
+            str: Message text
+            
+        Raises:
+            KeyError: When neither this catalog nor its fallbacks know the code
+        """
+        catalog: Optional[MessageCatalog] = self
+        while catalog is not None:
+            template = catalog.templates.get(detail.code)
+            if template is not None:
+                return template.format(*detail.params)
+            catalog = catalog.fallback
+        raise KeyError(f"No message template for {detail.code.value}")
+
+class InvestigationResult(NamedTuple):
+    """
+    Validation outcome of one investigation, as recorded in a ValidationReport
+    
+    ``error_message`` and ``data_error`` are the values validation leaves on
+    the model, with ``None`` meaning unchanged (a RESET always clears them).
+    ``dropdown_state`` is the toggled state, or None when it was not toggled.
+    ``error_detail`` is the structured form of ``error_message`` when it came
+    from a built-in rule, for rendering in another locale.
+    """
+    status: ResultStatus
+    error_code: Optional[ErrorCode] = None
+    field_id: Optional[str] = None
+    dropdown_state: Optional[bool] = None
+    error_message: Optional[str] = None
+    data_error: Optional[bool] = None
+    error_detail: Optional[ErrorDetail] = None
+    
+    def message(self, catalog: Optional[MessageCatalog] = None) -> Optional[str]:
+        """
+        Returns the error message, localized when a catalog is given
+        
+        Args:
+            catalog: Catalog to render ``error_detail`` with
+            
+        Returns:
+            Optional[str]: Message text, None when validation sets none
+        """
+        if catalog is not None and self.error_detail is not None:
+            return self.error_detail.render(catalog)
+        return self.error_message
+
+class ValidationReport:
+    """Side-effect-free result of ``InvestigationValidator.validate_report``"""
+    
+    __slots__ = ("is_valid", "results")
+    
+    def __init__(self, is_valid: bool, results: List[InvestigationResult]):
+        self.is_valid = is_valid
+        self.results = results
+    
+    def __len__(self) -> int:
+        return len(self.results)
+    
+    def __iter__(self) -> Iterator[InvestigationResult]:
+        return iter(self.results)
+    
+    def __getitem__(self, index: int) -> InvestigationResult:
+        return self.results[index]
+    
+    def __repr__(self) -> str:
+        return f"ValidationReport(is_valid={self.is_valid}, results={len(self.results)})"
+
+def apply(
+    report: ValidationReport,
+    models: List[InvestigationModel],
+    catalog: Optional[MessageCatalog] = None
+) -> bool:
+    """
+    Writes a report onto models the way ``on_validate_input`` would have
+    
+    Args:
+        report: Report returned by ``validate_report``
+        models: The investigations the report was built from, in the same order
+        catalog: Catalog to localize built-in error messages with
+        
+    Returns:
+        bool: The report's overall result
+    """
+    for result, data in zip(report.results, models):
+        if result.dropdown_state is not None:
+            data.dropdown_state = result.dropdown_state
+        if result.status is ResultStatus.RESET:
+            data.error_message = None
+            data.data_error = True
+            continue
+        error_message = result.message(catalog)
+        if error_message is not None:
+            data.error_message = error_message
+        if result.data_error is not None:
+            data.data_error = result.data_error
+    return report.is_valid
+
+# Outcome of validating one investigation against a form layout:
+# (is_valid, error_message, data_error, error_code, field_id). ``None`` for
+# error_message or data_error means the field loop left that attribute untouched.
+FormOutcome = Tuple[bool, Optional[str], Optional[bool], Optional[ErrorCode], Any]
+CompiledForm = Callable[[Optional[Dict[str, Any]]], FormOutcome]
+# Why an interpreted field check failed: (error_code, error_detail)
+FieldFailure = Tuple[ErrorCode, Optional[ErrorDetail]]
+
+REQUIRED_DATA_MESSAGE = "Please enter required data"
+REQUIRED_DETAIL = ErrorDetail(ErrorCode.REQUIRED)
+
+# English texts of the built-in rules; UNIT_REQUIRED and FIELD_ERROR set no
+# message and INVALID messages come from overridden rules.
+DEFAULT_MESSAGE_TEMPLATES = {
+    ErrorCode.REQUIRED: REQUIRED_DATA_MESSAGE,
+    ErrorCode.MIN_LENGTH: "Minimum length required: {0} ({1})",
+    ErrorCode.VALUE_RANGE: "Value must be between {0} and {1} ({2})",
+    ErrorCode.MIN_VALUE: "Minimum value required: {0} ({1})",
+    ErrorCode.MAX_VALUE: "Maximum value allowed: {0} ({1})",
+    ErrorCode.CONTENT_LENGTH: "Length must be exactly {0} characters ({1})",
+    ErrorCode.VALIDATION_ERROR: "Validation error occurred ({0})",
+    ErrorCode.INVALID_DATE: "Please enter a valid date ({0})",
+    ErrorCode.FUTURE_DATE: "Date cannot be in the future ({0})",
+    ErrorCode.DATE_AFTER_LIMIT: "Date must be on or before {0:%d/%m/%Y} ({1})",
+    ErrorCode.INVALID_OPTION: "Please select a valid option ({0})",
+}
+DEFAULT_MESSAGE_CATALOG = MessageCatalog("en", DEFAULT_MESSAGE_TEMPLATES)
+# Messages returned by _validate_min_max_length, before the field title is appended
+_MIN_MAX_MESSAGES = {
+    ErrorCode.MIN_LENGTH: "Minimum length required: {0}",
+    ErrorCode.VALUE_RANGE: "Value must be between {0} and {1}",
+    ErrorCode.MIN_VALUE: "Minimum value required: {0}",
+    ErrorCode.MAX_VALUE: "Maximum value allowed: {0}",
+    ErrorCode.CONTENT_LENGTH: "Length must be exactly {0} characters",
+    ErrorCode.VALIDATION_ERROR: "Validation error occurred",
+}
+_MESSAGE_CATALOGS: Dict[str, MessageCatalog] = {"en": DEFAULT_MESSAGE_CATALOG}
+
+
+def register_message_catalog(locale: str, templates: Dict[Any, str]) -> MessageCatalog:
+    """
+    Registers (or replaces) the message templates of a locale
+    
+    Codes the templates leave out fall back to English.
+    
+    Args:
+        locale: Locale tag, e.g. ``"fr"`` or ``"fr_CA"``
+        templates: Template per ErrorCode or ErrorCode value
+        
+    Returns:
+        MessageCatalog: The registered catalog
+    """
+    catalog = MessageCatalog(locale, templates, fallback=DEFAULT_MESSAGE_CATALOG)
+    _MESSAGE_CATALOGS[locale] = catalog
+    return catalog
+
+
+def message_catalog(locale: Optional[str] = None) -> MessageCatalog:
+    """
+    Looks up the catalog of a locale
+    
+    ``"fr_CA"`` falls back to ``"fr"``, and unknown locales to English.
+    
+    Args:
+        locale: Locale tag, the English default if None
+        
+    Returns:
+        MessageCatalog: Best matching registered catalog
+    """
+    if locale is None:
+        return DEFAULT_MESSAGE_CATALOG
+    catalog = _MESSAGE_CATALOGS.get(locale)
+    if catalog is None:
+        catalog = _MESSAGE_CATALOGS.get(locale.replace("-", "_").split("_")[0], DEFAULT_MESSAGE_CATALOG)
+    return catalog
+
+COMPILED_FORM_CACHE_SIZE = 1024
+DEFAULT_SHARD_SIZE = 4096
+DEFAULT_THREAD_CHUNK_SIZE = 2048
+NORMALIZATION_CACHE_SIZE = 65536
+DATE_PARSE_CACHE_SIZE = 4096
+RECOMMENDED_ON_FIELD = "recommended_on"
+RECOMMENDED_ON_TITLE = "Recommended on"
+DEFAULT_STREAM_LOOKAHEAD = 10000
+DEFAULT_SPOOL_BYTES = 64 * 1024 * 1024
+
+_logger = logging.getLogger(__name__)
+
+
+class NormalizedValue(NamedTuple):
+    """Parsed form of a string result value, shared by every occurrence of that string"""
+    number: Optional[float]  # float(value), or None when the string is not numeric
+    stripped: str
+    length: int
+    is_empty: bool
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def _normalize_str(value: str) -> NormalizedValue:
+    """Parses a string result value once; bounded by NORMALIZATION_CACHE_SIZE"""
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        number = None
+    stripped = value.strip()
+    return NormalizedValue(number, stripped, len(value), not stripped)
+
+
+def normalize_value(value: Any) -> Optional[NormalizedValue]:
+    """
+    Returns the normalized record for a result value
+    
+    Args:
+        value: Raw ``result_hash_map`` value
+        
+    Returns:
+        Optional[NormalizedValue]: Cached record for plain strings, None for
+        other values, which the validator checks directly
+    """
+    if type(value) is str:
+        return _normalize_str(value)
+    return None
+
+
+def normalize_result_hash_map(result_hash_map: Dict[str, Any]) -> Dict[str, Optional[NormalizedValue]]:
+    """
+    Normalizes every value of a result map
+    
+    Args:
+        result_hash_map: Result values keyed by field id and ``<id>_unit``
+        
+    Returns:
+        Dict[str, Optional[NormalizedValue]]: Normalized record per key
+    """
+    return {key: normalize_value(value) for key, value in result_hash_map.items()}
+
+
+def normalization_cache_stats() -> Dict[str, float]:
+    """
+    Reports the effectiveness of the value normalization cache
+    
+    Returns:
+        Dict[str, float]: hits, misses, size, maxsize and hit_rate
+    """
+    info = _normalize_str.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+    }
+
+
+def clear_normalization_cache() -> None:
+    """Empties the value normalization cache and resets its statistics"""
+    _normalize_str.cache_clear()
+
+
+@lru_cache(maxsize=DATE_PARSE_CACHE_SIZE)
+def _parse_timestamp_str(value: str) -> Optional[datetime]:
+    """Parses a timestamp string once; bounded by DATE_PARSE_CACHE_SIZE"""
+    text = value.strip()
+    try:
+        # Kotlin's yyyyMMddHHmmssZZZZZ: 14 digits, then Z, +HH:MM, +HHMM or +HH
+        if len(text) >= 15 and text[:14].isdigit():
+            parsed = datetime(
+                int(text[0:4]), int(text[4:6]), int(text[6:8]), int(text[8:10]), int(text[10:12]), int(text[12:14])
+            )
+            offset = text[14:]
+            if offset == "Z":
+                return parsed.replace(tzinfo=timezone.utc)
+            digits = offset[1:].replace(":", "", 1)
+            if offset[0] not in "+-" or len(digits) not in (2, 4) or not digits.isdigit():
+                return None
+            delta = timedelta(hours=int(digits[:2]), minutes=int(digits[2:] or 0))
+            if delta >= timedelta(hours=24):
+                return None
+            return parsed.replace(tzinfo=timezone(delta if offset[0] == "+" else -delta))
+        # Server dates such as recommended_on "2024-01-01" or ISO 8601 timestamps
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """
+    Parses a date-picker or recommended_on value
+    
+    Accepts Kotlin's ``yyyyMMddHHmmssZZZZZ`` format and ISO 8601 dates;
+    values without an offset are read as UTC.
+    
+    Args:
+        value: Value to parse
+        
+    Returns:
+        Optional[datetime]: Timezone-aware timestamp, None when the value is
+        not a string or not a valid date
+    """
+    return _parse_timestamp_str(value) if type(value) is str else None
+
+
+_UNPARSED = object()
+
+
+def parse_timestamps(values: Iterable[Any]) -> List[Optional[datetime]]:
+    """
+    Parses a column of timestamps, each distinct value once
+    
+    Args:
+        values: Values to parse
+        
+    Returns:
+        List[Optional[datetime]]: One ``parse_timestamp`` result per value
+    """
+    parsed: Dict[str, Optional[datetime]] = {}
+    results = []
+    for value in values:
+        if type(value) is not str:
+            results.append(None)
+            continue
+        timestamp = parsed.get(value, _UNPARSED)
+        if timestamp is _UNPARSED:
+            timestamp = parsed[value] = _parse_timestamp_str(value)
+        results.append(timestamp)
+    return results
+
+
+def date_cache_stats() -> Dict[str, float]:
+    """
+    Reports the effectiveness of the timestamp parsing cache
+    
+    Returns:
+        Dict[str, float]: hits, misses, size, maxsize and hit_rate
+    """
+    info = _parse_timestamp_str.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+    }
+
+
+def _is_blank_date(value: Any) -> bool:
+    """Whether a date value is unset, which the mandatory rule rather than the date checks reports"""
+    return value is None or (type(value) is str and not value.strip())
+
+
+class FieldCheck(NamedTuple):
+    """Date or spinner validation failure of one investigation field"""
+    field_id: str  # form field id, or "recommended_on"
+    value: Any
+    error_detail: ErrorDetail
+
+
+# typed: 1, 1.0 and True are equal keys but format differently
+@lru_cache(maxsize=COMPILED_FORM_CACHE_SIZE * 8, typed=True)
+def _cached_unit_key(field_id: Any) -> str:
+    return sys.intern(f"{field_id}_unit")
+
+
+def _unit_key(field_id: Any) -> str:
+    """Returns the interned ``<id>_unit`` result key for a field"""
+    try:
+        return _cached_unit_key(field_id)
+    except TypeError:
+        # Unhashable ids (lists, dicts) are formatted without the cache
+        return f"{field_id}_unit"
+
+
+def form_layout_key(form_layout: List[FormLayout]) -> Tuple[Tuple[Any, ...], ...]:
+    """
+    Builds a hashable key describing everything the validator reads from a form layout
+    
+    Value types are part of the key because they change the rendered error
+    messages (``10`` and ``10.0`` compare equal but print differently).
+    
+    Args:
+        form_layout: Form layout fields in display order
+        
+    Returns:
+        Tuple[Tuple[Any, ...], ...]: One tuple per field
+    """
+    return tuple([
+        (
+            form_data.view_type,
+            form_data.id,
+            form_data.title,
+            bool(form_data.is_mandatory),
+            form_data.min_length,
+            form_data.min_value,
+            form_data.max_value,
+            form_data.content_length,
+            bool(form_data.unit_list),
+            type(form_data.min_length),
+            type(form_data.min_value),
+            type(form_data.max_value),
+            type(form_data.content_length),
+        )
+        for form_data in form_layout
+    ])
+
+
+def compile_form_layout(form_layout: List[FormLayout]) -> CompiledForm:
+    """
+    Returns a specialized validator function for a form layout
+    
+    The function takes a ``result_hash_map`` and returns a ``FormOutcome``
+    without touching any model. Identical layouts share one compiled function
+    through a bounded cache.
+    
+    Args:
+        form_layout: Form layout fields in display order
+        
+    Returns:
+        CompiledForm: Generated validator for this layout
+        
+    Raises:
+        TypeError: When a layout attribute is unhashable
+        AttributeError: When a layout entry is not FormLayout-like
+    """
+    return _compile_form_key(form_layout_key(form_layout))
+
+
+def _is_column_bound(value: Any) -> bool:
+    """
+    Checks whether a min/max bound compares identically as a float64 array value
+    
+    Args:
+        value: min_value or max_value from a form layout
+        
+    Returns:
+        bool: True if the bound can be checked column-wise
+    """
+    if value is None or type(value) is float:
+        return True
+    return type(value) is int and abs(value) <= 2 ** 53
+
+
+@lru_cache(maxsize=COMPILED_FORM_CACHE_SIZE)
+def _compile_form_key(key: Tuple[Tuple[Any, ...], ...], columnar: bool = False) -> CompiledForm:
+    """
+    Generates Python source for one form layout key and executes it
+    
+    Branches that cannot apply to a field (no min_length, no unit list,
+    non-EditText optional fields, ...) are not emitted at all, and every
+    error message is rendered once here instead of on each failure. The
+    ``error_details`` attribute maps each failing outcome to its ErrorDetail.
+    
+    The columnar variant is called as ``validate(m, range_codes, row)`` and
+    reads min/max outcomes precomputed by ``_column_range_codes`` for the
+    fields listed in its ``range_fields`` attribute.
+    
+    Args:
+        key: Layout key produced by ``form_layout_key``
+        columnar: Whether to generate the columnar variant
+        
+    Returns:
+        CompiledForm: Generated validator for this layout
+    """
+    constants: Dict[str, Any] = {}
+    range_fields: List[Tuple[Any, Optional[float], Optional[float]]] = []
+    error_details: Dict[FormOutcome, ErrorDetail] = {}
+    
+    def const(value: Any) -> str:
+        name = f"_k{len(constants)}"
+        constants[name] = value
+        return name
+    
+    def failure_const(detail: ErrorDetail, field_id: Any) -> str:
+        outcome = (False, DEFAULT_MESSAGE_CATALOG.render(detail), False, detail.code, field_id)
+        error_details[outcome] = detail
+        return const(outcome)
+    
+    body: List[str] = []
+    none_result = None
+    
+    for field_key in key:
+        (view_type, field_id, title, is_mandatory, min_length,
+         min_value, max_value, content_length, has_units) = field_key[:9]
+        is_edit_text = view_type == ViewType.FORM_EDITTEXT.value
+        if not is_mandatory and not is_edit_text:
+            continue
+        
+        field_name = const(field_id)
+        body.append(f"f = {field_name}")
+        
+        # Equivalent of _validate_min_max_length with the unused branches removed.
+        # Every failing check returns, so its if/elif chain becomes sequential ifs.
+        # Exact str values are checked through their cached NormalizedValue
+        # ``nv`` = (number, stripped, length, is_empty); anything else keeps the
+        # original scalar checks.
+        normalized_checks: List[str] = []
+        scalar_checks: List[str] = []
+        if min_length is not None:
+            failure = failure_const(ErrorDetail(ErrorCode.MIN_LENGTH, (min_length, title)), field_id)
+            normalized_checks.append(f"if nv[2] < {const(min_length)}: return {failure}")
+            scalar_checks.append(f"if isinstance(v, str) and len(v) < {const(min_length)}: return {failure}")
+        if min_value is not None or max_value is not None:
+            if max_value is not None and min_value is not None:
+                detail = ErrorDetail(ErrorCode.VALUE_RANGE, (min_value, max_value, title))
+                condition = f"n < {const(min_value)} or n > {const(max_value)}"
+            elif min_value is not None:
+                detail = ErrorDetail(ErrorCode.MIN_VALUE, (min_value, title))
+                condition = f"n < {const(min_value)}"
+            else:
+                detail = ErrorDetail(ErrorCode.MAX_VALUE, (max_value, title))
+                condition = f"n > {const(max_value)}"
+            failure = failure_const(detail, field_id)
+            scalar_check = [
+                "if isinstance(v, (int, float, str)):",
+                "    try: n = float(v)",
+                "    except (ValueError, TypeError): pass",
+                "    else:",
+                f"        if {condition}: return {failure}",
+            ]
+            if columnar and _is_column_bound(min_value) and _is_column_bound(max_value):
+                # Code 2 marks values the column pass could not convert; the
+                # scalar check re-raises their error into the except below.
+                column = len(range_fields)
+                range_fields.append((field_id, min_value, max_value))
+                column_check = [f"c = rc[{column}][i]", f"if c == 1: return {failure}", "if c == 2:"]
+                column_check.extend(f"    {line}" for line in scalar_check)
+                normalized_checks.extend(column_check)
+                scalar_checks.extend(column_check)
+            else:
+                normalized_checks.extend(["n = nv[0]", f"if n is not None and ({condition}): return {failure}"])
+                scalar_checks.extend(scalar_check)
+        elif content_length is not None:
+            failure = failure_const(ErrorDetail(ErrorCode.CONTENT_LENGTH, (content_length, title)), field_id)
+            normalized_checks.append(f"if nv[2] != {const(content_length)}: return {failure}")
+            scalar_checks.append(f"if len(str(v)) != {const(content_length)}: return {failure}")
+        
+        def checked(checks: List[str], indent: str) -> List[str]:
+            lines = []
+            if checks:
+                error = failure_const(ErrorDetail(ErrorCode.VALIDATION_ERROR, (title,)), field_id)
+                lines.append(f"{indent}try:")
+                lines.extend(f"{indent}    {check}" for check in checks)
+                lines.append(f"{indent}except Exception as e:")
+                lines.append(f'{indent}    _log.error(f"Min/max validation error: {{str(e)}}")')
+                lines.append(f"{indent}    return {error}")
+            if has_units:
+                unit_failure = const((False, None, False, ErrorCode.UNIT_REQUIRED, field_id))
+                lines.append(f"{indent}if {const(_unit_key(field_id))} not in m: return {unit_failure}")
+            lines.append(f"{indent}de = True")
+            return lines
+        
+        if is_mandatory:
+            required = failure_const(REQUIRED_DETAIL, field_id)
+            none_result = none_result or required
+            body.append(f"if {field_name} not in m: return {required}")
+            body.append(f"v = m[{field_name}]")
+            body.append("if v.__class__ is str:")
+            body.append("    nv = _norm(v)")
+            body.append(f"    if nv[3]: return {required}")
+            if is_edit_text:
+                body.extend(checked(normalized_checks, "    "))
+            body.append("else:")
+            body.append(f"    if isinstance(v, str) and not v.strip(): return {required}")
+            if is_edit_text:
+                body.extend(checked(scalar_checks, "    "))
+        else:
+            body.append(f"if {field_name} in m:")
+            body.append(f"    v = m[{field_name}]")
+            body.append("    if v.__class__ is str:")
+            body.append("        nv = _norm(v)")
+            body.append("        if not nv[3]:")
+            body.extend(checked(normalized_checks, "            "))
+            body.append("    elif not isinstance(v, str) or v.strip():")
+            body.extend(checked(scalar_checks, "        "))
+    
+    untouched = const((True, None, None, None, None))
+    none_result = none_result or untouched
+    passed = const((True, None, True, None, None))
+    field_error = const(ErrorCode.FIELD_ERROR)
+    
+    lines = [
+        f"def _make(_log, _norm, {', '.join(constants)}):",
+        f"    def validate({'m, rc, i' if columnar else 'm'}):",
+        f"        if m is None: return {none_result}",
+        "        de = f = None",
+        "        try:",
+    ]
+    lines.extend(f"            {line}" for line in body or ["pass"])
+    lines.extend([
+        "        except Exception as e:",
+        '            _log.error(f"Field validation error: {str(e)}")',
+        f"            return (False, None, de, {field_error}, f)",
+        f"        return {passed} if de else {untouched}",
+        "    return validate",
+    ])
+    source = "\n".join(lines)
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, "<compiled form layout>", "exec"), namespace)
+    validate = namespace["_make"](_logger, _normalize_str, **constants)
+    validate.range_fields = tuple(range_fields)
+    validate.error_details = error_details
+    return validate
+
+
+_COLUMN_VALUE_TYPES = frozenset({str, int, float, bool, type(None)})
+# Kotlin's toDoubleOrNull() does not read booleans as numbers
+_COLUMN_NUMBER_TYPES = frozenset({str, int, float, type(None)})
+
+
+def _column_range_codes(
+    range_fields: Tuple[Tuple[Any, Optional[float], Optional[float]], ...],
+    result_hash_maps: List[Optional[Dict[str, Any]]]
+) -> List[List[int]]:
+    """
+    Evaluates min/max bounds for many result maps at once with numpy
+    
+    Args:
+        range_fields: (field id, min_value, max_value) per range-checked field
+        result_hash_maps: Result maps of investigations sharing one form layout
+        
+    Returns:
+        List[List[int]]: Per field, one code per map: 0 passes (or is not
+        numeric), 1 is out of range, 2 needs the scalar check
+    """
+    codes = []
+    for field_id, min_value, max_value in range_fields:
+        field_codes = [0] * len(result_hash_maps)
+        column = [
+            result_hash_map.get(field_id) if result_hash_map is not None else None
+            for result_hash_map in result_hash_maps
+        ]
+        numeric = None
+        rows = None
+        
+        # Fast path: a column of plain numbers, numeric strings and missing values
+        # converts in one call (None becomes NaN and never fails a bound).
+        if set(map(type, column)) <= _COLUMN_VALUE_TYPES:
+            try:
+                numeric = np.array(column, dtype=np.float64)
+            except (ValueError, TypeError, OverflowError):
+                pass
+        
+        if numeric is None:
+            rows = []
+            values = []
+            for row, value in enumerate(column):
+                # Blank strings never reach the range check, and other types are not numeric
+                if isinstance(value, (int, float)) or (isinstance(value, str) and value.strip()):
+                    rows.append(row)
+                    values.append(value)
+            try:
+                numeric = np.array(values, dtype=np.float64)
+            except (ValueError, TypeError, OverflowError):
+                numeric = np.empty(len(values), dtype=np.float64)
+                for index, value in enumerate(values):
+                    try:
+                        numeric[index] = float(value)
+                    except (ValueError, TypeError):
+                        numeric[index] = np.nan
+                    except Exception:
+                        # e.g. OverflowError for huge ints, reported by the scalar check
+                        numeric[index] = np.nan
+                        field_codes[rows[index]] = 2
+        
+        # NaN compares False both ways, matching float() parse failures and "nan" input
+        if min_value is not None and max_value is not None:
+            out_of_range = (numeric < min_value) | (numeric > max_value)
+        elif min_value is not None:
+            out_of_range = numeric < min_value
+        else:
+            out_of_range = numeric > max_value
+        for index in np.flatnonzero(out_of_range).tolist():
+            field_codes[rows[index] if rows is not None else index] = 1
+        codes.append(field_codes)
+    return codes
+
+
+# Shards sent to worker processes: the distinct layout keys of the shard and one
+# (key index, result_hash_map) pair per investigation, in input order.
+Shard = Tuple[Tuple[Tuple[Tuple[Any, ...], ...], ...], List[Tuple[int, Optional[Dict[str, Any]]]]]
+
+
+def _pack_shard(records: List[Tuple[Tuple[Tuple[Any, ...], ...], Optional[Dict[str, Any]]]]) -> Shard:
+    """
+    Deduplicates the layout keys of a shard so each is pickled once
+    
+    Args:
+        records: (layout key, result_hash_map) per investigation
+        
+    Returns:
+        Shard: Payload for ``_validate_shard``
+    """
+    key_indexes: Dict[Tuple[Tuple[Any, ...], ...], int] = {}
+    packed = [
+        (key_indexes.setdefault(key, len(key_indexes)), result_hash_map)
+        for key, result_hash_map in records
+    ]
+    return tuple(key_indexes), packed
+
+
+def _validate_shard(shard: Shard) -> List[FormOutcome]:
+    """
+    Worker entry point: validates one shard against its compiled layouts
+    
+    Args:
+        shard: Payload built by ``_pack_shard``
+        
+    Returns:
+        List[FormOutcome]: One outcome per investigation, in shard order
+    """
+    keys, records = shard
+    forms = [_compile_form_key(key) for key in keys]
+    return [forms[key_index](result_hash_map) for key_index, result_hash_map in records]
+
+
+VALIDATION_RULES = ("mandatory", "min_length", "value_range", "content_length", "unit")
+DEFAULT_SAMPLE_EVERY = 64
+# Upper bounds in seconds of the latency histogram buckets; +Inf is implied
+LATENCY_BUCKETS = (0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.0001, 0.001, 0.01)
+
+
+class RuleMetrics:
+    """Counters and sampled latency histogram of one rule"""
+    
+    __slots__ = ("calls", "failures", "exceptions", "samples", "latency_sum", "buckets")
+    
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.exceptions = 0
+        self.samples = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+    
+    def observe(self, elapsed: float) -> None:
+        """
+        Records one latency sample
+        
+        Args:
+            elapsed: Seconds the sampled call took
+        """
+        self.samples += 1
+        self.latency_sum += elapsed
+        self.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the counters as plain data
+        
+        Returns:
+            Dict[str, Any]: Counters and cumulative histogram buckets keyed by upper bound
+        """
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), self.buckets):
+            cumulative += count
+            buckets[_prometheus_number(bound)] = cumulative
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "exceptions": self.exceptions,
+            "latency": {"samples": self.samples, "sum": self.latency_sum, "buckets": buckets},
+        }
+
+
+def _is_failure(detail: Optional[ErrorDetail]) -> bool:
+    return detail is not None
+
+
+def _prometheus_number(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(value)
+
+
+class ValidationMetrics:
+    """
+    Per-rule instrumentation of an InvestigationValidator
+    
+    Every rule evaluation is counted; only one call in ``sample_every`` per
+    rule is timed. Log calls made by the validator are counted and timed the
+    same way, or only counted when the validator runs in quiet mode.
+    """
+    
+    def __init__(self, sample_every: int = DEFAULT_SAMPLE_EVERY):
+        """
+        Initialize the metrics
+        
+        Args:
+            sample_every: Time one call in this many per rule; 1 times every call
+        """
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+        self.sample_every = sample_every
+        self.rules: Dict[str, RuleMetrics] = {rule: RuleMetrics() for rule in VALIDATION_RULES}
+        self.logging = RuleMetrics()
+        self.log_calls: Dict[str, int] = {}
+        self.log_suppressed: Dict[str, int] = {}
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns all metrics as plain data
+        
+        Returns:
+            Dict[str, Any]: JSON-serializable snapshot
+        """
+        logging_snapshot = self.logging.snapshot()
+        del logging_snapshot["failures"], logging_snapshot["exceptions"]
+        logging_snapshot["by_level"] = dict(self.log_calls)
+        logging_snapshot["suppressed"] = dict(self.log_suppressed)
+        return {
+            "sample_every": self.sample_every,
+            "rules": {rule: metrics.snapshot() for rule, metrics in self.rules.items()},
+            "logging": logging_snapshot,
+        }
+    
+    def to_prometheus(self, prefix: str = "investigation_validation") -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format
+        
+        Args:
+            prefix: Metric name prefix
+            
+        Returns:
+            str: Exposition text ending with a newline
+        """
+        lines = []
+        
+        def counter(name: str, help_text: str, label: str, values: Dict[str, int]) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for key, value in values.items():
+                lines.append(f'{prefix}_{name}{{{label}="{key}"}} {value}')
+        
+        def histogram(name: str, help_text: str, label: str, values: Dict[str, RuleMetrics]) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for key, metrics in values.items():
+                for bound, count in metrics.snapshot()["latency"]["buckets"].items():
+                    lines.append(f'{prefix}_{name}_bucket{{{label}="{key}",le="{bound}"}} {count}')
+                lines.append(f'{prefix}_{name}_sum{{{label}="{key}"}} {metrics.latency_sum!r}')
+                lines.append(f'{prefix}_{name}_count{{{label}="{key}"}} {metrics.samples}')
+        
+        counter("rule_calls_total", "Rule evaluations", "rule",
+                {rule: metrics.calls for rule, metrics in self.rules.items()})
+        counter("rule_failures_total", "Rule evaluations that failed the field", "rule",
+                {rule: metrics.failures for rule, metrics in self.rules.items()})
+        counter("rule_exceptions_total", "Rule evaluations that raised", "rule",
+                {rule: metrics.exceptions for rule, metrics in self.rules.items()})
+        histogram("rule_latency_seconds", "Sampled rule evaluation latency", "rule", self.rules)
+        counter("log_calls_total", "Log calls made by the validator", "level", self.log_calls)
+        counter("log_suppressed_total", "Log calls replaced by counters in quiet mode", "level", self.log_suppressed)
+        histogram("log_latency_seconds", "Sampled log call latency", "logger", {"validator": self.logging})
+        return "\n".join(lines) + "\n"
+
+
+class _MeteredLogger:
+    """Logger wrapper that counts, samples and optionally suppresses the validator's log calls"""
+    
+    def __init__(self, logger: logging.Logger, metrics: ValidationMetrics, quiet: bool):
+        self.logger = logger
+        self.metrics = metrics
+        self.quiet = quiet
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.logger, name)
+    
+    def _log(self, level: str, msg: Any, *args: Any, **kwargs: Any) -> None:
+        metrics = self.metrics
+        metrics.log_calls[level] = metrics.log_calls.get(level, 0) + 1
+        if self.quiet:
+            metrics.log_suppressed[level] = metrics.log_suppressed.get(level, 0) + 1
+            return
+        log = getattr(self.logger, level)
+        metrics.logging.calls += 1
+        if metrics.logging.calls % metrics.sample_every:
+            log(msg, *args, **kwargs)
+            return
+        start = time.perf_counter()
+        log(msg, *args, **kwargs)
+        metrics.logging.observe(time.perf_counter() - start)
+    
+    def debug(self, msg: Any, *args: Any, **kwargs: Any) -> None:
+        self._log("debug", msg, *args, **kwargs)
+    
+    def info(self, msg: Any, *args: Any, **kwargs: Any) -> None:
+        self._log("info", msg, *args, **kwargs)
+    
+    def warning(self, msg: Any, *args: Any, **kwargs: Any) -> None:
+        self._log("warning", msg, *args, **kwargs)
+    
+    def error(self, msg: Any, *args: Any, **kwargs: Any) -> None:
+        self._log("error", msg, *args, **kwargs)
+
+
+class InvestigationValidator:
+    """
+    Python implementation of investigation validation logic
+    Maintains exact business logic from Kotlin version
+    """
+    
+    # Field-level hooks that compiled form layouts inline. Overriding any of
+    # them (subclass or instance patch) switches back to the interpreted path.
+    _FIELD_RULE_HOOKS = (
+        "_validate_form_field",
+        "_check_form_field",
+        "_is_mandatory_field_invalid",
+        "_validate_edit_text_field",
+        "_check_edit_text_field",
+        "_validate_unit",
+        "_validate_min_max_length",
+        "_check_min_max_length",
+        "_check_min_length",
+        "_check_value_range",
+        "_check_content_length",
+        "_convert_to_float",
+    )
+    
+    # Rule hooks replaced by enable_instrumentation, with the rule each one is counted under
+    _INSTRUMENTED_HOOKS = {
+        "_is_mandatory_field_invalid": "mandatory",
+        "_check_min_length": "min_length",
+        "_check_value_range": "value_range",
+        "_check_content_length": "content_length",
+        "_validate_unit": "unit",
+    }
+    
+    def __init__(self, is_community: bool = False, compile_forms: bool = True):
+        self.is_community = is_community
+        self.compile_forms = compile_forms
+        self.logger = logging.getLogger(__name__)
+        self.metrics: Optional[ValidationMetrics] = None
+        self._uninstrumented: Dict[str, Any] = {}
+    
+    def enable_instrumentation(
+        self,
+        sample_every: int = DEFAULT_SAMPLE_EVERY,
+        quiet: bool = False
+    ) -> ValidationMetrics:
+        """
+        Starts collecting per-rule metrics
+        
+        Each rule method (``_is_mandatory_field_invalid``, ``_check_min_length``,
+        ``_check_value_range``, ``_check_content_length`` and ``_validate_unit``)
+        is wrapped on its own, so a call is counted and timed under the rule
+        that actually ran. The wrappers count as overridden field hooks, so
+        while instrumentation is on fields are checked by the interpreted rule
+        methods instead of compiled forms and timings describe that slower
+        path. When instrumentation is off nothing is wrapped.
+        
+        Args:
+            sample_every: Time one call in this many per rule
+            quiet: Replace the validator's log calls with counters, for batch runs
+            
+        Returns:
+            ValidationMetrics: Metrics that fill as the validator runs
+        """
+        self.disable_instrumentation()
+        metrics = ValidationMetrics(sample_every)
+        rules = metrics.rules
+        sample_every = metrics.sample_every
+        
+        def timed(rule: RuleMetrics, call: Callable[..., Any], *args: Any) -> Any:
+            rule.calls += 1
+            if rule.calls % sample_every:
+                return call(*args)
+            start = time.perf_counter()
+            try:
+                return call(*args)
+            finally:
+                rule.observe(time.perf_counter() - start)
+        
+        # Mandatory and unit hooks are called for every field and decide
+        # themselves whether the rule applies; the _check_ hooks only run when
+        # their bound is set and report failures as an ErrorDetail.
+        applies = {
+            "_is_mandatory_field_invalid": lambda form_data, data: form_data.is_mandatory,
+            "_validate_unit": lambda form_data, data: bool(form_data.unit_list),
+        }
+        failed = {
+            "_is_mandatory_field_invalid": bool,
+            "_validate_unit": lambda unit_valid: not unit_valid,
+        }
+        
+        def instrument(
+            rule: RuleMetrics,
+            call: Callable[..., Any],
+            rule_applies: Optional[Callable[..., bool]],
+            rule_failed: Callable[[Any], bool]
+        ) -> Callable[..., Any]:
+            def instrumented(*args: Any) -> Any:
+                if rule_applies is not None and not rule_applies(*args):
+                    return call(*args)
+                try:
+                    result = timed(rule, call, *args)
+                except Exception:
+                    rule.exceptions += 1
+                    raise
+                if rule_failed(result):
+                    rule.failures += 1
+                return result
+            return instrumented
+        
+        for name, rule_name in self._INSTRUMENTED_HOOKS.items():
+            # Instance-level overrides, such as test patches, are wrapped and restored later
+            if name in self.__dict__:
+                self._uninstrumented[name] = self.__dict__[name]
+            setattr(self, name, instrument(
+                rules[rule_name], getattr(self, name), applies.get(name), failed.get(name, _is_failure)
+            ))
+        self.logger = _MeteredLogger(self.logger, metrics, quiet)
+        self.metrics = metrics
+        return metrics
+    
+    def disable_instrumentation(self) -> Optional[ValidationMetrics]:
+        """
+        Stops collecting metrics and restores the uninstrumented rules
+        
+        Returns:
+            Optional[ValidationMetrics]: Metrics collected so far, None if
+            instrumentation was not enabled
+        """
+        metrics = self.metrics
+        if metrics is None:
+            return None
+        for name in self._INSTRUMENTED_HOOKS:
+            self.__dict__.pop(name, None)
+        self.__dict__.update(self._uninstrumented)
+        self._uninstrumented = {}
+        if isinstance(self.logger, _MeteredLogger):
+            self.logger = self.logger.logger
+        self.metrics = None
+        return metrics
+    
+    def on_validate_input(self, is_lab_tech: bool, server_data: Optional[List[InvestigationModel]]) -> bool:
+        """
+        Validates investigation input data
+        
+        Args:
+            is_lab_tech: Whether the user is a lab technician
+            server_data: List of investigation models to validate
+            
+        Returns:
+            bool: True if all validations pass, False otherwise
+            
+        Raises:
+            ValidationError: When validation logic encounters critical errors
+        """
+        try:
+            is_valid = True
+            
+            if server_data is None:
+                self.logger.warning("Server data is None, validation failed")
+                return False
+            
+            # Lab technician specific validation
+            if is_lab_tech and not self._validate_lab_tech_results(server_data):
+                is_valid = False
+            
+            # General validation for all investigations; filtered lazily, as
+            # validation never changes the fields the filter reads
+            filtered_investigations = (
+                data for data in server_data
+                if data.id is None or (data.result_hash_map is not None and len(data.result_hash_map) > 0)
+            )
+            
+            use_compiled = self._can_use_compiled_forms()
+            
+            for data in filtered_investigations:
+                if data.result_hash_map is not None and len(data.result_hash_map) == 0:
+                    is_valid = True
+                    data.error_message = None
+                    data.data_error = True
+                else:
+                    # Validate form layout data
+                    if data.result_list and hasattr(data.result_list, 'form_layout'):
+                        validate = self._compiled_form(data.result_list.form_layout) if use_compiled else None
+                        if validate is not None:
+                            passed, error_message, data_error, _, _ = validate(data.result_hash_map)
+                            if error_message is not None:
+                                data.error_message = error_message
+                            if data_error is not None:
+                                data.data_error = data_error
+                            if not passed:
+                                is_valid = False
+                            continue
+                        for form_data in data.result_list.form_layout:
+                            validation_result = self._validate_form_field(form_data, data)
+                            if not validation_result:
+                                is_valid = False
+                                break
+                    else:
+                        is_valid = True
+                        data.error_message = None
+                        data.data_error = True
+            
+            return is_valid
+        
+        except Exception as e:
+            self.logger.error(f"Validation error: {str(e)}")
+            raise ValidationError(f"Validation failed: {str(e)}")
+    
+    def validate_batch(
+        self,
+        server_data: Optional[List[InvestigationModel]],
+        is_lab_tech: bool = False
+    ) -> bool:
+        """
+        Validates many investigations with min/max bounds checked column-wise
+        
+        Investigations are grouped by form layout and the numeric values of
+        each range-checked field are compared against its bounds as one numpy
+        array. Outcomes are written back exactly as ``on_validate_input`` does,
+        which is also used directly when numpy is not installed.
+        
+        Args:
+            server_data: List of investigation models to validate
+            is_lab_tech: Whether the user is a lab technician
+            
+        Returns:
+            bool: True if all validations pass, False otherwise
+            
+        Raises:
+            ValidationError: When validation logic encounters critical errors
+        """
+        return self.validate_many([(is_lab_tech, server_data)])[0]
+    
+    def validate_many(
+        self,
+        requests: List[Tuple[bool, Optional[List[InvestigationModel]]]]
+    ) -> List[bool]:
+        """
+        Validates several independent investigation lists in one column-wise pass
+        
+        Each list gets the result ``on_validate_input`` would return for it on
+        its own; form layouts shared between lists are range-checked together.
+        
+        Args:
+            requests: (is_lab_tech, server_data) per list
+            
+        Returns:
+            List[bool]: Result per list, in request order
+            
+        Raises:
+            ValidationError: When validation logic encounters critical errors
+        """
+        results = self._validate_many(requests)
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error(f"Validation error: {str(result)}")
+                raise ValidationError(f"Validation failed: {str(result)}")
+        return results
+    
+    def validate_each(
+        self,
+        requests: List[Tuple[bool, Optional[List[InvestigationModel]]]]
+    ) -> List[Union[bool, ValidationError]]:
+        """
+        Validates several independent investigation lists like ``validate_many``,
+        without letting one failing list fail the others
+        
+        Args:
+            requests: (is_lab_tech, server_data) per list
+            
+        Returns:
+            List[Union[bool, ValidationError]]: Result per list in request
+            order, or the error that stopped that list
+        """
+        results = self._validate_many(requests)
+        for position, result in enumerate(results):
+            if isinstance(result, Exception) and not isinstance(result, ValidationError):
+                results[position] = ValidationError(f"Validation failed: {str(result)}")
+        return results
+    
+    def _validate_many(
+        self,
+        requests: List[Tuple[bool, Optional[List[InvestigationModel]]]]
+    ) -> List[Any]:
+        """
+        Runs ``validate_many`` with errors isolated per list
+        
+        Args:
+            requests: (is_lab_tech, server_data) per list
+            
+        Returns:
+            List[Any]: Result per list, or the exception that stopped it
+        """
+        results: List[Any] = []
+        if np is None or not self._can_use_compiled_forms():
+            for is_lab_tech, server_data in requests:
+                try:
+                    results.append(self.on_validate_input(is_lab_tech, server_data))
+                except ValidationError as e:
+                    results.append(e)
+            return results
+        
+        # First pass: group form-validated investigations of every list by compiled layout
+        groups: Dict[CompiledForm, List[Optional[Dict[str, Any]]]] = {}
+        request_plans: List[Optional[List[Tuple[InvestigationModel, Optional[CompiledForm], int]]]] = []
+        for is_lab_tech, server_data in requests:
+            plans = None
+            try:
+                if server_data is None:
+                    self.logger.warning("Server data is None, validation failed")
+                    results.append(False)
+                else:
+                    is_valid = True
+                    if is_lab_tech and not self._validate_lab_tech_results(server_data):
+                        is_valid = False
+                    
+                    plans = []
+                    for data in server_data:
+                        if not (data.id is None or (data.result_hash_map is not None and len(data.result_hash_map) > 0)):
+                            continue
+                        validate = None
+                        row = 0
+                        if not (data.result_hash_map is not None and len(data.result_hash_map) == 0) \
+                                and data.result_list and hasattr(data.result_list, 'form_layout'):
+                            validate = self._compiled_form(data.result_list.form_layout, columnar=True)
+                            if validate is not None:
+                                group = groups.setdefault(validate, [])
+                                row = len(group)
+                                group.append(data.result_hash_map)
+                        plans.append((data, validate, row))
+                    results.append(is_valid)
+            except Exception as e:
+                plans = None
+                results.append(e)
+            request_plans.append(plans)
+        
+        range_codes: Dict[CompiledForm, Any] = {}
+        for validate, result_hash_maps in groups.items():
+            try:
+                range_codes[validate] = _column_range_codes(validate.range_fields, result_hash_maps)
+            except Exception as e:
+                range_codes[validate] = e
+        
+        # Second pass: apply outcomes of each list in input order, as the serial loop does
+        for position, plans in enumerate(request_plans):
+            if plans is None:
+                continue
+            is_valid = results[position]
+            try:
+                for data, validate, row in plans:
+                    if validate is not None:
+                        codes = range_codes[validate]
+                        if isinstance(codes, Exception):
+                            raise codes
+                        if not self._apply_form_outcome(data, validate(data.result_hash_map, codes, row)):
+                            is_valid = False
+                    elif data.result_hash_map is not None and len(data.result_hash_map) == 0:
+                        is_valid = True
+                        data.error_message = None
+                        data.data_error = True
+                    elif data.result_list and hasattr(data.result_list, 'form_layout'):
+                        for form_data in data.result_list.form_layout:
+                            if not self._validate_form_field(form_data, data):
+                                is_valid = False
+                                break
+                    else:
+                        is_valid = True
+                        data.error_message = None
+                        data.data_error = True
+                results[position] = is_valid
+            except Exception as e:
+                results[position] = e
+        
+        return results
+    
+    def validate_parallel(
+        self,
+        server_data: Optional[List[InvestigationModel]],
+        is_lab_tech: bool = False,
+        max_workers: Optional[int] = None,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        executor: Optional[Executor] = None
+    ) -> bool:
+        """
+        Validates investigations across worker processes
+        
+        The lab technician pre-pass needs every investigation, so it runs here
+        first. Form-layout validation is then split into shards that workers
+        run against compiled layouts; they return only per-investigation
+        outcomes, which are applied to the caller's models in input order so
+        the overall result matches ``on_validate_input``.
+        
+        Args:
+            server_data: List of investigation models to validate
+            is_lab_tech: Whether the user is a lab technician
+            max_workers: Worker processes to start when no executor is given
+            shard_size: Investigations per worker task
+            executor: Existing executor to reuse across calls
+            
+        Returns:
+            bool: True if all validations pass, False otherwise
+            
+        Raises:
+            ValidationError: When validation logic encounters critical errors
+        """
+        if server_data is None or len(server_data) <= shard_size or not self._can_use_compiled_forms():
+            return self.on_validate_input(is_lab_tech, server_data)
+        
+        try:
+            is_valid = True
+            
+            if is_lab_tech and not self._validate_lab_tech_results(server_data):
+                is_valid = False
+            
+            filtered_investigations = [
+                data for data in server_data
+                if data.id is None or (data.result_hash_map is not None and len(data.result_hash_map) > 0)
+            ]
+            
+            plans = []
+            shipped = []
+            # Investigations often share one layout list; key it once per call
+            layout_keys = _IdentityCache()
+            for data in filtered_investigations:
+                key = None
+                if not (data.result_hash_map is not None and len(data.result_hash_map) == 0) \
+                        and data.result_list and hasattr(data.result_list, 'form_layout'):
+                    key = layout_keys.lookup(data.result_list.form_layout, self._form_key)
+                    if key is not None:
+                        shipped.append((key, data.result_hash_map))
+                plans.append((data, key))
+            
+            shards = [
+                _pack_shard(shipped[start:start + shard_size])
+                for start in range(0, len(shipped), shard_size)
+            ]
+            if executor is None:
+                with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                    results = list(pool.map(_validate_shard, shards))
+            else:
+                results = list(executor.map(_validate_shard, shards))
+            outcomes = chain.from_iterable(results)
+            
+            for data, key in plans:
+                if key is not None:
+                    if not self._apply_form_outcome(data, next(outcomes)):
+                        is_valid = False
+                elif data.result_hash_map is not None and len(data.result_hash_map) == 0:
+                    is_valid = True
+                    data.error_message = None
+                    data.data_error = True
+                elif data.result_list and hasattr(data.result_list, 'form_layout'):
+                    for form_data in data.result_list.form_layout:
+                        if not self._validate_form_field(form_data, data):
+                            is_valid = False
+                            break
+                else:
+                    is_valid = True
+                    data.error_message = None
+                    data.data_error = True
+            
+            return is_valid
+        
+        except Exception as e:
+            self.logger.error(f"Validation error: {str(e)}")
+            raise ValidationError(f"Validation failed: {str(e)}")
+    
+    @staticmethod
+    def _apply_form_outcome(data: InvestigationModel, outcome: FormOutcome) -> bool:
+        """
+        Writes a compiled form outcome onto its investigation
+        
+        Args:
+            data: Investigation the outcome belongs to
+            outcome: Outcome returned by a compiled form
+            
+        Returns:
+            bool: Whether the investigation passed
+        """
+        passed, error_message, data_error, _, _ = outcome
+        if error_message is not None:
+            data.error_message = error_message
+        if data_error is not None:
+            data.data_error = data_error
+        return passed
+    
+    def validate_stream(
+        self,
+        investigations: Iterable[InvestigationModel],
+        is_lab_tech: bool = False,
+        any_results_entered: Optional[bool] = None,
+        lookahead: int = DEFAULT_STREAM_LOOKAHEAD
+    ) -> "ValidationStream":
+        """
+        Validates investigations one at a time as they are consumed
+        
+        Args:
+            investigations: Investigations in server order, e.g. a generator
+            is_lab_tech: Whether the user is a lab technician
+            any_results_entered: Result of the lab technician "any results
+                entered" scan when already known (e.g. from a first pass over a
+                file); looked ahead for when None
+            lookahead: Maximum investigations buffered while looking ahead
+            
+        Returns:
+            ValidationStream: Iterator over the validated investigations
+        """
+        return ValidationStream(self, investigations, is_lab_tech, any_results_entered, lookahead)
+    
+    def is_valid_fast(self, is_lab_tech: bool, server_data: Optional[List[InvestigationModel]]) -> bool:
+        """
+        Answers whether ``on_validate_input`` would pass, without writing to any model
+        
+        The overall result of ``on_validate_input`` is decided by the last
+        investigation that fails or resets it. Resets need no field checks, so
+        the last one is found first; form layouts after it are then checked in
+        order and the first failing field ends the check. No error messages
+        are built and the lab technician pre-pass does not toggle dropdowns.
+        
+        Args:
+            is_lab_tech: Whether the user is a lab technician
+            server_data: List of investigation models to check
+            
+        Returns:
+            bool: Same result as ``on_validate_input(is_lab_tech, server_data)``
+            
+        Raises:
+            ValidationError: When validation logic encounters critical errors
+        """
+        try:
+            if server_data is None:
+                return False
+            
+            filtered_investigations = [
+                data for data in server_data
+                if data.id is None or (data.result_hash_map is not None and len(data.result_hash_map) > 0)
+            ]
+            
+            start = 0
+            for position in range(len(filtered_investigations) - 1, -1, -1):
+                data = filtered_investigations[position]
+                if (data.result_hash_map is not None and len(data.result_hash_map) == 0) \
+                        or not (data.result_list and hasattr(data.result_list, 'form_layout')):
+                    start = position + 1
+                    break
+            
+            # Without a reset the pre-pass result stands unless a form fails
+            if start == 0 and is_lab_tech and self._lab_tech_results_missing(server_data):
+                return False
+            
+            use_compiled = self._can_use_compiled_forms()
+            for data in islice(filtered_investigations, start, None):
+                validate = self._compiled_form(data.result_list.form_layout) if use_compiled else None
+                outcome = validate(data.result_hash_map) if validate is not None else self._interpret_form(data)
+                if not outcome[0]:
+                    return False
+            return True
+        
+        except Exception as e:
+            self.logger.error(f"Validation error: {str(e)}")
+            raise ValidationError(f"Validation failed: {str(e)}")
+    
+    def _lab_tech_results_missing(self, server_data: List[InvestigationModel]) -> bool:
+        """
+        Read-only form of ``_validate_lab_tech_results``
+        
+        Args:
+            server_data: List of investigation models to check
+            
+        Returns:
+            bool: True if the pre-pass would flag any investigation
+        """
+        if not self.is_community and any(
+            investigation.result_hash_map is not None and investigation.result_hash_map
+            for investigation in server_data
+        ):
+            return False
+        return any(
+            investigation.result_hash_map is None or not investigation.result_hash_map
+            for investigation in server_data
+        )
+    
+    def validate_report(
+        self,
+        is_lab_tech: bool,
+        server_data: Optional[List[InvestigationModel]]
+    ) -> ValidationReport:
+        """
+        Validates investigation input data without modifying it
+        
+        Args:
+            is_lab_tech: Whether the user is a lab technician
+            server_data: List of investigation models to validate
+            
+        Returns:
+            ValidationReport: Overall result plus one InvestigationResult per
+            investigation; pass it to ``apply`` to update the models
+            
+        Raises:
+            ValidationError: When validation logic encounters critical errors
+        """
+        if server_data is None:
+            self.logger.warning("Server data is None, validation failed")
+            return ValidationReport(False, [])
+        
+        try:
+            flag_missing = is_lab_tech and (self.is_community or not any(
+                investigation.result_hash_map is not None and investigation.result_hash_map
+                for investigation in server_data
+            ))
+            use_compiled = self._can_use_compiled_forms()
+            interpreted_details: Dict[FormOutcome, ErrorDetail] = {}
+            prepass_valid = True
+            last_outcome = None
+            results = []
+            
+            for data in server_data:
+                dropdown_state = None
+                error_message = None
+                data_error = None
+                error_code = None
+                error_detail = None
+                if flag_missing and (data.result_hash_map is None or not data.result_hash_map):
+                    dropdown_state = not data.dropdown_state
+                    error_message = REQUIRED_DATA_MESSAGE
+                    data_error = False
+                    error_code = ErrorCode.REQUIRED
+                    error_detail = REQUIRED_DETAIL
+                    prepass_valid = False
+                
+                if not (data.id is None or (data.result_hash_map is not None and len(data.result_hash_map) > 0)):
+                    status = ResultStatus.SKIPPED if error_code is None else ResultStatus.FAILED
+                    results.append(InvestigationResult(
+                        status, error_code, None, dropdown_state, error_message, data_error, error_detail
+                    ))
+                    continue
+                
+                if (data.result_hash_map is not None and len(data.result_hash_map) == 0) \
+                        or not (data.result_list and hasattr(data.result_list, 'form_layout')):
+                    last_outcome = True
+                    results.append(InvestigationResult(ResultStatus.RESET, None, None, dropdown_state))
+                    continue
+                
+                validate = self._compiled_form(data.result_list.form_layout) if use_compiled else None
+                if validate is not None:
+                    outcome = validate(data.result_hash_map)
+                else:
+                    outcome = self._interpret_form(data, interpreted_details)
+                passed, form_message, form_data_error, form_code, field_id = outcome
+                
+                if passed:
+                    field_id = None
+                else:
+                    last_outcome = False
+                    error_code = form_code
+                if form_message is not None:
+                    error_message = form_message
+                    error_detail = (validate.error_details if validate is not None else interpreted_details).get(outcome)
+                if form_data_error is not None:
+                    data_error = form_data_error
+                status = ResultStatus.PASSED if passed and error_code is None else ResultStatus.FAILED
+                results.append(InvestigationResult(
+                    status, error_code, field_id, dropdown_state, error_message, data_error, error_detail
+                ))
+            
+            return ValidationReport(prepass_valid if last_outcome is None else last_outcome, results)
+        
+        except Exception as e:
+            self.logger.error(f"Validation error: {str(e)}")
+            raise ValidationError(f"Validation failed: {str(e)}")
+    
+    def validate_dates(
+        self,
+        server_data: Optional[List[InvestigationModel]],
+        max_date: Optional[datetime] = None,
+        now: Optional[datetime] = None
+    ) -> List[List[FieldCheck]]:
+        """
+        Validates ``recommended_on`` and the date-picker results of investigations
+        
+        Every non-blank date must parse (see ``parse_timestamp``), must not be
+        in the future and must not be after ``max_date``, the equivalent of
+        the Kotlin date picker's getMaxDateLimit. All values are collected
+        first and parsed as one column, so timestamps repeated across a sync
+        are parsed once. Models are not modified.
+        
+        Args:
+            server_data: List of investigation models to check
+            max_date: Latest allowed date, none if None; naive values are UTC
+            now: Current time for the future check, the system clock if None
+            
+        Returns:
+            List[List[FieldCheck]]: Failures per investigation, in input order
+            
+        Raises:
+            ValidationError: When the dates cannot be checked
+        """
+        if server_data is None:
+            self.logger.warning("Server data is None, validation failed")
+            return []
+        
+        try:
+            now = now or datetime.now(timezone.utc)
+            if now.tzinfo is None:
+                now = now.replace(tzinfo=timezone.utc)
+            if max_date is not None and max_date.tzinfo is None:
+                max_date = max_date.replace(tzinfo=timezone.utc)
+            
+            # (investigation position, field id, title, value) per date to check
+            entries: List[Tuple[int, Any, Any, Any]] = []
+            for position, data in enumerate(server_data):
+                if not _is_blank_date(data.recommended_on):
+                    entries.append((position, RECOMMENDED_ON_FIELD, RECOMMENDED_ON_TITLE, data.recommended_on))
+                result_hash_map = data.result_hash_map
+                result_list = data.result_list
+                form_layout = getattr(result_list, 'form_layout', None) if result_list else None
+                if not result_hash_map or form_layout is None:
+                    continue
+                seen = set()
+                for form_data in form_layout:
+                    if form_data.view_type != ViewType.FORM_DATEPICKER.value or form_data.id in seen:
+                        continue
+                    seen.add(form_data.id)
+                    value = result_hash_map.get(form_data.id)
+                    if not _is_blank_date(value):
+                        entries.append((position, form_data.id, form_data.title, value))
+            
+            checks: List[List[FieldCheck]] = [[] for _ in server_data]
+            timestamps = parse_timestamps([value for _, _, _, value in entries])
+            for (position, field_id, title, value), timestamp in zip(entries, timestamps):
+                if timestamp is None:
+                    detail = ErrorDetail(ErrorCode.INVALID_DATE, (title,))
+                elif timestamp > now:
+                    detail = ErrorDetail(ErrorCode.FUTURE_DATE, (title,))
+                elif max_date is not None and timestamp > max_date:
+                    detail = ErrorDetail(ErrorCode.DATE_AFTER_LIMIT, (max_date, title))
+                else:
+                    continue
+                checks[position].append(FieldCheck(field_id, value, detail))
+            return checks
+        
+        except Exception as e:
+            self.logger.error(f"Validation error: {str(e)}")
+            raise ValidationError(f"Validation failed: {str(e)}")
+    
+    def validate_spinners(self, server_data: Optional[List[InvestigationModel]]) -> List[List[FieldCheck]]:
+        """
+        Validates the spinner selections of investigations against their option lists
+        
+        Investigations are grouped by form layout object and each group is
+        checked against one SpinnerOptionIndex, taken from the FormSchema
+        when the result list is one and otherwise cached by layout content.
+        Models are not modified.
+        
+        Args:
+            server_data: List of investigation models to check
+            
+        Returns:
+            List[List[FieldCheck]]: INVALID_OPTION failures per investigation, in input order
+            
+        Raises:
+            ValidationError: When the option lists cannot be indexed
+        """
+        if server_data is None:
+            self.logger.warning("Server data is None, validation failed")
+            return []
+        
+        try:
+            checks: List[List[FieldCheck]] = [[] for _ in server_data]
+            groups = _IdentityCache()
+            for position, data in enumerate(server_data):
+                result_list = data.result_list
+                form_layout = getattr(result_list, 'form_layout', None) if result_list else None
+                if not data.result_hash_map or form_layout is None:
+                    continue
+                group = groups.get(form_layout)
+                if group is None:
+                    group = groups[form_layout] = (result_list, [])
+                group[1].append(position)
+            
+            for form_layout, (result_list, positions) in groups.items():
+                if isinstance(result_list, FormSchema):
+                    index = result_list.spinner_options
+                else:
+                    index = spinner_option_index(form_layout)
+                if not len(index):
+                    continue
+                details = {}
+                for form_data in form_layout:
+                    if form_data.id not in details:
+                        details[form_data.id] = ErrorDetail(ErrorCode.INVALID_OPTION, (form_data.title,))
+                selections = index.invalid_selections(server_data[position].result_hash_map for position in positions)
+                for position, field_ids in zip(positions, selections):
+                    result_hash_map = server_data[position].result_hash_map
+                    for field_id in field_ids:
+                        checks[position].append(FieldCheck(field_id, result_hash_map[field_id], details[field_id]))
+            return checks
+        
+        except Exception as e:
+            self.logger.error(f"Validation error: {str(e)}")
+            raise ValidationError(f"Validation failed: {str(e)}")
+    
+    def _interpret_form(
+        self,
+        data: InvestigationModel,
+        error_details: Optional[Dict[FormOutcome, ErrorDetail]] = None
+    ) -> FormOutcome:
+        """
+        Runs the field-by-field rules on a shallow copy of an investigation
+        
+        Used by ``validate_report`` when compiled layouts cannot be used, so the
+        caller's model is never written to. Failures carry the same error codes
+        as compiled forms; only an overridden ``_validate_form_field`` (which
+        returns a bool) is reported as INVALID.
+        
+        Args:
+            data: Investigation to validate
+            error_details: Filled like a compiled form's ``error_details``
+                attribute: a failing outcome maps to its ErrorDetail
+                
+        Returns:
+            FormOutcome: Outcome in the compiled-form format
+        """
+        unset = object()
+        probe = copy.copy(data)
+        probe.error_message = unset
+        probe.data_error = None
+        field_rule_overridden = self._is_overridden("_validate_form_field")
+        for form_data in data.result_list.form_layout:
+            if field_rule_overridden:
+                failure = None if self._validate_form_field(form_data, probe) else (ErrorCode.INVALID, None)
+            else:
+                failure = self._check_form_field(form_data, probe)
+            if failure is not None:
+                error_message = None if probe.error_message is unset else probe.error_message
+                outcome = (False, error_message, probe.data_error, failure[0], form_data.id)
+                if error_details is not None and failure[1] is not None and error_message is not None:
+                    error_details[outcome] = failure[1]
+                return outcome
+        error_message = None if probe.error_message is unset else probe.error_message
+        return True, error_message, probe.data_error, None, None
+    
+    def _validate_lab_tech_results(self, server_data: List[InvestigationModel]) -> bool:
+        """
+        Flags investigations without results when a lab technician must enter them
+        
+        Args:
+            server_data: List of investigation models to validate
+            
+        Returns:
+            bool: False if any investigation was flagged
+        """
+        is_valid = True
+        any_results_entered = any(
+            investigation.result_hash_map is not None and investigation.result_hash_map
+            for investigation in server_data
+        )
+        
+        if self.is_community or not any_results_entered:
+            for investigation in server_data:
+                if investigation.result_hash_map is None or not investigation.result_hash_map:
+                    investigation.dropdown_state = not investigation.dropdown_state
+                    # toggle_facility would be implemented here
+                    investigation.error_message = REQUIRED_DATA_MESSAGE
+                    investigation.data_error = False
+                    is_valid = False
+        
+        return is_valid
+    
+    def _can_use_compiled_forms(self) -> bool:
+        """
+        Checks whether compiled form layouts reproduce this validator's field rules
+        
+        Returns:
+            bool: True if compilation is enabled and no field hook is overridden
+        """
+        return self.compile_forms and self._has_default_field_rules()
+    
+    def _has_default_field_rules(self) -> bool:
+        """
+        Checks whether no field rule hook is overridden or instrumented
+        
+        Returns:
+            bool: True if form outcomes depend only on the layout and result map
+        """
+        return not any(self._is_overridden(name) for name in self._FIELD_RULE_HOOKS)
+    
+    def _is_overridden(self, name: str) -> bool:
+        """
+        Checks whether a method is replaced by a subclass or on this instance
+        
+        Args:
+            name: Method name defined by InvestigationValidator
+            
+        Returns:
+            bool: True if calls no longer reach InvestigationValidator's method
+        """
+        return name in self.__dict__ or getattr(type(self), name) is not getattr(InvestigationValidator, name)
+    
+    def _compiled_form(self, form_layout: List[FormLayout], columnar: bool = False) -> Optional[CompiledForm]:
+        """
+        Looks up the compiled validator for a form layout
+        
+        Args:
+            form_layout: Form layout fields in display order
+            columnar: Whether to return the variant used by ``validate_batch``
+            
+        Returns:
+            Optional[CompiledForm]: Compiled validator, or None when the layout
+            cannot be compiled and must be interpreted field by field
+        """
+        try:
+            schema = _layout_schemas.get(id(form_layout))
+            if schema is not None and schema.form_layout is form_layout:
+                return schema.compiled_form(columnar)
+            if columnar:
+                return _compile_form_key(form_layout_key(form_layout), True)
+            return compile_form_layout(form_layout)
+        except (TypeError, AttributeError):
+            return None
+    
+    def _validate_filtered_investigation(self, data: InvestigationModel, use_compiled: bool) -> Optional[bool]:
+        """
+        Runs the form-layout step of ``on_validate_input`` for one investigation
+        
+        Args:
+            data: Investigation that passed the id/result filter
+            use_compiled: Whether compiled form layouts may be used
+            
+        Returns:
+            Optional[bool]: True if it resets the overall result, False if it
+            fails, None if it leaves the overall result unchanged
+        """
+        if data.result_hash_map is not None and len(data.result_hash_map) == 0:
+            data.error_message = None
+            data.data_error = True
+            return True
+        
+        if not (data.result_list and hasattr(data.result_list, 'form_layout')):
+            data.error_message = None
+            data.data_error = True
+            return True
+        
+        validate = self._compiled_form(data.result_list.form_layout) if use_compiled else None
+        if validate is not None:
+            return None if self._apply_form_outcome(data, validate(data.result_hash_map)) else False
+        
+        for form_data in data.result_list.form_layout:
+            if not self._validate_form_field(form_data, data):
+                return False
+        return None
+    
+    def _form_key(self, form_layout: List[FormLayout]) -> Optional[Tuple[Tuple[Any, ...], ...]]:
+        """
+        Builds the compiled-form key for a layout
+        
+        Args:
+            form_layout: Form layout fields in display order
+            
+        Returns:
+            Optional[Tuple[Tuple[Any, ...], ...]]: Hashable layout key, or None
+            when the layout must be interpreted field by field
+        """
+        schema = _layout_schemas.get(id(form_layout))
+        if schema is not None and schema.form_layout is form_layout:
+            return schema.layout_key
+        try:
+            key = form_layout_key(form_layout)
+            hash(key)
+            return key
+        except (TypeError, AttributeError):
+            return None
+    
+    def _validate_form_field(self, form_data: FormLayout, data: InvestigationModel) -> bool:
+        """
+        Validates individual form field
+        
+        Args:
+            form_data: Form layout configuration
+            data: Investigation data
+            
+        Returns:
+            bool: True if field is valid, False otherwise
+        """
+        return self._check_form_field(form_data, data) is None
+    
+    def _check_form_field(self, form_data: FormLayout, data: InvestigationModel) -> Optional[FieldFailure]:
+        """
+        Validates individual form field, reporting why it failed
+        
+        Args:
+            form_data: Form layout configuration
+            data: Investigation data
+            
+        Returns:
+            Optional[FieldFailure]: (error_code, error_detail) of the failed
+            rule, None if the field is valid
+        """
+        try:
+            # Check mandatory field validation
+            if self._is_mandatory_field_invalid(form_data, data):
+                data.error_message = REQUIRED_DATA_MESSAGE
+                data.data_error = False
+                return ErrorCode.REQUIRED, REQUIRED_DETAIL
+            
+            # Validate edit text fields
+            if form_data.view_type == ViewType.FORM_EDITTEXT.value:
+                if self._is_overridden("_validate_edit_text_field"):
+                    return None if self._validate_edit_text_field(form_data, data) else (ErrorCode.INVALID, None)
+                return self._check_edit_text_field(form_data, data)
+            
+            return None
+        
+        except Exception as e:
+            self.logger.error(f"Field validation error: {str(e)}")
+            return ErrorCode.FIELD_ERROR, None
+    
+    def _is_mandatory_field_invalid(self, form_data: FormLayout, data: InvestigationModel) -> bool:
+        """
+        Checks if mandatory field is invalid
+        
+        Args:
+            form_data: Form layout configuration
+            data: Investigation data
+            
+        Returns:
+            bool: True if mandatory field is invalid
+        """
+        if not form_data.is_mandatory:
+            return False
+        
+        if data.result_hash_map is None:
+            return True
+        
+        # Check if field is missing
+        if form_data.id not in data.result_hash_map:
+            return True
+        
+        # Check if field is empty string
+        value = data.result_hash_map.get(form_data.id)
+        if isinstance(value, str) and not value.strip():
+            return True
+        
+        return False
+    
+    def _validate_edit_text_field(self, form_data: FormLayout, data: InvestigationModel) -> bool:
+        """
+        Validates edit text field with min/max length and value constraints
+        
+        Args:
+            form_data: Form layout configuration
+            data: Investigation data
+            
+        Returns:
+            bool: True if field is valid
+        """
+        return self._check_edit_text_field(form_data, data) is None
+    
+    def _check_edit_text_field(self, form_data: FormLayout, data: InvestigationModel) -> Optional[FieldFailure]:
+        """
+        Validates edit text field constraints, reporting why it failed
+        
+        A length or value failure takes precedence over a missing unit.
+        An overridden ``_validate_min_max_length`` only returns text, so its
+        failures are reported as INVALID without a detail.
+        
+        Args:
+            form_data: Form layout configuration
+            data: Investigation data
+            
+        Returns:
+            Optional[FieldFailure]: (error_code, error_detail) of the failed
+            rule, None if the field is valid
+        """
+        if data.result_hash_map is None or form_data.id not in data.result_hash_map:
+            return None
+        
+        actual_value = data.result_hash_map[form_data.id]
+        
+        # Skip validation for empty non-mandatory fields
+        if isinstance(actual_value, str) and not actual_value.strip() and not form_data.is_mandatory:
+            return None
+        
+        # Validate min/max length and values
+        failure = None
+        if self._is_overridden("_validate_min_max_length"):
+            evaluation = self._validate_min_max_length(actual_value, form_data)
+            if evaluation[1]:  # Error message exists
+                data.error_message = f"{evaluation[1]} ({form_data.title})"
+            if not evaluation[0]:
+                failure = ErrorCode.INVALID, None
+        else:
+            detail = self._check_min_max_length(actual_value, form_data)
+            if detail is not None:
+                data.error_message = DEFAULT_MESSAGE_CATALOG.render(detail)
+                failure = detail.code, detail
+        unit_valid = self._validate_unit(form_data, data)
+        
+        if failure is None and not unit_valid:
+            failure = ErrorCode.UNIT_REQUIRED, None
+        data.data_error = failure is None
+        return failure
+    
+    def _validate_unit(self, form_data: FormLayout, data: InvestigationModel) -> bool:
+        """
+        Validates unit selection for form field
+        
+        Args:
+            form_data: Form layout configuration
+            data: Investigation data
+            
+        Returns:
+            bool: True if unit is valid or not required
+        """
+        if form_data.unit_list is None or len(form_data.unit_list) == 0:
+            return True
+        
+        unit_key = _unit_key(form_data.id)
+        return data.result_hash_map is not None and unit_key in data.result_hash_map
+    
+    def _validate_min_max_length(
+        self, 
+        actual_value: Any, 
+        form_data: FormLayout
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Validates minimum/maximum length and value constraints
+        
+        Args:
+            actual_value: The value to validate
+            form_data: Form layout configuration
+            
+        Returns:
+            Tuple[bool, Optional[str]]: (is_valid, error_message)
+        """
+        detail = self._check_min_max_length(actual_value, form_data)
+        if detail is None:
+            return True, None
+        return False, _MIN_MAX_MESSAGES[detail.code].format(*detail.params)
+    
+    def _check_min_max_length(self, actual_value: Any, form_data: FormLayout) -> Optional[ErrorDetail]:
+        """
+        Runs the length and value rules of a field in order
+        
+        The minimum length is checked first; when it passes, the value range
+        is checked if the field has bounds, otherwise the content length.
+        
+        Args:
+            actual_value: The value to validate
+            form_data: Form layout configuration
+            
+        Returns:
+            Optional[ErrorDetail]: The first failure, VALIDATION_ERROR if a rule
+            raised, None if the value passes
+        """
+        try:
+            detail = None
+            if form_data.min_length is not None:
+                detail = self._check_min_length(actual_value, form_data)
+            if detail is None:
+                if form_data.max_value is not None or form_data.min_value is not None:
+                    detail = self._check_value_range(actual_value, form_data)
+                elif form_data.content_length is not None:
+                    detail = self._check_content_length(actual_value, form_data)
+            return detail
+        
+        except Exception as e:
+            self.logger.error(f"Min/max validation error: {str(e)}")
+            return ErrorDetail(ErrorCode.VALIDATION_ERROR, (form_data.title,))
+    
+    def _check_min_length(self, actual_value: Any, form_data: FormLayout) -> Optional[ErrorDetail]:
+        """
+        Checks the minimum length of an EditText string value
+        
+        Args:
+            actual_value: The value to validate
+            form_data: Form layout configuration with ``min_length`` set
+            
+        Returns:
+            Optional[ErrorDetail]: MIN_LENGTH failure, None if the value passes
+        """
+        if (form_data.view_type == ViewType.FORM_EDITTEXT.value and
+                isinstance(actual_value, str) and
+                len(actual_value) < form_data.min_length):
+            return ErrorDetail(ErrorCode.MIN_LENGTH, (form_data.min_length, form_data.title))
+        return None
+    
+    def _check_value_range(self, actual_value: Any, form_data: FormLayout) -> Optional[ErrorDetail]:
+        """
+        Checks a numeric value against the field's min/max values
+        
+        Args:
+            actual_value: The value to validate; non-numeric values pass
+            form_data: Form layout configuration with a min or max value
+            
+        Returns:
+            Optional[ErrorDetail]: VALUE_RANGE, MIN_VALUE or MAX_VALUE failure,
+            None if the value passes
+        """
+        numeric_value = self._convert_to_float(actual_value)
+        if numeric_value is None:
+            return None
+        min_value = form_data.min_value
+        max_value = form_data.max_value
+        if max_value is not None and min_value is not None:
+            if numeric_value < min_value or numeric_value > max_value:
+                return ErrorDetail(ErrorCode.VALUE_RANGE, (min_value, max_value, form_data.title))
+        elif min_value is not None:
+            if numeric_value < min_value:
+                return ErrorDetail(ErrorCode.MIN_VALUE, (min_value, form_data.title))
+        elif max_value is not None:
+            if numeric_value > max_value:
+                return ErrorDetail(ErrorCode.MAX_VALUE, (max_value, form_data.title))
+        return None
+    
+    def _check_content_length(self, actual_value: Any, form_data: FormLayout) -> Optional[ErrorDetail]:
+        """
+        Checks the exact length of a value's text
+        
+        Args:
+            actual_value: The value to validate
+            form_data: Form layout configuration with ``content_length`` set
+            
+        Returns:
+            Optional[ErrorDetail]: CONTENT_LENGTH failure, None if the value passes
+        """
+        if len(str(actual_value)) != form_data.content_length:
+            return ErrorDetail(ErrorCode.CONTENT_LENGTH, (form_data.content_length, form_data.title))
+        return None
+    
+    def _convert_to_float(self, value: Any) -> Optional[float]:
+        """
+        Safely converts value to float
+        
+        Args:
+            value: Value to convert
+            
+        Returns:
+            Optional[float]: Converted value or None if conversion fails
+        """
+        if type(value) is str:
+            return _normalize_str(value).number
+        try:
+            if isinstance(value, (int, float)):
+                return float(value)
+            elif isinstance(value, str):
+                return float(value)
+            else:
+                return None
+        except (ValueError, TypeError):
+            return None 
+
+
+class ValidationStream:
+    """
+    Iterator returned by ``InvestigationValidator.validate_stream``
+    
+    Yields each investigation after validating it, so only the look-ahead
+    buffer is held in memory. ``is_valid`` is final once the stream is exhausted.
+    """
+    
+    def __init__(
+        self,
+        validator: InvestigationValidator,
+        investigations: Iterable[InvestigationModel],
+        is_lab_tech: bool,
+        any_results_entered: Optional[bool],
+        lookahead: int
+    ):
+        self.validator = validator
+        self.count = 0
+        # The lab technician pre-pass runs before every form check in
+        # on_validate_input, so form outcomes always take precedence over it.
+        self._prepass_valid = True
+        self._last_outcome: Optional[bool] = None
+        self._records = self._validate(iter(investigations), is_lab_tech, any_results_entered, lookahead)
+    
+    @property
+    def is_valid(self) -> bool:
+        """Overall result for the investigations consumed so far"""
+        return self._prepass_valid if self._last_outcome is None else self._last_outcome
+    
+    def __iter__(self) -> "ValidationStream":
+        return self
+    
+    def __next__(self) -> InvestigationModel:
+        return next(self._records)
+    
+    def _validate(
+        self,
+        investigations: Iterator[InvestigationModel],
+        is_lab_tech: bool,
+        any_results_entered: Optional[bool],
+        lookahead: int
+    ) -> Iterator[InvestigationModel]:
+        validator = self.validator
+        try:
+            flag_missing = False
+            if is_lab_tech:
+                if not validator.is_community and any_results_entered is None:
+                    buffered: List[InvestigationModel] = []
+                    any_results_entered = False
+                    for investigation in investigations:
+                        buffered.append(investigation)
+                        if investigation.result_hash_map:
+                            any_results_entered = True
+                            break
+                        if len(buffered) > lookahead:
+                            raise ValidationError(
+                                f"No results entered in the first {lookahead} investigations; "
+                                "pass any_results_entered from a first pass over the input"
+                            )
+                    investigations = chain(buffered, investigations)
+                flag_missing = validator.is_community or not any_results_entered
+            
+            use_compiled = validator._can_use_compiled_forms()
+            for data in investigations:
+                if flag_missing and (data.result_hash_map is None or not data.result_hash_map):
+                    data.dropdown_state = not data.dropdown_state
+                    # toggle_facility would be implemented here
+                    data.error_message = REQUIRED_DATA_MESSAGE
+                    data.data_error = False
+                    self._prepass_valid = False
+                
+                if data.id is None or (data.result_hash_map is not None and len(data.result_hash_map) > 0):
+                    outcome = validator._validate_filtered_investigation(data, use_compiled)
+                    if outcome is not None:
+                        self._last_outcome = outcome
+                
+                self.count += 1
+                yield data
+        
+        except ValidationError:
+            raise
+        except Exception as e:
+            validator.logger.error(f"Validation error: {str(e)}")
+            raise ValidationError(f"Validation failed: {str(e)}")
+
+
+def _combine_field_outcomes(outcomes: Iterable[FormOutcome]) -> FormOutcome:
+    """
+    Combines per-field outcomes the way the field loop does
+    
+    The first failing field decides the outcome; data_error falls back to the
+    last value written by an earlier field when the failing one wrote none.
+    
+    Args:
+        outcomes: One single-field outcome per form layout field, in order
+        
+    Returns:
+        FormOutcome: Outcome of the whole form
+    """
+    data_error = None
+    for outcome in outcomes:
+        if not outcome[0]:
+            if outcome[2] is None and data_error is not None:
+                return (False, outcome[1], data_error, outcome[3], outcome[4])
+            return outcome
+        if outcome[2] is not None:
+            data_error = outcome[2]
+    return (True, None, data_error, None, None)
+
+
+class IncrementalValidator:
+    """
+    Re-validates a fixed list of investigations after single-field edits
+    
+    Every field's last outcome is cached per investigation. ``update`` re-runs
+    only the fields reading the changed result key (a field id or its
+    ``<id>_unit`` key) and recomputes the overall result, leaving the models
+    and result exactly as a full ``on_validate_input`` call would.
+    """
+    
+    def __init__(
+        self,
+        validator: InvestigationValidator,
+        is_lab_tech: bool,
+        server_data: List[InvestigationModel]
+    ):
+        self.validator = validator
+        self.is_lab_tech = is_lab_tech
+        self.server_data = server_data
+        self._positions = {id(data): index for index, data in enumerate(server_data)}
+        self._plans: Dict[Tuple[Tuple[Any, ...], ...], Tuple[Tuple[CompiledForm, ...], Dict[Any, List[int]]]] = {}
+        self._incremental = validator._can_use_compiled_forms()
+        # Per investigation: (field functions, key -> field positions) or None
+        self._record_plans: List[Optional[Tuple[Tuple[CompiledForm, ...], Dict[Any, List[int]]]]] = []
+        self._field_outcomes: List[Optional[List[FormOutcome]]] = []
+        self._outcomes: List[Optional[FormOutcome]] = []
+        # Per investigation: True resets, False fails, None leaves the overall result
+        self._events: List[Optional[bool]] = []
+        self._empty = set()
+        self.is_valid = validator.on_validate_input(is_lab_tech, server_data)
+        for index in range(len(server_data)):
+            self._record_plans.append(None)
+            self._field_outcomes.append(None)
+            self._outcomes.append(None)
+            self._events.append(None)
+            self._evaluate(index)
+    
+    def update(self, investigation: Any, key: Any) -> bool:
+        """
+        Re-validates after one result key of an investigation changed
+        
+        Args:
+            investigation: The changed investigation or its position
+            key: The ``result_hash_map`` key that was set or removed
+            
+        Returns:
+            bool: Overall result, identical to a full ``on_validate_input``
+        """
+        index = self._position(investigation)
+        plan = self._record_plans[index]
+        field_outcomes = self._field_outcomes[index]
+        data = self.server_data[index]
+        if not self._incremental or plan is None or field_outcomes is None or not self._takes_form_path(data):
+            return self.refresh(index)
+        
+        self._track_empty(index, data)
+        validate_fields, key_fields = plan
+        for position in key_fields.get(key, ()):
+            field_outcomes[position] = validate_fields[position](data.result_hash_map)
+        self._outcomes[index] = _combine_field_outcomes(field_outcomes)
+        self._events[index] = None if self._outcomes[index][0] else False
+        return self._apply(index)
+    
+    def refresh(self, investigation: Any) -> bool:
+        """
+        Re-validates an investigation whose results, id or layout were replaced
+        
+        Args:
+            investigation: The changed investigation or its position
+            
+        Returns:
+            bool: Overall result, identical to a full ``on_validate_input``
+        """
+        index = self._position(investigation)
+        if not self._incremental:
+            self.is_valid = self.validator.on_validate_input(self.is_lab_tech, self.server_data)
+            return self.is_valid
+        self._evaluate(index)
+        return self._apply(index)
+    
+    def _position(self, investigation: Any) -> int:
+        if isinstance(investigation, int):
+            return investigation
+        return self._positions[id(investigation)]
+    
+    def _takes_form_path(self, data: InvestigationModel) -> bool:
+        return (data.id is None or (data.result_hash_map is not None and len(data.result_hash_map) > 0)) \
+            and not (data.result_hash_map is not None and len(data.result_hash_map) == 0) \
+            and bool(data.result_list and hasattr(data.result_list, 'form_layout'))
+    
+    def _track_empty(self, index: int, data: InvestigationModel) -> None:
+        if data.result_hash_map is None or not data.result_hash_map:
+            self._empty.add(index)
+        else:
+            self._empty.discard(index)
+    
+    def _evaluate(self, index: int) -> None:
+        """Recomputes every cached outcome of one investigation"""
+        data = self.server_data[index]
+        self._track_empty(index, data)
+        self._record_plans[index] = None
+        self._field_outcomes[index] = None
+        self._outcomes[index] = None
+        self._events[index] = None
+        
+        if not (data.id is None or (data.result_hash_map is not None and len(data.result_hash_map) > 0)):
+            return
+        if not self._takes_form_path(data):
+            self._events[index] = True
+            return
+        
+        plan = self._field_plan(data.result_list.form_layout)
+        if plan is None:
+            self._incremental = False
+            return
+        field_outcomes = [validate(data.result_hash_map) for validate in plan[0]]
+        self._record_plans[index] = plan
+        self._field_outcomes[index] = field_outcomes
+        self._outcomes[index] = _combine_field_outcomes(field_outcomes)
+        self._events[index] = None if self._outcomes[index][0] else False
+    
+    def _field_plan(
+        self,
+        form_layout: List[FormLayout]
+    ) -> Optional[Tuple[Tuple[CompiledForm, ...], Dict[Any, List[int]]]]:
+        """Compiles each field of a layout on its own and indexes fields by result key"""
+        key = self.validator._form_key(form_layout)
+        if key is None:
+            return None
+        plan = self._plans.get(key)
+        if plan is None:
+            validate_fields = tuple(_compile_form_key((field_key,)) for field_key in key)
+            key_fields: Dict[Any, List[int]] = {}
+            for position, field_key in enumerate(key):
+                key_fields.setdefault(field_key[1], []).append(position)
+                if field_key[8]:  # unit list present
+                    key_fields.setdefault(_unit_key(field_key[1]), []).append(position)
+            plan = self._plans[key] = (validate_fields, key_fields)
+        return plan
+    
+    def _apply(self, changed: int) -> bool:
+        """Writes what a full run would write and recomputes the overall result"""
+        if not self._incremental:
+            self.is_valid = self.validator.on_validate_input(self.is_lab_tech, self.server_data)
+            return self.is_valid
+        
+        server_data = self.server_data
+        prepass_valid = True
+        rewrite = {changed}
+        # The lab technician pre-pass runs (and toggles) on every full run;
+        # flagged investigations then get their form outcome re-applied.
+        if self.is_lab_tech and self._empty and \
+                (self.validator.is_community or len(self._empty) == len(server_data)):
+            for index in self._empty:
+                data = server_data[index]
+                data.dropdown_state = not data.dropdown_state
+                data.error_message = REQUIRED_DATA_MESSAGE
+                data.data_error = False
+            prepass_valid = False
+            rewrite.update(self._empty)
+        
+        for index in rewrite:
+            data = server_data[index]
+            if self._outcomes[index] is not None:
+                self.validator._apply_form_outcome(data, self._outcomes[index])
+            elif self._events[index]:
+                data.error_message = None
+                data.data_error = True
+        
+        self.is_valid = prepass_valid
+        for event in reversed(self._events):
+            if event is not None:
+                self.is_valid = event
+                break
+        return self.is_valid
+
+
+class ThreadedValidationEngine:
+    """
+    Validates investigation lists on a thread pool without copying them
+    
+    Worker threads never write to a model: each checks a contiguous chunk of
+    investigations against compiled form layouts and returns the outcomes,
+    using its own layout lookup table as scratch space. The calling thread
+    runs the lab technician pre-pass and applies the outcomes in input
+    order, so results and model updates match ``on_validate_input`` however
+    the chunks were scheduled. Threads only run in parallel on free-threaded
+    CPython builds.
+    """
+    
+    def __init__(
+        self,
+        validator: Optional[InvestigationValidator] = None,
+        max_workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_THREAD_CHUNK_SIZE,
+        executor: Optional[Executor] = None
+    ):
+        """
+        Initialize the engine
+        
+        Args:
+            validator: Validator whose rules are applied; a default one if None
+            max_workers: Threads to start when no executor is given
+            chunk_size: Investigations per worker task
+            executor: Existing thread pool to use; it is not shut down by ``close``
+        """
+        self.validator = validator or InvestigationValidator()
+        self.chunk_size = chunk_size
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="investigation-validator"
+        )
+        self._owns_executor = executor is None
+        self._scratch = threading.local()
+    
+    def close(self) -> None:
+        """Shuts down the thread pool if the engine created it"""
+        if self._owns_executor:
+            self._executor.shutdown()
+    
+    def __enter__(self) -> "ThreadedValidationEngine":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+    
+    def validate(self, is_lab_tech: bool, server_data: Optional[List[InvestigationModel]]) -> bool:
+        """
+        Validates one investigation list, updating its models
+        
+        Args:
+            is_lab_tech: Whether the user is a lab technician
+            server_data: List of investigation models to validate
+            
+        Returns:
+            bool: Same result as ``on_validate_input(is_lab_tech, server_data)``
+            
+        Raises:
+            ValidationError: When validation logic encounters critical errors
+        """
+        return self.validate_many([(is_lab_tech, server_data)])[0]
+    
+    def validate_many(self, requests: List[Tuple[bool, Optional[List[InvestigationModel]]]]) -> List[bool]:
+        """
+        Validates several investigation lists, checking all of their chunks concurrently
+        
+        Args:
+            requests: (is_lab_tech, server_data) per list
+            
+        Returns:
+            List[bool]: Result per list, in request order
+            
+        Raises:
+            ValidationError: When validation logic encounters critical errors
+        """
+        validator = self.validator
+        # Overridden or instrumented rule hooks are not thread-safe to share
+        if not validator._can_use_compiled_forms():
+            return [validator.on_validate_input(is_lab_tech, server_data) for is_lab_tech, server_data in requests]
+        
+        try:
+            call = object()
+            plans = []
+            for is_lab_tech, server_data in requests:
+                if server_data is None:
+                    plans.append(None)
+                    continue
+                is_valid = not is_lab_tech or validator._validate_lab_tech_results(server_data)
+                filtered_investigations = [
+                    data for data in server_data
+                    if data.id is None or (data.result_hash_map is not None and len(data.result_hash_map) > 0)
+                ]
+                futures = [
+                    self._executor.submit(self._check_chunk, call, filtered_investigations[start:start + self.chunk_size])
+                    for start in range(0, len(filtered_investigations), self.chunk_size)
+                ]
+                plans.append((is_valid, filtered_investigations, futures))
+            
+            results = []
+            for plan in plans:
+                if plan is None:
+                    validator.logger.warning("Server data is None, validation failed")
+                    results.append(False)
+                    continue
+                is_valid, filtered_investigations, futures = plan
+                outcomes = chain.from_iterable(future.result() for future in futures)
+                for data, outcome in zip(filtered_investigations, outcomes):
+                    if outcome is not None:
+                        if not validator._apply_form_outcome(data, outcome):
+                            is_valid = False
+                    else:
+                        event = validator._validate_filtered_investigation(data, False)
+                        if event is not None:
+                            is_valid = event
+                results.append(is_valid)
+            return results
+        
+        except Exception as e:
+            validator.logger.error(f"Validation error: {str(e)}")
+            raise ValidationError(f"Validation failed: {str(e)}")
+    
+    def _check_chunk(self, call: object, chunk: List[InvestigationModel]) -> List[Optional[FormOutcome]]:
+        """
+        Worker task: computes compiled-form outcomes without touching the models
+        
+        Args:
+            call: Token of the ``validate_many`` call the chunk belongs to
+            chunk: Filtered investigations in input order
+            
+        Returns:
+            List[Optional[FormOutcome]]: Outcome per investigation, None for
+            resets and layouts that must be interpreted on the calling thread
+        """
+        scratch = self._scratch
+        if getattr(scratch, "call", None) is not call:
+            # Layout lists may be edited between calls, so lookups are per call
+            scratch.call = call
+            scratch.forms = _IdentityCache()
+        forms = scratch.forms.lookup
+        compiled_form = self.validator._compiled_form
+        outcomes: List[Optional[FormOutcome]] = []
+        for data in chunk:
+            result_hash_map = data.result_hash_map
+            result_list = data.result_list
+            validate = None
+            if not (result_hash_map is not None and len(result_hash_map) == 0) \
+                    and result_list and hasattr(result_list, 'form_layout'):
+                validate = forms(result_list.form_layout, compiled_form)
+            outcomes.append(validate(result_hash_map) if validate is not None else None)
+        return outcomes
+
+
+SPINNER_INDEX_CACHE_SIZE = 1024
+
+
+class SpinnerOptionIndex:
+    """
+    Allowed option ids of a form's spinner fields
+    
+    Each spinner's ``option_list`` ids become one frozenset, so checking a
+    selection is a single membership test. Ids match as given or as their
+    string form, since servers send both. Only the first field with a given
+    id counts, and spinners without an option list are not checked.
+    """
+    
+    __slots__ = ("_fields",)
+    
+    def __init__(self, options: Iterable[Tuple[Any, Optional[Tuple[Any, ...]]]]):
+        """
+        Builds the index
+        
+        Args:
+            options: (field id, option ids or None) per field in display order,
+                as built by ``spinner_option_index``
+        """
+        self._fields: Dict[Any, FrozenSet[Any]] = {}
+        seen = set()
+        for field_id, option_ids in options:
+            if field_id in seen:
+                continue
+            seen.add(field_id)
+            if option_ids is not None:
+                self._fields[field_id] = frozenset(chain(option_ids, map(str, option_ids)))
+    
+    def __len__(self) -> int:
+        return len(self._fields)
+    
+    @property
+    def field_ids(self) -> Tuple[Any, ...]:
+        """Ids of the spinner fields that have options"""
+        return tuple(self._fields)
+    
+    def options(self, field_id: Any) -> Optional[FrozenSet[Any]]:
+        """Allowed selections of a field, None when it is not checked"""
+        return self._fields.get(field_id)
+    
+    def invalid_fields(self, result_hash_map: Optional[Dict[str, Any]]) -> List[Any]:
+        """
+        Lists the spinner fields of a result map holding an unknown option
+        
+        Args:
+            result_hash_map: Result values keyed by field id
+            
+        Returns:
+            List[Any]: Field ids whose selection is not allowed; unset and
+            blank selections are left to the mandatory rule
+        """
+        if not result_hash_map:
+            return []
+        invalid = []
+        for field_id, allowed in self._fields.items():
+            value = result_hash_map.get(field_id)
+            if value is None or (type(value) is str and not value.strip()):
+                continue
+            try:
+                if value in allowed:
+                    continue
+            except TypeError:
+                pass  # unhashable values are never an option id
+            invalid.append(field_id)
+        return invalid
+    
+    def invalid_selections(self, result_hash_maps: Iterable[Optional[Dict[str, Any]]]) -> List[List[Any]]:
+        """
+        Checks many records' selections against this form
+        
+        Args:
+            result_hash_maps: Result maps of investigations sharing the form
+            
+        Returns:
+            List[List[Any]]: ``invalid_fields`` per result map, in order
+        """
+        if not self._fields:
+            return [[] for _ in result_hash_maps]
+        return [self.invalid_fields(result_hash_map) for result_hash_map in result_hash_maps]
+
+
+@lru_cache(maxsize=SPINNER_INDEX_CACHE_SIZE)
+def _spinner_index_for_key(key: Tuple[Tuple[Any, Optional[Tuple[Any, ...]]], ...]) -> SpinnerOptionIndex:
+    return SpinnerOptionIndex(key)
+
+
+def spinner_option_index(form_layout: Iterable[Any]) -> SpinnerOptionIndex:
+    """
+    Returns the cached SpinnerOptionIndex for a form layout
+    
+    Args:
+        form_layout: FormLayout or CompactFormLayout fields
+        
+    Returns:
+        SpinnerOptionIndex: Index shared by every form with the same options
+        
+    Raises:
+        AttributeError: When an option is not a dict
+        TypeError: When an option id is unhashable
+    """
+    key = tuple(
+        (
+            form_data.id,
+            tuple(option.get("id") for option in form_data.option_list if option.get("id") is not None)
+            if form_data.view_type == ViewType.FORM_SPINNER.value and form_data.option_list else None,
+        )
+        for form_data in form_layout
+    )
+    return _spinner_index_for_key(key)
+
+
+def reference_range_from_dict(record: Dict[str, Any]) -> ReferenceRange:
+    """
+    Builds a ReferenceRange from its server JSON representation
+    
+    Args:
+        record: Decoded JSON object with camelCase keys
+        
+    Returns:
+        ReferenceRange: Reference range entry
+    """
+    return ReferenceRange(
+        unit_type=record.get("unitType"),
+        gender=record.get("gender"),
+        min_range=record.get("minRange"),
+        max_range=record.get("maxRange"),
+        display_range=record.get("displayRange"),
+    )
+
+
+def form_layout_from_dict(record: Dict[str, Any]) -> FormLayout:
+    """
+    Builds a FormLayout from its server JSON representation
+    
+    Args:
+        record: Decoded JSON object with camelCase keys
+        
+    Returns:
+        FormLayout: Form layout field
+    """
+    ranges = record.get("ranges")
+    return FormLayout(
+        view_type=record.get("viewType"),
+        id=record.get("id"),
+        title=record.get("title"),
+        is_mandatory=bool(record.get("isMandatory", False)),
+        min_length=record.get("minLength"),
+        max_length=record.get("maxLength"),
+        min_value=record.get("minValue"),
+        max_value=record.get("maxValue"),
+        content_length=record.get("contentLength"),
+        unit_list=record.get("unitList"),
+        ranges=[reference_range_from_dict(item) for item in ranges] if ranges is not None else None,
+        option_list=record.get("optionList"),
+    )
+
+
+def investigation_from_dict(record: Dict[str, Any]) -> InvestigationModel:
+    """
+    Builds an InvestigationModel from its server JSON representation
+    
+    A ``resultList`` without ``formLayout`` is dropped, matching Kotlin's
+    ``resultList?.formLayout ?: run { ... }`` fallback.
+    
+    Args:
+        record: Decoded JSON object with camelCase keys
+        
+    Returns:
+        InvestigationModel: Investigation ready to validate
+    """
+    result_list = record.get("resultList")
+    form_layout = result_list.get("formLayout") if result_list else None
+    return InvestigationModel(
+        test_name=record.get("testName"),
+        recommended_by=record.get("recommendedBy"),
+        recommended_on=record.get("recommendedOn"),
+        result_hash_map=record.get("resultHashMap"),
+        data_error=record.get("dataError", True),
+        error_message=record.get("errorMessage"),
+        id=record.get("id"),
+        dropdown_state=record.get("dropdownState", False),
+        result_list=FormResponse([form_layout_from_dict(item) for item in form_layout])
+        if form_layout is not None else None,
+    )
+
+
+DECODED_LAYOUT_LIMIT = 4096
+
+
+def json_backend() -> str:
+    """
+    Names the JSON library used by InvestigationDecoder
+    
+    Returns:
+        str: "orjson" when installed, otherwise "json"
+    """
+    return "orjson" if orjson is not None else "json"
+
+
+class InvestigationDecoder:
+    """
+    Bulk decoder from server JSON to ready-to-validate investigations
+    
+    camelCase keys are mapped straight onto the models. Each distinct form
+    layout is decoded once and its result list is shared by every
+    investigation using it; with a FormSchemaRegistry the shared result list
+    is the registered FormSchema. Fields the validator never reads
+    (``testName``, ``recommendedBy``, ``recommendedOn``, ``maxLength`` and
+    ``ranges``) are skipped unless ``include_metadata`` is set.
+    """
+    
+    def __init__(
+        self,
+        include_metadata: bool = False,
+        schemas: Optional[FormSchemaRegistry] = None,
+        layout_limit: int = DECODED_LAYOUT_LIMIT
+    ):
+        """
+        Initialize the decoder
+        
+        Args:
+            include_metadata: Whether to decode the fields the validator never reads
+            schemas: Registry that deduplicates decoded layouts into schemas
+            layout_limit: Decoded layouts kept before the cache is cleared
+        """
+        self.include_metadata = include_metadata
+        self.schemas = schemas
+        self.layout_limit = layout_limit
+        self._layouts: Dict[Tuple[Any, ...], Any] = {}
+        self._loads = orjson.loads if orjson is not None else json.loads
+    
+    def decode(self, payload: Any) -> List[InvestigationModel]:
+        """
+        Decodes a JSON array of investigations
+        
+        Args:
+            payload: JSON text as bytes or str
+            
+        Returns:
+            List[InvestigationModel]: Investigations in payload order
+            
+        Raises:
+            ValueError: If the payload is not a JSON array of objects
+        """
+        records = self._loads(payload)
+        if not isinstance(records, list):
+            raise ValueError("expected a JSON array of investigations")
+        return [self.decode_record(record) for record in records]
+    
+    def decode_line(self, line: Any) -> InvestigationModel:
+        """
+        Decodes one JSON investigation object, e.g. an NDJSON line
+        
+        Args:
+            line: JSON text as bytes or str
+            
+        Returns:
+            InvestigationModel: Investigation ready to validate
+            
+        Raises:
+            ValueError: If the line is not a JSON object
+        """
+        record = self._loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("expected a JSON object per investigation")
+        return self.decode_record(record)
+    
+    def decode_record(self, record: Dict[str, Any]) -> InvestigationModel:
+        """
+        Builds an investigation from a decoded JSON object
+        
+        Matches investigation_from_dict for every field the validator reads.
+        
+        Args:
+            record: Decoded JSON object with camelCase keys
+            
+        Returns:
+            InvestigationModel: Investigation ready to validate
+            
+        Raises:
+            ValueError: If the record is not a JSON object
+        """
+        if not isinstance(record, dict):
+            raise ValueError("expected a JSON object per investigation")
+        get = record.get
+        result_list = get("resultList")
+        form_layout = result_list.get("formLayout") if result_list else None
+        if self.include_metadata:
+            test_name, recommended_by, recommended_on = get("testName"), get("recommendedBy"), get("recommendedOn")
+        else:
+            test_name = recommended_by = recommended_on = None
+        return InvestigationModel(
+            test_name,
+            recommended_by,
+            recommended_on,
+            get("resultHashMap"),
+            get("dataError", True),
+            get("errorMessage"),
+            get("id"),
+            get("dropdownState", False),
+            self._result_list(form_layout) if form_layout is not None else None,
+        )
+    
+    def _result_list(self, form_layout: List[Dict[str, Any]]) -> Any:
+        # Values carry their types so 1, 1.0 and True do not share a layout
+        atomic = _ATOMIC_TYPES
+        key = []
+        for field in form_layout:
+            values = tuple([value if value.__class__ in atomic else _freeze(value) for value in field.values()])
+            key.append((tuple(field), values, tuple(map(type, values))))
+        key = tuple(key)
+        shared = self._layouts.get(key)
+        if shared is None:
+            if len(self._layouts) >= self.layout_limit:
+                self._layouts.clear()
+            fields = [self._form_layout(field) for field in form_layout]
+            shared = self.schemas.register(fields) if self.schemas is not None else FormResponse(fields)
+            self._layouts[key] = shared
+        return shared
+    
+    def _form_layout(self, record: Dict[str, Any]) -> FormLayout:
+        if self.include_metadata:
+            return form_layout_from_dict(record)
+        get = record.get
+        return FormLayout(
+            view_type=get("viewType"),
+            id=get("id"),
+            title=get("title"),
+            is_mandatory=bool(get("isMandatory", False)),
+            min_length=get("minLength"),
+            min_value=get("minValue"),
+            max_value=get("maxValue"),
+            content_length=get("contentLength"),
+            unit_list=get("unitList"),
+            option_list=get("optionList"),
+        )
+
+
+def decode_investigations(
+    payload: Any,
+    include_metadata: bool = False,
+    schemas: Optional[FormSchemaRegistry] = None
+) -> List[InvestigationModel]:
+    """
+    Decodes a JSON array of investigations in one pass
+    
+    Args:
+        payload: JSON text as bytes or str
+        include_metadata: Whether to decode the fields the validator never reads
+        schemas: Registry that deduplicates decoded layouts into schemas
+        
+    Returns:
+        List[InvestigationModel]: Investigations in payload order
+        
+    Raises:
+        ValueError: If the payload is not a JSON array of objects
+    """
+    return InvestigationDecoder(include_metadata, schemas).decode(payload)
+
+
+def outcome_to_dict(data: InvestigationModel) -> Dict[str, Any]:
+    """
+    Builds the NDJSON outcome record for a validated investigation
+    
+    Args:
+        data: Validated investigation
+        
+    Returns:
+        Dict[str, Any]: Outcome with camelCase keys
+    """
+    return {
+        "id": data.id,
+        "testName": data.test_name,
+        "dataError": data.data_error,
+        "errorMessage": data.error_message,
+        "dropdownState": data.dropdown_state,
+    }
+
+
+def read_ndjson(lines: Iterable[str]) -> Iterator[InvestigationModel]:
+    """
+    Decodes investigations from NDJSON lines, skipping blank lines
+    
+    Args:
+        lines: One JSON object per line
+        
+    Returns:
+        Iterator[InvestigationModel]: Decoded investigations
+    """
+    decoder = InvestigationDecoder(include_metadata=True)
+    for line in lines:
+        if line.strip():
+            yield decoder.decode_line(line)
+
+
+def _line_has_results(line: str) -> bool:
+    if not line.strip():
+        return False
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("expected a JSON object per investigation")
+    return bool(record.get("resultHashMap"))
+
+
+def scan_results_entered(
+    source: TextIO,
+    spool_bytes: int = DEFAULT_SPOOL_BYTES
+) -> Tuple[bool, Iterable[str]]:
+    """
+    Looks ahead for any investigation with results, for the lab technician rule
+    
+    Seekable inputs are scanned and rewound (two passes over the file).
+    Other inputs, such as pipes, are copied into a spool file that stays in
+    memory up to ``spool_bytes`` and moves to disk beyond that.
+    
+    Args:
+        source: NDJSON text stream
+        spool_bytes: In-memory size limit of the look-ahead spool
+        
+    Returns:
+        Tuple[bool, Iterable[str]]: (any_results_entered, lines to validate)
+    """
+    if source.seekable():
+        start = source.tell()
+        found = any(_line_has_results(line) for line in source)
+        source.seek(start)
+        return found, source
+    
+    spool = SpooledTemporaryFile(max_size=spool_bytes, mode="w+", encoding="utf-8")
+    found = False
+    for line in source:
+        spool.write(line)
+        if _line_has_results(line):
+            found = True
+            break
+    spool.seek(0)
+    return found, chain(spool, source)
+
+
+def validate_ndjson(
+    source: TextIO,
+    output: TextIO,
+    is_lab_tech: bool = False,
+    is_community: bool = False,
+    spool_bytes: int = DEFAULT_SPOOL_BYTES
+) -> bool:
+    """
+    Validates an NDJSON stream of investigations, writing one outcome per line
+    
+    Args:
+        source: NDJSON input, one investigation per line
+        output: Destination for NDJSON outcome records
+        is_lab_tech: Whether the user is a lab technician
+        is_community: Whether validation runs for a community user
+        spool_bytes: In-memory size limit of the lab technician look-ahead
+        
+    Returns:
+        bool: True if all validations pass, False otherwise
+    """
+    any_results_entered = None
+    lines: Iterable[str] = source
+    if is_lab_tech and not is_community:
+        any_results_entered, lines = scan_results_entered(source, spool_bytes)
+    
+    stream = InvestigationValidator(is_community=is_community).validate_stream(
+        read_ndjson(lines), is_lab_tech, any_results_entered
+    )
+    for data in stream:
+        output.write(json.dumps(outcome_to_dict(data)))
+        output.write("\n")
+    return stream.is_valid
+
+
+if __name__ == "__main__":
+    from investigation_cli import main
+    sys.exit(main())